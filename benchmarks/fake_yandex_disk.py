@@ -0,0 +1,514 @@
+import hashlib
+import itertools
+import json
+import random
+import threading
+import time
+
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, quote, unquote, urlparse
+from xml.sax.saxutils import escape
+
+
+READ_CHUNK_SIZE = 256 * 1024
+WEBDAV_PREFIX = '/webdav'
+
+
+def normalize_path(path: str) -> str:
+    """Функция приводит путь ресурса к виду "/папка/файл" без префикса "disk:"."""
+    if path.startswith('disk:'):
+        path = path[5:]
+    return '/' + path.strip('/')
+
+
+def parent_of(path: str) -> str:
+    return path.rsplit('/', 1)[0] or '/'
+
+
+class FakeYandexDisk:
+    """Локальная замена REST API Яндекс.Диска для бенчмарков.
+
+    Сервер запускается в отдельном потоке того же процесса и поддерживает получение
+    списка ресурсов с постраничной выдачей, создание папок,
+    удаление, выдачу ссылки на загрузку, приём файла по этой ссылке, перемещение и
+    скачивание с поддержкой заголовка Range, а также ревизию диска с заголовком ETag. Содержимое файлов хранится только при
+    keep_content, иначе запоминаются лишь размер, MD5 и SHA256.
+
+    По адресу webdav_url те же ресурсы доступны через WebDAV: PUT, DELETE, MKCOL, MOVE
+    и PROPFIND с глубиной 1. Если в заголовках Etag, Sha256 и Size загрузки указано
+    содержимое, которое сервер уже получал, тело запроса не хешируется и не сохраняется,
+    а загрузка учитывается в deduplicated.
+
+    Args:
+        latency (float): Задержка перед ответом на каждый запрос в секундах.
+        bandwidth (int): Скорость приёма загружаемых файлов в байтах в секунду, 0 - без ограничения.
+        throttle_rate (float): Доля запросов, на которые сервер отвечает 429.
+        retry_after (float): Значение заголовка Retry-After в ответах 429.
+        keep_content (bool): Хранить ли содержимое загруженных файлов для скачивания.
+
+    Attributes:
+        resources (dict): Ресурсы диска {путь: сведения о ресурсе}.
+        contents (dict): Содержимое файлов {путь: данные}.
+        requests (dict): Число запросов по адресам {"МЕТОД адрес": число}.
+        bytes_received (int): Число байт, полученных в телах загрузок.
+        bytes_sent (int): Число байт, отправленных при скачивании.
+        deduplicated (int): Число загрузок через WebDAV, завершённых по хешам уже известного содержимого.
+    """
+
+    def __init__(self, latency: float = 0.0, bandwidth: int = 0, throttle_rate: float = 0.0,
+                 retry_after: float = 0.05, keep_content: bool = False) -> None:
+        self.keep_content = keep_content
+        self.contents: Dict[str, bytes] = {}
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.resources: Dict[str, dict] = {'/': self._new_resource('dir')}
+        self._children: Dict[str, set] = {'/': set()}
+        self._sorted_children: Dict[str, List[str]] = {}
+        self._uploads: Dict[str, tuple] = {}
+        self._blobs: Dict[Tuple[str, str, int], Optional[bytes]] = {}
+        self._upload_ids = itertools.count()
+        self._random = random.Random(0)
+        self._lock = threading.Lock()
+        self.requests: Dict[str, int] = {}
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.deduplicated = 0
+        self.revision = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @staticmethod
+    def _new_resource(kind: str, size: int = 0, md5: Optional[str] = None, sha256: Optional[str] = None) -> dict:
+        return {'type': kind, 'size': size, 'md5': md5, 'sha256': sha256,
+                'modified': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S+00:00')}
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self._server.server_port}'
+
+    @property
+    def url(self) -> str:
+        """Адрес API ресурсов, который передаётся в YandexDisk."""
+        return f'{self.base_url}/v1/disk/resources'
+
+    @property
+    def webdav_url(self) -> str:
+        """Адрес WebDAV сервера, который передаётся в YandexDisk."""
+        return f'{self.base_url}{WEBDAV_PREFIX}'
+
+    def start(self) -> 'FakeYandexDisk':
+        """Метод запускает сервер на свободном порту."""
+        disk = self
+
+        class Handler(RequestHandler):
+            fake_disk = disk
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        """Метод останавливает сервер."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_stats(self) -> None:
+        """Метод обнуляет счётчики запросов и полученных байт."""
+        with self._lock:
+            self.requests = {}
+            self.bytes_received = 0
+            self.bytes_sent = 0
+            self.deduplicated = 0
+
+    def total_requests(self) -> int:
+        with self._lock:
+            return sum(self.requests.values())
+
+    def mkdirs(self, path: str) -> None:
+        """Метод создаёт папку вместе с отсутствующими родительскими папками."""
+        path = normalize_path(path)
+        with self._lock:
+            missing = []
+            while path not in self.resources:
+                missing.append(path)
+                path = parent_of(path)
+            for folder in reversed(missing):
+                self._add(folder, self._new_resource('dir'))
+
+    def put_file(self, path: str, data: bytes) -> None:
+        """Метод создаёт или заменяет файл так, как если бы его загрузил другой клиент."""
+        path = normalize_path(path)
+        self.mkdirs(parent_of(path))
+        with self._lock:
+            if path in self.resources:
+                self._remove(path)
+            self._store_file(path, len(data), hashlib.md5(data).hexdigest(), hashlib.sha256(data).hexdigest(), data)
+
+    def _add(self, path: str, resource: dict) -> None:
+        self.revision += 1
+        self.resources[path] = resource
+        self._children.setdefault(parent_of(path), set()).add(path)
+        self._sorted_children.pop(parent_of(path), None)
+        if resource['type'] == 'dir':
+            self._children.setdefault(path, set())
+
+    def _remove(self, path: str) -> None:
+        self.revision += 1
+        for current in self._subtree(path):
+            self._children.pop(current, None)
+            self._sorted_children.pop(current, None)
+            self.contents.pop(current, None)
+            del self.resources[current]
+        self._children[parent_of(path)].discard(path)
+        self._sorted_children.pop(parent_of(path), None)
+
+    def _store_file(self, path: str, size: int, md5: str, sha256: str, data: Optional[bytes]) -> None:
+        if path in self.resources:
+            self._remove(path)
+        self._add(path, self._new_resource('file', size, md5, sha256))
+        self._blobs[md5, sha256, size] = data
+        if data is not None:
+            self.contents[path] = data
+
+    def _move(self, source: str, target: str) -> None:
+        if target in self.resources:
+            self._remove(target)
+        moved = self._subtree(source)
+        resources = {path: self.resources[path] for path in moved}
+        contents = {path: self.contents[path] for path in moved if path in self.contents}
+        self._remove(source)
+        for path in moved:
+            self._add(target + path[len(source):], resources[path])
+            if path in contents:
+                self.contents[target + path[len(source):]] = contents[path]
+
+    def _subtree(self, path: str) -> List[str]:
+        paths, stack = [], [path]
+        while stack:
+            current = stack.pop()
+            paths.append(current)
+            stack.extend(self._children.get(current, ()))
+        return paths
+
+    def _item(self, path: str) -> dict:
+        resource = self.resources[path]
+        item = {'name': path.rsplit('/', 1)[1], 'path': f'disk:{path}', 'type': resource['type'],
+                'modified': resource['modified']}
+        if resource['type'] == 'file':
+            item.update(size=resource['size'], md5=resource['md5'], sha256=resource['sha256'])
+        return item
+
+    def _children_of(self, path: str) -> List[str]:
+        if path not in self._sorted_children:
+            self._sorted_children[path] = sorted(self._children.get(path, ()))
+        return self._sorted_children[path]
+
+    def handle(self, handler: 'RequestHandler', method: str) -> None:
+        """Метод обрабатывает запрос и отправляет ответ."""
+        parsed = urlparse(handler.path)
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        endpoint = parsed.path if not parsed.path.startswith('/upload-target/') else '/upload-target'
+        if endpoint == WEBDAV_PREFIX or endpoint.startswith(WEBDAV_PREFIX + '/'):
+            endpoint = WEBDAV_PREFIX
+        with self._lock:
+            self.requests[f'{method} {endpoint}'] = self.requests.get(f'{method} {endpoint}', 0) + 1
+            throttled = self.throttle_rate and self._random.random() < self.throttle_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if throttled:
+            handler.discard_body()
+            return handler.send_json(429, {'message': 'Too Many Requests'}, {'Retry-After': str(self.retry_after)})
+
+        route = getattr(self, f'_{method.lower()}_{endpoint.strip("/").replace("/", "_").replace("-", "_")}', None)
+        if route is None:
+            handler.discard_body()
+            return handler.send_json(404, {'message': 'Not Found'})
+        route(handler, query)
+
+    def _get_v1_disk(self, handler: 'RequestHandler', query: dict) -> None:
+        with self._lock:
+            revision = self.revision
+        etag = f'"{revision}"'
+        if handler.headers.get('If-None-Match') == etag:
+            return handler.send_empty(304)
+        handler.send_json(200, {'revision': revision}, {'ETag': etag})
+
+    def _get_v1_disk_resources(self, handler: 'RequestHandler', query: dict) -> None:
+        path = normalize_path(query['path'])
+        limit, offset = int(query.get('limit', 20)), int(query.get('offset', 0))
+        with self._lock:
+            if path not in self.resources:
+                return handler.send_json(404, {'message': 'Resource not found'})
+            body = self._item(path)
+            if body['type'] == 'dir':
+                children = self._children_of(path)
+                body['_embedded'] = {'path': f'disk:{path}', 'total': len(children), 'limit': limit,
+                                     'offset': offset,
+                                     'items': [self._item(child) for child in children[offset:offset + limit]]}
+        handler.send_json(200, body)
+
+    def _put_v1_disk_resources(self, handler: 'RequestHandler', query: dict) -> None:
+        path = normalize_path(query['path'])
+        with self._lock:
+            if path in self.resources:
+                return handler.send_json(409, {'message': 'Resource already exists'})
+            if parent_of(path) not in self.resources:
+                return handler.send_json(409, {'message': 'Parent folder not found'})
+            self._add(path, self._new_resource('dir'))
+        handler.send_json(201, {'href': f'{self.url}?path=disk:{path}', 'method': 'GET'})
+
+    def _delete_v1_disk_resources(self, handler: 'RequestHandler', query: dict) -> None:
+        path = normalize_path(query['path'])
+        with self._lock:
+            if path not in self.resources or path == '/':
+                return handler.send_json(404, {'message': 'Resource not found'})
+            self._remove(path)
+        handler.send_empty(204)
+
+    def _get_v1_disk_resources_upload(self, handler: 'RequestHandler', query: dict) -> None:
+        path = normalize_path(query['path'])
+        overwrite = query.get('overwrite', 'false').lower() == 'true'
+        with self._lock:
+            if path in self.resources and not overwrite:
+                return handler.send_json(409, {'message': 'Resource already exists'})
+            if parent_of(path) not in self.resources:
+                return handler.send_json(409, {'message': 'Parent folder not found'})
+            upload_id = str(next(self._upload_ids))
+            self._uploads[upload_id] = (path, overwrite)
+        handler.send_json(200, {'href': f'{self.base_url}/upload-target/{upload_id}', 'method': 'PUT',
+                                'templated': False})
+
+    def _put_upload_target(self, handler: 'RequestHandler', query: dict) -> None:
+        upload_id = handler.path.rsplit('/', 1)[1]
+        with self._lock:
+            upload = self._uploads.pop(upload_id, None)
+        if upload is None or 'Content-Length' not in handler.headers:
+            handler.discard_body()
+            return handler.send_json(404 if upload is None else 411, {'message': 'Bad upload'})
+        received = self._receive(handler, int(handler.headers['Content-Length']))
+        if received is None:
+            return
+        with self._lock:
+            path, _ = upload
+            if parent_of(path) not in self.resources:
+                return handler.send_json(409, {'message': 'Parent folder not found'})
+            self._store_file(path, *received)
+        handler.send_empty(201)
+
+    def _receive(self, handler: 'RequestHandler', length: int) -> Optional[tuple]:
+        """Метод читает тело загрузки с учётом ограничения скорости приёма.
+
+        :return: размер, MD5, SHA256 и содержимое при keep_content или None при обрыве соединения.
+        """
+        md5, sha256 = hashlib.md5(), hashlib.sha256()
+        chunks = []
+        received = 0
+        start = time.monotonic()
+        while received < length:
+            chunk = handler.rfile.read(min(READ_CHUNK_SIZE, length - received))
+            if not chunk:
+                return None
+            received += len(chunk)
+            if self.keep_content:
+                chunks.append(chunk)
+            md5.update(chunk)
+            sha256.update(chunk)
+            if self.bandwidth:
+                delay = received / self.bandwidth - (time.monotonic() - start)
+                if delay > 0:
+                    time.sleep(delay)
+        with self._lock:
+            self.bytes_received += received
+        return received, md5.hexdigest(), sha256.hexdigest(), b''.join(chunks) if self.keep_content else None
+
+    def _post_v1_disk_resources_move(self, handler: 'RequestHandler', query: dict) -> None:
+        source, target = normalize_path(query['from']), normalize_path(query['path'])
+        overwrite = query.get('overwrite', 'false').lower() == 'true'
+        with self._lock:
+            if source not in self.resources:
+                return handler.send_json(404, {'message': 'Resource not found'})
+            if target in self.resources and not overwrite or parent_of(target) not in self.resources:
+                return handler.send_json(409, {'message': 'Conflict'})
+            self._move(source, target)
+        handler.send_json(201, {'href': f'{self.url}?path=disk:{target}', 'method': 'GET'})
+
+    def _get_v1_disk_resources_download(self, handler: 'RequestHandler', query: dict) -> None:
+        path = normalize_path(query['path'])
+        with self._lock:
+            if path not in self.contents:
+                return handler.send_json(404, {'message': 'Resource not found'})
+        handler.send_json(200, {'href': f'{self.base_url}/download-target?path={path}', 'method': 'GET',
+                                'templated': False})
+
+    def _get_download_target(self, handler: 'RequestHandler', query: dict) -> None:
+        with self._lock:
+            data = self.contents.get(normalize_path(query['path']))
+        if data is None:
+            return handler.send_json(404, {'message': 'Resource not found'})
+        status, start, end = 200, 0, len(data)
+        requested = handler.headers.get('Range', '')
+        if requested.startswith('bytes='):
+            first, _, last = requested[6:].partition('-')
+            status, start, end = 206, int(first), min(int(last) + 1 if last else len(data), len(data))
+        handler.send_response(status)
+        handler.send_header('Content-Length', str(end - start))
+        if status == 206:
+            handler.send_header('Content-Range', f'bytes {start}-{end - 1}/{len(data)}')
+        handler.end_headers()
+        handler.wfile.write(data[start:end])
+        with self._lock:
+            self.bytes_sent += end - start
+
+
+    @staticmethod
+    def _webdav_path(url: str) -> str:
+        return normalize_path(unquote(urlparse(url).path)[len(WEBDAV_PREFIX):])
+
+    def _put_webdav(self, handler: 'RequestHandler', query: dict) -> None:
+        path = self._webdav_path(handler.path)
+        if 'Content-Length' not in handler.headers:
+            handler.discard_body()
+            return handler.send_empty(411)
+        length = int(handler.headers['Content-Length'])
+        key = (handler.headers.get('Etag', ''), handler.headers.get('Sha256', ''), int(handler.headers.get('Size', -1)))
+        with self._lock:
+            status = 412 if handler.headers.get('If-None-Match') == '*' and path in self.resources else \
+                409 if parent_of(path) not in self.resources else None
+            known = key[2] == length and key in self._blobs
+        if status:
+            handler.discard_body()
+            return handler.send_empty(status)
+        if known:
+            handler.discard_body()
+            with self._lock:
+                self.bytes_received += length
+                self.deduplicated += 1
+                received = (length, key[0], key[1], self._blobs[key])
+        else:
+            received = self._receive(handler, length)
+            if received is None:
+                return
+        with self._lock:
+            if parent_of(path) not in self.resources:
+                return handler.send_empty(409)
+            self._store_file(path, *received)
+        handler.send_empty(201)
+
+    def _delete_webdav(self, handler: 'RequestHandler', query: dict) -> None:
+        path = self._webdav_path(handler.path)
+        with self._lock:
+            if path not in self.resources or path == '/':
+                return handler.send_empty(404)
+            self._remove(path)
+        handler.send_empty(204)
+
+    def _mkcol_webdav(self, handler: 'RequestHandler', query: dict) -> None:
+        path = self._webdav_path(handler.path)
+        handler.discard_body()
+        with self._lock:
+            if path in self.resources:
+                return handler.send_empty(405)
+            if parent_of(path) not in self.resources:
+                return handler.send_empty(409)
+            self._add(path, self._new_resource('dir'))
+        handler.send_empty(201)
+
+    def _move_webdav(self, handler: 'RequestHandler', query: dict) -> None:
+        source = self._webdav_path(handler.path)
+        target = self._webdav_path(handler.headers.get('Destination', ''))
+        with self._lock:
+            if source not in self.resources:
+                return handler.send_empty(404)
+            if target in self.resources and handler.headers.get('Overwrite', 'T') == 'F':
+                return handler.send_empty(412)
+            if parent_of(target) not in self.resources:
+                return handler.send_empty(409)
+            self._move(source, target)
+        handler.send_empty(201)
+
+    def _propfind_item(self, path: str) -> str:
+        resource = self.resources[path]
+        is_dir = resource['type'] == 'dir'
+        href = quote(WEBDAV_PREFIX + path.rstrip('/') + ('/' if is_dir else ''))
+        modified = format_datetime(datetime.fromisoformat(resource['modified']), usegmt=True)
+        properties = f'<d:getlastmodified>{modified}</d:getlastmodified>'
+        if is_dir:
+            properties += '<d:resourcetype><d:collection/></d:resourcetype>'
+        else:
+            properties += (f'<d:resourcetype/><d:getcontentlength>{resource["size"]}</d:getcontentlength>'
+                           f'<d:getetag>"{resource["md5"]}"</d:getetag>')
+        return (f'<d:response><d:href>{escape(href)}</d:href><d:propstat><d:prop>{properties}</d:prop>'
+                f'<d:status>HTTP/1.1 200 OK</d:status></d:propstat></d:response>')
+
+    def _propfind_webdav(self, handler: 'RequestHandler', query: dict) -> None:
+        path = self._webdav_path(handler.path)
+        handler.discard_body()
+        with self._lock:
+            if path not in self.resources:
+                return handler.send_empty(404)
+            paths = [path] + (self._children_of(path) if handler.headers.get('Depth', '1') != '0' else [])
+            body = ''.join(self._propfind_item(current) for current in paths)
+        handler.send_body(207, f'<?xml version="1.0" encoding="utf-8"?><d:multistatus xmlns:d="DAV:">{body}'
+                               f'</d:multistatus>'.encode(), 'application/xml; charset=utf-8')
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """Обработчик запросов к FakeYandexDisk с поддержкой keep-alive."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    fake_disk: FakeYandexDisk = None
+
+    def do_GET(self) -> None:
+        self.fake_disk.handle(self, 'GET')
+
+    def do_PUT(self) -> None:
+        self.fake_disk.handle(self, 'PUT')
+
+    def do_POST(self) -> None:
+        self.fake_disk.handle(self, 'POST')
+
+    def do_DELETE(self) -> None:
+        self.fake_disk.handle(self, 'DELETE')
+
+    def do_MKCOL(self) -> None:
+        self.fake_disk.handle(self, 'MKCOL')
+
+    def do_MOVE(self) -> None:
+        self.fake_disk.handle(self, 'MOVE')
+
+    def do_PROPFIND(self) -> None:
+        self.fake_disk.handle(self, 'PROPFIND')
+
+    def discard_body(self) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        while length > 0:
+            chunk = self.rfile.read(min(READ_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+
+    def send_json(self, status: int, body: dict, headers: Optional[dict] = None) -> None:
+        self.send_body(status, json.dumps(body).encode(), 'application/json', headers)
+
+    def send_body(self, status: int, data: bytes, content_type: str, headers: Optional[dict] = None) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_empty(self, status: int) -> None:
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format: str, *args) -> None:
+        pass
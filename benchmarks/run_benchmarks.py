@@ -0,0 +1,228 @@
+"""Бенчмарки цикла синхронизации на локальной замене API Яндекс.Диска.
+
+Пример запуска:
+    python3 benchmarks/run_benchmarks.py --files 1000 --latency 0.02
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from loguru import logger
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from api_clients.http_client import HttpClient
+from api_clients.transports import TRANSPORT_OPERATIONS
+from api_clients.yandex_req import YandexDisk
+from modules.file_index import FileIndex
+from modules.local_scanner import LocalScanner
+from modules.operation_journal import OperationJournal, journal_file_for
+from modules.synchroniser import Synchroniser
+from modules.transfer_executor import TransferExecutor
+from modules.transfer_scheduler import AimdLimiter
+from modules.watcher import MODIFIED
+
+from fake_yandex_disk import FakeYandexDisk
+from tree_generator import add_noise_files, copy_files, generate_tree, modify_files, rename_files
+
+
+REMOTE_FOLDER = '/Backup'
+
+
+def measure(name: str, disk: FakeYandexDisk, action, trace_memory: bool) -> dict:
+    """Функция выполняет сценарий и собирает его показатели.
+
+    :param name: название сценария.
+    :type name: str
+    :param disk: локальная замена API.
+    :type disk: FakeYandexDisk
+    :param action: функция, выполняющая сценарий.
+    :type action: Callable
+    :param trace_memory: измерять ли пик памяти Python через tracemalloc.
+    :type trace_memory: bool
+    :return: показатели сценария.
+    :rtype: dict
+    """
+    disk.reset_stats()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    action()
+    wall_time = time.perf_counter() - start
+    peak_memory = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    if trace_memory:
+        tracemalloc.stop()
+    return {'scenario': name,
+            'wall_time': round(wall_time, 3),
+            'requests': disk.total_requests(),
+            'requests_by_endpoint': dict(disk.requests),
+            'bytes_sent': disk.bytes_received,
+            'bytes_received': disk.bytes_sent,
+            'deduplicated': disk.deduplicated,
+            'peak_python_memory': peak_memory,
+            'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+
+
+def snapshot_memory(root: str, connect: YandexDisk, index_file: str) -> dict:
+    """Функция измеряет память, которую занимают снимки дерева файлов и индекс, в пересчёте на один файл.
+
+    Локальное дерево сканируется заново без кэша директорий, список файлов
+    облака запрашивается заново без кэша ревизии, а индекс загружается из базы
+    заново. Учитывается память Python, оставшаяся занятой после построения снимка.
+
+    :param root: путь к синхронизируемой директории.
+    :type root: str
+    :param connect: клиент API, список файлов которого запрашивается.
+    :type connect: YandexDisk
+    :param index_file: путь к файлу индекса.
+    :type index_file: str
+    :return: число байт на локальный файл, на файл в облаке и на файл в индексе.
+    :rtype: dict
+    """
+    tracemalloc.start()
+    local_files = LocalScanner(root).scan()[0]
+    local_memory = tracemalloc.get_traced_memory()[0]
+    remote_files = connect.get_info(recursive=True)
+    remote_memory = tracemalloc.get_traced_memory()[0] - local_memory
+    index = FileIndex(index_file)
+    index_memory = tracemalloc.get_traced_memory()[0] - local_memory - remote_memory
+    tracemalloc.stop()
+    index.close()
+    return {'local_bytes_per_file': round(local_memory / max(1, len(local_files))),
+            'remote_bytes_per_file': round(remote_memory / max(1, len(remote_files or ()))),
+            'index_bytes_per_file': round(index_memory / max(1, len(index)))}
+
+
+def run(arguments: argparse.Namespace) -> list:
+    """Функция запускает все сценарии: первая синхронизация, цикл после неё (облако изменено
+    собственными загрузками, поэтому список файлов запрашивается заново), холостой цикл, изменение
+    доли файлов, массовое переименование и копирование доли файлов под новыми именами. После холостого цикла измеряется память снимков
+    локального дерева и списка файлов облака и индекса на один файл. В режиме two_way дополнительно измеряется
+    скачивание доли файлов, изменённых в облаке другим клиентом. Сценарий noise создаёт
+    временные и исключённые файлы и файл, открытый на запись, которые не должны
+    загружаться, а сценарий settled загружает этот файл после закрытия. Последний сценарий
+    записывает в журнал несколько изменений доли файлов, имитирует аварийное завершение
+    программы до их обработки и измеряет повтор журнала после перезапуска.
+
+    :return: список показателей сценариев.
+    :rtype: list
+    """
+    disk = FakeYandexDisk(latency=arguments.latency, bandwidth=arguments.bandwidth,
+                          throttle_rate=arguments.throttle, keep_content=arguments.sync_mode == 'two_way').start()
+    disk.mkdirs(REMOTE_FOLDER)
+    with tempfile.TemporaryDirectory() as workdir:
+        root = os.path.join(workdir, 'tree')
+        os.makedirs(root)
+        paths = generate_tree(root, arguments.files)
+        connect = YandexDisk(token='benchmark', path_to_the_folder=REMOTE_FOLDER, url=disk.url,
+                             client=HttpClient(backoff=0.05), webdav_url=disk.webdav_url,
+                             webdav_operations=arguments.webdav_operations)
+        index = FileIndex(os.path.join(workdir, 'index.sqlite3'))
+        journal = OperationJournal(journal_file_for(index.index_file))
+        limiter = AimdLimiter(arguments.workers)
+        connect.client.add_listener(limiter.record)
+        executor = TransferExecutor(arguments.workers, limiter=limiter)
+        synchroniser = Synchroniser(connect, root, index, executor, sync_mode=arguments.sync_mode, journal=journal)
+
+        results = [measure('cold', disk, synchroniser.full_synchronization, arguments.trace_memory),
+                   measure('relist', disk, synchroniser.full_synchronization, arguments.trace_memory),
+                   measure('idle', disk, synchroniser.full_synchronization, arguments.trace_memory)]
+        results[-1].update(snapshot_memory(root, YandexDisk(token='benchmark', path_to_the_folder=REMOTE_FOLDER,
+                                                            url=disk.url, client=connect.client,
+                                                            webdav_url=disk.webdav_url,
+                                                            webdav_operations=arguments.webdav_operations),
+                                      index.index_file))
+        modify_files(root, paths, arguments.churn)
+        results.append(measure('churn', disk, synchroniser.full_synchronization, arguments.trace_memory))
+        paths = rename_files(root, paths, arguments.rename)
+        results.append(measure('rename', disk, synchroniser.full_synchronization, arguments.trace_memory))
+        paths.extend(copy_files(root, paths, arguments.churn * 5))
+        results.append(measure('copy', disk, synchroniser.full_synchronization, arguments.trace_memory))
+        if arguments.sync_mode == 'two_way':
+            pulled = {path: os.urandom(len(path) * 100) for path in paths[::max(1, int(1 / arguments.churn))]}
+            for path, data in pulled.items():
+                disk.put_file(f'{REMOTE_FOLDER}/{path}', data)
+            results.append(measure('pull', disk, synchroniser.full_synchronization, arguments.trace_memory))
+            for path, data in pulled.items():
+                with open(os.path.join(root, path), 'rb') as file:
+                    if file.read() != data:
+                        logger.error(f"Файл {path}, изменённый в облаке, не скачан.")
+
+        noise = add_noise_files(root, paths, arguments.churn * 10)
+        growing_path = 'growing.log'
+        with open(os.path.join(root, growing_path), 'wb') as growing:
+            growing.write(os.urandom(64 * 1024))
+            growing.flush()
+            results.append(measure('noise', disk, synchroniser.full_synchronization, arguments.trace_memory))
+        results[-1]['ignored_files'] = noise
+        results.append(measure('settled', disk, synchroniser.full_synchronization, arguments.trace_memory))
+        paths.append(growing_path)
+
+        for _ in range(arguments.edits):
+            edited = modify_files(root, paths, arguments.churn, seed=3)
+            synchroniser.record_events([(path, MODIFIED) for path in edited])
+        journal.close()
+        journal = OperationJournal(journal_file_for(index.index_file))
+        restarted = Synchroniser(connect, root, index, executor, sync_mode=arguments.sync_mode, journal=journal)
+        results.append(measure('replay', disk, restarted.replay_journal, arguments.trace_memory))
+        results[-1].update(journal_operations=arguments.edits * len(edited), journal_entries=len(edited))
+        if len(journal):
+            logger.error(f"После повтора в журнале осталось {len(journal)} операций.")
+        journal.close()
+
+        remote_files = sum(1 for path, item in disk.resources.items() if item['type'] == 'file'
+                           and not path.endswith('/.syncignore'))
+        if remote_files != len(paths):
+            logger.error(f"После синхронизации в облаке {remote_files} файлов вместо {len(paths)}.")
+        executor.shutdown()
+        index.close()
+    disk.stop()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=1000, help='число файлов в синтетическом дереве')
+    parser.add_argument('--latency', type=float, default=0.0, help='задержка ответа сервера в секундах')
+    parser.add_argument('--bandwidth', type=int, default=0, help='скорость приёма файлов в байтах в секунду')
+    parser.add_argument('--throttle', type=float, default=0.0, help='доля запросов с ответом 429')
+    parser.add_argument('--workers', type=int, default=4, help='наибольшее число одновременных загрузок')
+    parser.add_argument('--churn', type=float, default=0.01, help='доля изменяемых файлов')
+    parser.add_argument('--rename', type=float, default=0.1, help='доля переименовываемых файлов')
+    parser.add_argument('--edits', type=int, default=5,
+                        help='число изменений каждого файла, записанных в журнал перед имитацией сбоя')
+    parser.add_argument('--sync-mode', default='upload', choices=('upload', 'two_way'), help='режим синхронизации')
+    parser.add_argument('--webdav-operations', type=lambda value: [item for item in value.split(',') if item],
+                        default=[], help=f'операции через WebDAV через запятую: {",".join(TRANSPORT_OPERATIONS)}')
+    parser.add_argument('--trace-memory', action='store_true', help='измерять пик памяти через tracemalloc')
+    parser.add_argument('--json', help='путь к файлу для сохранения результатов в формате JSON')
+    arguments = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+    results = run(arguments)
+
+    print(f"{'сценарий':<10}{'время, с':>12}{'запросов':>12}{'отправлено, байт':>20}{'пик памяти, байт':>20}"
+          f"{'дедупликация':>14}")
+    for result in results:
+        print(f"{result['scenario']:<10}{result['wall_time']:>12}{result['requests']:>12}"
+              f"{result['bytes_sent']:>20}{result['peak_python_memory'] or '-':>20}{result['deduplicated']:>14}")
+    idle = next(result for result in results if result['scenario'] == 'idle')
+    print(f"снимки: {idle['local_bytes_per_file']} байт на локальный файл, "
+          f"{idle['remote_bytes_per_file']} байт на файл в облаке, {idle['index_bytes_per_file']} байт на файл "
+          f"в индексе")
+    replay = results[-1]
+    print(f"журнал: {replay['journal_operations']} операций объединены в {replay['journal_entries']} записей, "
+          f"повтор после сбоя за {replay['wall_time']} с")
+    if arguments.json:
+        with open(arguments.json, 'w') as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+import os
+import random
+import shutil
+
+from typing import List, Tuple
+
+
+SIZE_MIX: List[Tuple[float, int, int]] = [(0.90, 0, 4 * 1024),
+                                         (0.09, 4 * 1024, 256 * 1024),
+                                         (0.01, 1024 * 1024, 4 * 1024 * 1024)]
+FILES_PER_DIRECTORY = 100
+DIRECTORIES_PER_LEVEL = 10
+
+
+def _random_size(generator: random.Random) -> int:
+    point = generator.random()
+    for share, low, high in SIZE_MIX:
+        if point < share:
+            return generator.randint(low, high)
+        point -= share
+    return SIZE_MIX[-1][2]
+
+
+def _write_file(path: str, number: int, size: int, block: bytes, generator: random.Random) -> None:
+    header = f"{number}:{generator.random()}\n".encode()
+    with open(path, 'wb') as file:
+        file.write(header[:size])
+        left = size - min(len(header), size)
+        while left:
+            offset = generator.randrange(len(block) - min(left, len(block)) + 1)
+            chunk = block[offset:offset + min(left, len(block))]
+            file.write(chunk)
+            left -= len(chunk)
+
+
+def generate_tree(root: str, files: int, seed: int = 0) -> List[str]:
+    """Функция создаёт синтетическое дерево файлов со смесью размеров из SIZE_MIX.
+
+    Файлы раскладываются по FILES_PER_DIRECTORY в директории двух уровней
+    вложенности. Содержимое каждого файла уникально.
+
+    :param root: путь к корню дерева.
+    :type root: str
+    :param files: число файлов.
+    :type files: int
+    :param seed: начальное значение генератора случайных чисел.
+    :type seed: int
+    :return: список путей созданных файлов относительно корня.
+    :rtype: list
+    """
+    generator = random.Random(seed)
+    block = generator.randbytes(8 * 1024 * 1024)
+    paths = []
+    for number in range(files):
+        directory = number // FILES_PER_DIRECTORY
+        relative_directory = f"d{directory // DIRECTORIES_PER_LEVEL}/s{directory % DIRECTORIES_PER_LEVEL}"
+        os.makedirs(os.path.join(root, relative_directory), exist_ok=True)
+        path = f"{relative_directory}/f{number}.bin"
+        _write_file(os.path.join(root, path), number, _random_size(generator), block, generator)
+        paths.append(path)
+    return paths
+
+
+def modify_files(root: str, paths: List[str], share: float, seed: int = 1) -> List[str]:
+    """Функция перезаписывает содержимое случайной доли файлов.
+
+    :return: список изменённых файлов.
+    :rtype: list
+    """
+    generator = random.Random(seed)
+    block = generator.randbytes(1024 * 1024)
+    changed = generator.sample(paths, max(1, int(len(paths) * share)))
+    for number, path in enumerate(changed):
+        absolute_path = os.path.join(root, path)
+        _write_file(absolute_path, -number - 1, os.path.getsize(absolute_path) or 1, block, generator)
+    return changed
+
+
+def rename_files(root: str, paths: List[str], share: float, seed: int = 2) -> List[str]:
+    """Функция переименовывает случайную долю файлов, сохраняя их в тех же директориях.
+
+    :return: обновлённый список путей файлов.
+    :rtype: list
+    """
+    generator = random.Random(seed)
+    renamed = set(generator.sample(range(len(paths)), max(1, int(len(paths) * share))))
+    result = []
+    for number, path in enumerate(paths):
+        if number in renamed:
+            new_path = path.replace('.bin', '.renamed.bin')
+            os.rename(os.path.join(root, path), os.path.join(root, new_path))
+            path = new_path
+        result.append(path)
+    return result
+
+
+def copy_files(root: str, paths: List[str], share: float, seed: int = 5) -> List[str]:
+    """Функция копирует случайную долю файлов под новыми именами в тех же директориях.
+
+    :return: список путей созданных копий.
+    :rtype: list
+    """
+    generator = random.Random(seed)
+    copies = []
+    for path in generator.sample(paths, max(1, int(len(paths) * share))):
+        copy_path = path.replace('.bin', '.copy.bin')
+        shutil.copyfile(os.path.join(root, path), os.path.join(root, copy_path))
+        copies.append(copy_path)
+    return copies
+
+
+def add_noise_files(root: str, paths: List[str], share: float, seed: int = 4) -> int:
+    """Функция создаёт рядом со случайной долей файлов временные файлы редактора и
+    директорию сборки, исключённую файлом .syncignore в корне дерева.
+
+    :return: число созданных файлов, которые не должны загружаться.
+    :rtype: int
+    """
+    generator = random.Random(seed)
+    with open(os.path.join(root, '.syncignore'), 'w') as file:
+        file.write('build/\n')
+    created = 0
+    for path in generator.sample(paths, max(1, int(len(paths) * share))):
+        absolute_path = os.path.join(root, path)
+        for noise_path in (absolute_path + '.swp', absolute_path + '~'):
+            with open(noise_path, 'wb') as file:
+                file.write(generator.randbytes(4096))
+            created += 1
+        build_directory = os.path.join(os.path.dirname(absolute_path), 'build')
+        os.makedirs(build_directory, exist_ok=True)
+        with open(os.path.join(build_directory, os.path.basename(path) + '.o'), 'wb') as file:
+            file.write(generator.randbytes(64 * 1024))
+        created += 1
+    return created
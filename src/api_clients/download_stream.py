@@ -0,0 +1,150 @@
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from api_clients.http_client import HttpClient
+from modules.hashing import compute_file_hashes
+
+
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+RANGE_DOWNLOAD_THRESHOLD = 32 * 1024 * 1024
+RANGE_PARTS = 4
+PART_SUFFIX = '.yadisk-part'
+
+
+class RangeNotSupported(Exception):
+    """Сервер вернул файл целиком в ответ на запрос части файла."""
+
+
+class Segment:
+    """Непрерывный участок скачиваемого файла.
+
+    Attributes:
+        start (int): Смещение начала участка.
+        end (int): Смещение конца участка (не включительно).
+        position (int): Смещение, до которого участок уже записан.
+    """
+
+    def __init__(self, start: int, end: int) -> None:
+        self.start = start
+        self.end = end
+        self.position = start
+
+    @property
+    def done(self) -> bool:
+        return self.position >= self.end
+
+
+class DownloadStream:
+    """Скачивание файла во временный файл с проверкой хеша и атомарной заменой.
+
+    Файл записывается блоками DOWNLOAD_CHUNK_SIZE во временный файл с суффиксом
+    PART_SUFFIX рядом с целевым. Файлы не меньше RANGE_DOWNLOAD_THRESHOLD делятся
+    на RANGE_PARTS участков, которые скачиваются параллельно запросами с заголовком
+    Range. Для каждого участка запоминается записанная часть, поэтому после обрыва
+    соединения повторная попытка докачивает только недостающие байты. Готовый файл
+    сверяется с MD5 или SHA256 из облака и переименовывается на место целевого
+    через os.replace, поэтому другие программы никогда не видят файл частично.
+
+    Args:
+        client (HttpClient): HTTP клиент.
+        path (str): Путь к целевому файлу.
+        size (int): Размер файла в облаке в байтах.
+
+    Attributes:
+        path (str): Путь к целевому файлу.
+        temp_path (str): Путь к временному файлу.
+        size (int): Размер файла в байтах.
+        segments (list): Участки файла.
+    """
+
+    def __init__(self, client: HttpClient, path: str, size: int) -> None:
+        self.client = client
+        self.path = path
+        self.temp_path = path + PART_SUFFIX
+        self.size = size
+        self.segments = self._split(RANGE_PARTS if size >= RANGE_DOWNLOAD_THRESHOLD else 1)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(self.temp_path, 'wb') as file:
+            file.truncate(size)
+
+    def _split(self, parts: int) -> List[Segment]:
+        step = -(-self.size // parts) if self.size else 1
+        return [Segment(start, min(start + step, self.size)) for start in range(0, self.size, step)] or [Segment(0, 0)]
+
+    @property
+    def done(self) -> bool:
+        return all(segment.done for segment in self.segments)
+
+    def _fetch_segment(self, href: str, segment: Segment) -> None:
+        headers = {}
+        ranged = segment.position > 0 or segment.end < self.size
+        if ranged:
+            headers['Range'] = f'bytes={segment.position}-{segment.end - 1}'
+        with self.client.get(href, headers=headers, stream=True, endpoint='GET download', retry=False) as response:
+            if response.status_code not in (200, 206):
+                raise ConnectionError(f"{response.status_code} {response.reason}")
+            if ranged and response.status_code == 200:
+                raise RangeNotSupported()
+            with open(self.temp_path, 'r+b') as file:
+                file.seek(segment.position)
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    chunk = chunk[:segment.end - segment.position]
+                    file.write(chunk)
+                    segment.position += len(chunk)
+                    if segment.done:
+                        break
+        if not segment.done:
+            raise ConnectionError("соединение закрыто до окончания передачи")
+
+    def fetch(self, href: str) -> None:
+        """Метод скачивает недостающие участки файла по ссылке href.
+
+        Если сервер отвечает на запрос части файла файлом целиком, участки
+        сбрасываются и файл скачивается заново с нулевого байта.
+
+        :param href: ссылка на скачивание.
+        :type href: str
+        :raise ConnectionError: если хотя бы один участок не удалось скачать.
+        """
+        segments = [segment for segment in self.segments if not segment.done]
+        if not segments:
+            return
+        try:
+            if len(segments) == 1:
+                self._fetch_segment(href, segments[0])
+                return
+            with ThreadPoolExecutor(max_workers=len(segments), thread_name_prefix="range") as pool:
+                for future in [pool.submit(self._fetch_segment, href, segment) for segment in segments]:
+                    future.result()
+        except RangeNotSupported:
+            self.segments = [Segment(0, self.size)]
+            self._fetch_segment(href, self.segments[0])
+
+    def commit(self, md5: Optional[str] = None, sha256: Optional[str] = None,
+               modified: Optional[int] = None) -> None:
+        """Метод проверяет хеш скачанного файла и атомарно заменяет им целевой файл.
+
+        :param md5: MD5 файла в облаке.
+        :type md5: str
+        :param sha256: SHA256 файла в облаке, проверяется при отсутствии MD5.
+        :type sha256: str
+        :param modified: время модификации файла в облаке в секундах, которое
+                         устанавливается скачанному файлу.
+        :type modified: int
+        :raise ValueError: если хеш скачанного файла не совпал с хешем в облаке.
+        """
+        actual_md5, actual_sha256 = compute_file_hashes(self.temp_path)
+        if md5 and actual_md5 != md5 or not md5 and sha256 and actual_sha256 != sha256:
+            raise ValueError("хеш скачанного файла не совпадает с хешем в облаке")
+        if modified is not None:
+            os.utime(self.temp_path, (modified, modified))
+        os.replace(self.temp_path, self.path)
+
+    def discard(self) -> None:
+        """Метод удаляет временный файл."""
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,217 @@
+import random
+import threading
+import time
+import requests
+
+from email.utils import parsedate_to_datetime
+from loguru import logger
+from requests.adapters import HTTPAdapter
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from modules.metrics import METRICS, Metrics
+
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class EndpointStats:
+    """Статистика запросов к одному адресу API.
+
+    Attributes:
+        requests (int): Число выполненных запросов.
+        errors (int): Число запросов, завершившихся ошибкой соединения или статусом 5xx.
+        throttled (int): Число ответов 429.
+        total_time (float): Суммарное время ответа в секундах.
+        max_time (float): Максимальное время ответа в секундах.
+    """
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def record(self, duration: float, status_code: Optional[int]) -> None:
+        """Метод учитывает выполненный запрос.
+
+        :param duration: время ответа в секундах.
+        :type duration: float
+        :param status_code: код ответа или None при ошибке соединения.
+        :type status_code: int
+        """
+        self.requests += 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+        if status_code is None or status_code >= 500:
+            self.errors += 1
+        elif status_code == 429:
+            self.throttled += 1
+
+    def as_dict(self) -> dict:
+        """Метод возвращает статистику в виде словаря."""
+        return {"requests": self.requests,
+                "errors": self.errors,
+                "throttled": self.throttled,
+                "avg_time": self.total_time / self.requests if self.requests else 0.0,
+                "max_time": self.max_time}
+
+
+class HttpClient:
+    """Общий HTTP клиент с пулом соединений для запросов к облачному хранилищу.
+
+    Соединения с cloud-api.yandex.net и серверами загрузки переиспользуются между
+    запросами и потоками. Ответы 429 и 5xx повторяются с экспоненциальной задержкой,
+    при этом учитывается заголовок Retry-After. Задержка не превышает max_delay:
+    если сервер просит ждать дольше, используется обычная экспоненциальная задержка,
+    чтобы один ответ не занимал поток передачи на часы.
+
+    Args:
+        pool_maxsize (int): Максимальное число соединений с одним хостом.
+        max_retries (int): Максимальное число повторов запроса.
+        backoff (float): Начальная задержка перед повтором в секундах.
+        timeout (float): Таймаут соединения и чтения в секундах.
+        metrics (Metrics): Реестр метрик, по умолчанию общий для всего приложения.
+        max_delay (float): Максимальная задержка перед повтором в секундах.
+
+    Attributes:
+        session (requests.Session): Сессия с пулом соединений.
+        max_retries (int): Максимальное число повторов запроса.
+        backoff (float): Начальная задержка перед повтором в секундах.
+        timeout (float): Таймаут соединения и чтения в секундах.
+        max_delay (float): Максимальная задержка перед повтором в секундах.
+    """
+
+    def __init__(self, pool_maxsize: int = 16, max_retries: int = 5,
+                 backoff: float = 0.5, timeout: float = 60, metrics: Metrics = METRICS,
+                 max_delay: float = 60) -> None:
+        self.metrics = metrics
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._stats: Dict[str, EndpointStats] = {}
+        self._listeners: List[Callable[[str, float, Optional[int]], None]] = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener: Callable[[str, float, Optional[int]], None]) -> None:
+        """Метод добавляет обработчик, вызываемый после каждого запроса.
+
+        :param listener: функция, принимающая имя адреса, время ответа и код ответа
+                         (None при ошибке соединения).
+        :type listener: Callable
+        """
+        self._listeners.append(listener)
+
+    def _record(self, endpoint: str, duration: float, status_code: Optional[int]) -> None:
+        with self._lock:
+            self._stats.setdefault(endpoint, EndpointStats()).record(duration, status_code)
+        self.metrics.observe('synchroniser_api_request_seconds', duration, endpoint=endpoint)
+        self.metrics.inc('synchroniser_api_requests_total', endpoint=endpoint)
+        if status_code is None or status_code >= 500:
+            self.metrics.inc('synchroniser_api_errors_total', endpoint=endpoint)
+        elif status_code == 429:
+            self.metrics.inc('synchroniser_api_throttled_total', endpoint=endpoint)
+        for listener in self._listeners:
+            listener(endpoint, duration, status_code)
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """Функция вычисляет задержку перед повтором запроса.
+
+        param attempt (int): Номер попытки, начиная с нуля.
+        param response (requests.Response): Ответ сервера или None при ошибке соединения.
+        return float: Задержка в секундах.
+        """
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        delay = None
+        if retry_after:
+            try:
+                delay = max(float(retry_after), 0.0)
+            except ValueError:
+                try:
+                    delay = max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0)
+                except (TypeError, ValueError):
+                    pass
+        if delay is not None and delay <= self.max_delay:
+            return delay
+        return min(self.backoff * 2 ** attempt * (1 + random.random() / 2), self.max_delay)
+
+    def request(self, method: str, url: str, endpoint: Optional[str] = None,
+                retry: bool = True, **kwargs) -> requests.Response:
+        """Метод выполняет HTTP запрос через общий пул соединений.
+
+        :param method: HTTP метод.
+        :type method: str
+        :param url: адрес запроса.
+        :type url: str
+        :param endpoint: имя адреса для статистики, по умолчанию метод и путь запроса.
+        :type endpoint: str
+        :param retry: повторять ли запрос при ответах 429, 5xx и ошибках соединения.
+                      Запросы с потоковым телом повторять нельзя.
+        :type retry: bool
+        :return: ответ сервера.
+        :rtype: requests.Response
+        """
+        endpoint = endpoint or f"{method.upper()} {urlparse(url).path}"
+        kwargs.setdefault("timeout", self.timeout)
+        attempts = self.max_retries + 1 if retry else 1
+        for attempt in range(attempts):
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as ex:
+                self._record(endpoint, time.perf_counter() - start, None)
+                if attempt + 1 >= attempts:
+                    raise
+                delay = self._retry_delay(attempt, None)
+                logger.warning(f"{endpoint}: ошибка соединения ({ex}), повтор через {delay:.1f} с.")
+            else:
+                self._record(endpoint, time.perf_counter() - start, response.status_code)
+                if response.status_code not in RETRY_STATUSES or attempt + 1 >= attempts:
+                    return response
+                delay = self._retry_delay(attempt, response)
+                logger.warning(f"{endpoint}: ответ {response.status_code}, повтор через {delay:.1f} с.")
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def get_stats(self) -> Dict[str, dict]:
+        """Метод возвращает статистику запросов по адресам API.
+
+        :return: словарь {адрес: статистика}.
+        :rtype: dict
+        """
+        with self._lock:
+            return {endpoint: stats.as_dict() for endpoint, stats in self._stats.items()}
+
+
+_shared_client: Optional[HttpClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Функция возвращает общий для всего приложения HTTP клиент.
+
+    :return: HTTP клиент с пулом соединений.
+    :rtype: HttpClient
+    """
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient()
+        return _shared_client
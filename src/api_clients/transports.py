@@ -0,0 +1,364 @@
+import requests
+
+from abc import ABC, abstractmethod
+from email.utils import parsedate_to_datetime
+from loguru import logger
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote, urlparse
+from xml.etree import ElementTree
+
+from api_clients.http_client import RETRY_STATUSES
+from api_clients.upload_stream import UploadStream
+from modules.hashing import compute_file_hashes
+
+
+WEBDAV_URL = 'https://webdav.yandex.ru'
+UPLOAD_ATTEMPTS = 3
+LIST_PAGE_LIMIT = 1000
+ITEM_FIELDS = ('name', 'path', 'type', 'size', 'md5', 'sha256', 'modified')
+LIST_FIELDS = ','.join(['_embedded.total'] + [f'_embedded.items.{field}' for field in ITEM_FIELDS])
+
+UPLOAD = 'upload'
+DELETE = 'delete'
+MOVE = 'move'
+MKDIR = 'mkdir'
+LIST = 'list'
+TRANSPORT_OPERATIONS = (UPLOAD, DELETE, MOVE, MKDIR, LIST)
+
+DAV_NAMESPACE = {'d': 'DAV:'}
+PROPFIND_BODY = ('<?xml version="1.0" encoding="utf-8"?>'
+                 '<d:propfind xmlns:d="DAV:"><d:prop>'
+                 '<d:resourcetype/><d:getcontentlength/><d:getlastmodified/><d:getetag/>'
+                 '</d:prop></d:propfind>')
+
+FolderItems = Tuple[Dict[str, List[Tuple[str, dict]]], List[str]]
+
+
+def _log_upload(disk, stream: UploadStream, file_name: str) -> None:
+    elapsed = stream.elapsed()
+    disk.client.metrics.inc('synchroniser_uploaded_bytes_total', stream.size)
+    disk.client.metrics.inc('synchroniser_upload_seconds_total', elapsed)
+    logger.debug(f"Файл {file_name}: {stream.size} байт за {elapsed:.2f} с "
+                 f"({stream.size / elapsed if elapsed else 0:.0f} байт/с).")
+
+
+def _error_message(response: requests.Response) -> str:
+    try:
+        return f"{response.status_code} {response.json()['message']}"
+    except (ValueError, KeyError, TypeError):
+        return f"{response.status_code} {response.reason}"
+
+
+class Transport(ABC):
+    """Способ выполнения операций с файлами облачного хранилища.
+
+    Методы возвращают управление при успехе и вызывают ConnectionError с описанием
+    ошибки при неудаче, а запись в журнал выполняет YandexDisk. Класс абстрактный:
+    способ, в котором не реализована одна из операций, нельзя создать.
+
+    Args:
+        disk (YandexDisk): Клиент, для которого выполняются запросы.
+
+    Attributes:
+        name (str): Название способа для журнала и настроек.
+        uses_hashes (bool): Нужны ли способу хеши загружаемого файла.
+        disk (YandexDisk): Клиент, для которого выполняются запросы.
+    """
+    name = ''
+    uses_hashes = False
+
+    def __init__(self, disk) -> None:
+        self.disk = disk
+
+    @abstractmethod
+    def upload(self, path: str, file_name: str, overwrite: bool,
+               hashes: Optional[Tuple[str, str]] = None) -> None:
+        """Метод загружает файл в хранилище.
+
+        :param path: путь к файлу на локальной машине.
+        :type path: str
+        :param file_name: путь к файлу относительно синхронизируемой директории.
+        :type file_name: str
+        :param overwrite: перезаписать ли существующий файл.
+        :type overwrite: bool
+        :param hashes: MD5 и SHA256 файла, если они уже известны.
+        :type hashes: tuple
+        :raise ConnectionError: если файл не удалось загрузить.
+        """
+
+    @abstractmethod
+    def delete(self, file_name: str, permanently: str) -> None:
+        """Метод удаляет файл или папку из хранилища.
+
+        :param file_name: путь относительно синхронизируемой директории.
+        :type file_name: str
+        :param permanently: "true", чтобы удалить без помещения в корзину.
+        :type permanently: str
+        :raise ConnectionError: если ресурс не удалось удалить.
+        """
+
+    @abstractmethod
+    def move(self, source: str, file_name: str, overwrite: bool) -> None:
+        """Метод перемещает ресурс в хранилище.
+
+        :param source: старый путь относительно синхронизируемой директории.
+        :type source: str
+        :param file_name: новый путь относительно синхронизируемой директории.
+        :type file_name: str
+        :param overwrite: перезаписать ли существующий ресурс.
+        :type overwrite: bool
+        :raise ConnectionError: если ресурс не удалось переместить.
+        """
+
+    @abstractmethod
+    def create_folder(self, folder: str) -> None:
+        """Метод создаёт папку, уже существующая папка не считается ошибкой.
+
+        :param folder: путь к папке относительно синхронизируемой директории.
+        :type folder: str
+        :raise ConnectionError: если папку не удалось создать.
+        """
+
+    @abstractmethod
+    def list_folders(self, folders: List[str]) -> FolderItems:
+        """Метод получает содержимое нескольких папок.
+
+        :param folders: пути папок относительно синхронизируемой директории.
+        :type folders: list
+        :return: словарь {папка: [(путь файла, ресурс в формате REST API)]} и список вложенных папок.
+        :rtype: tuple
+        :raise ConnectionError: если содержимое папки не удалось получить.
+        """
+
+
+class RestTransport(Transport):
+    """Операции через REST API Яндекс.Диска.
+
+    Загрузка файла требует двух запросов: получения ссылки на загрузку и передачи
+    содержимого по этой ссылке. Список папки запрашивается постранично.
+    """
+    name = 'rest'
+
+    def get_upload_link(self, file_name: str, overwrite: bool) -> dict:
+        """Метод запрашивает ссылку на загрузку файла.
+
+        :param file_name: путь к файлу относительно синхронизируемой директории.
+        :type file_name: str
+        :param overwrite: перезаписать ли существующий файл.
+        :type overwrite: bool
+        :return: словарь с данными о ссылке на загрузку файла.
+        :rtype: dict
+        :raise ConnectionError: если ссылку не удалось получить.
+        """
+        response = self.disk.client.get(f'{self.disk.url}/upload',
+                                        params={'path': self.disk.get_remote_path(file_name),
+                                                'overwrite': str(overwrite).lower()},
+                                        headers=self.disk.headers)
+        if response.status_code != 200:
+            raise ConnectionError(f"не удалось получить ссылку на загрузку: {_error_message(response)}")
+        return response.json()
+
+    def upload(self, path: str, file_name: str, overwrite: bool,
+               hashes: Optional[Tuple[str, str]] = None) -> None:
+        """Метод передаёт содержимое файла в теле PUT запроса без multipart-обёртки.
+
+        При обрыве соединения или ответе 429/5xx запрашивается новая ссылка на загрузку
+        и передача начинается заново, не более UPLOAD_ATTEMPTS раз.
+        """
+        for attempt in range(1, UPLOAD_ATTEMPTS + 1):
+            link = self.get_upload_link(file_name, overwrite)
+            with UploadStream(path, self.disk.upload_speed_limit, self.disk.bandwidth) as stream:
+                try:
+                    response = self.disk.client.put(link['href'], data=stream, endpoint='PUT upload', retry=False)
+                except (requests.ConnectionError, requests.Timeout) as ex:
+                    error = f"обрыв соединения: {ex}"
+                else:
+                    if response.status_code in (201, 202):
+                        _log_upload(self.disk, stream, file_name)
+                        return
+                    if response.status_code not in RETRY_STATUSES:
+                        raise ConnectionError(f"{response.status_code} {response.reason}")
+                    error = f"ответ {response.status_code}"
+            logger.warning(f"Загрузка файла {file_name} прервана ({error}), попытка {attempt} из {UPLOAD_ATTEMPTS}.")
+        raise ConnectionError(f"файл не загружен после {UPLOAD_ATTEMPTS} попыток")
+
+    def delete(self, file_name: str, permanently: str) -> None:
+        response = self.disk.client.delete(self.disk.url, params={'path': self.disk.get_remote_path(file_name),
+                                                                  'permanently': permanently},
+                                           headers=self.disk.headers)
+        if response.status_code not in (200, 202, 204):
+            raise ConnectionError(_error_message(response))
+
+    def move(self, source: str, file_name: str, overwrite: bool) -> None:
+        response = self.disk.client.post(f'{self.disk.url}/move',
+                                         params={'from': self.disk.get_remote_path(source),
+                                                 'path': self.disk.get_remote_path(file_name),
+                                                 'overwrite': str(overwrite).lower()},
+                                         headers=self.disk.headers)
+        if response.status_code not in (201, 202):
+            raise ConnectionError(_error_message(response))
+
+    def create_folder(self, folder: str) -> None:
+        response = self.disk.client.put(self.disk.url, params={'path': self.disk.get_remote_path(folder)},
+                                        headers=self.disk.headers)
+        if response.status_code not in (201, 409):
+            raise ConnectionError(_error_message(response))
+
+    def _get_folder_page(self, folder: str, offset: int) -> dict:
+        return self.disk.get_page(self.disk.url, {'path': self.disk.get_remote_path(folder), 'limit': LIST_PAGE_LIMIT,
+                                                  'offset': offset, 'fields': LIST_FIELDS})['_embedded']
+
+    def list_folders(self, folders: List[str]) -> FolderItems:
+        """Метод получает содержимое нескольких папок, запрашивая страницы параллельно.
+
+        Первые страницы всех папок запрашиваются одновременно, после чего по полю
+        total вычисляются и параллельно запрашиваются оставшиеся страницы.
+        """
+        pool = self.disk.request_pool
+        first_pages = list(pool.map(lambda folder: self._get_folder_page(folder, 0), folders))
+        requests_left = [(folder, offset) for folder, page in zip(folders, first_pages)
+                         for offset in range(LIST_PAGE_LIMIT, page['total'], LIST_PAGE_LIMIT)]
+        other_pages = pool.map(lambda item: self._get_folder_page(*item), requests_left)
+        pages = list(zip(folders, first_pages)) + [(folder, page) for (folder, _), page in zip(requests_left, other_pages)]
+        files, subfolders = {}, []
+        for folder, page in pages:
+            folder_files = files.setdefault(folder, [])
+            for item in page['items']:
+                path = f"{folder}/{item['name']}" if folder else item['name']
+                if item['type'] == 'dir':
+                    subfolders.append(path)
+                else:
+                    folder_files.append((path, item))
+        return files, subfolders
+
+
+class WebDavTransport(Transport):
+    """Операции через WebDAV интерфейс Яндекс.Диска.
+
+    Файл загружается одним PUT запросом без получения ссылки. В заголовках Etag,
+    Sha256 и Size передаются хеши и размер файла, по которым сервер может завершить
+    загрузку сразу, если такое содержимое у него уже есть. Удаление, перемещение и
+    создание папок выполняются методами DELETE, MOVE и MKCOL, а список папки -
+    запросом PROPFIND с глубиной 1. PROPFIND не сообщает SHA256 файлов, а MD5
+    берётся из ETag ресурса.
+
+    Args:
+        disk (YandexDisk): Клиент, для которого выполняются запросы.
+        url (str): Адрес WebDAV сервера.
+
+    Attributes:
+        url (str): Адрес WebDAV сервера.
+    """
+    name = 'webdav'
+    uses_hashes = True
+
+    def __init__(self, disk, url: str = WEBDAV_URL) -> None:
+        super().__init__(disk)
+        self.url = url.rstrip('/')
+
+    def get_path(self, relative_path: str) -> str:
+        """Метод возвращает путь ресурса на WebDAV сервере.
+
+        :param relative_path: путь относительно синхронизируемой директории.
+        :type relative_path: str
+        :return: путь вида "/папка/файл" без префикса "disk:".
+        :rtype: str
+        """
+        path = self.disk.get_remote_path(relative_path)
+        if path.startswith('disk:'):
+            path = path[5:]
+        return '/' + path.strip('/')
+
+    def get_url(self, relative_path: str) -> str:
+        return self.url + quote(self.get_path(relative_path))
+
+    def _request(self, method: str, relative_path: str, **kwargs) -> requests.Response:
+        headers = {'Authorization': self.disk.headers['Authorization'], **kwargs.pop('headers', {})}
+        return self.disk.client.request(method, self.get_url(relative_path), endpoint=f'{method} webdav',
+                                        headers=headers, **kwargs)
+
+    def upload(self, path: str, file_name: str, overwrite: bool,
+               hashes: Optional[Tuple[str, str]] = None) -> None:
+        """Метод загружает файл одним PUT запросом с хешами содержимого в заголовках.
+
+        Если хеши не переданы, они вычисляются перед загрузкой. При обрыве соединения
+        или ответе 429/5xx передача начинается заново, не более UPLOAD_ATTEMPTS раз,
+        а хеши вычисляются заново, так как файл мог измениться.
+        """
+        for attempt in range(1, UPLOAD_ATTEMPTS + 1):
+            md5, sha256 = hashes if hashes and attempt == 1 else compute_file_hashes(path)
+            with UploadStream(path, self.disk.upload_speed_limit, self.disk.bandwidth) as stream:
+                headers = {'Etag': md5, 'Sha256': sha256, 'Size': str(stream.size),
+                           'Content-Type': 'application/binary'}
+                if not overwrite:
+                    headers['If-None-Match'] = '*'
+                try:
+                    response = self._request('PUT', file_name, data=stream, headers=headers, retry=False)
+                except (requests.ConnectionError, requests.Timeout) as ex:
+                    error = f"обрыв соединения: {ex}"
+                else:
+                    if response.status_code in (201, 204):
+                        _log_upload(self.disk, stream, file_name)
+                        return
+                    if response.status_code not in RETRY_STATUSES:
+                        raise ConnectionError(f"{response.status_code} {response.reason}")
+                    error = f"ответ {response.status_code}"
+            logger.warning(f"Загрузка файла {file_name} прервана ({error}), попытка {attempt} из {UPLOAD_ATTEMPTS}.")
+        raise ConnectionError(f"файл не загружен после {UPLOAD_ATTEMPTS} попыток")
+
+    def delete(self, file_name: str, permanently: str) -> None:
+        response = self._request('DELETE', file_name)
+        if response.status_code not in (200, 204):
+            raise ConnectionError(f"{response.status_code} {response.reason}")
+
+    def move(self, source: str, file_name: str, overwrite: bool) -> None:
+        response = self._request('MOVE', source, headers={'Destination': self.get_url(file_name),
+                                                          'Overwrite': 'T' if overwrite else 'F'})
+        if response.status_code not in (201, 204):
+            raise ConnectionError(f"{response.status_code} {response.reason}")
+
+    def create_folder(self, folder: str) -> None:
+        response = self._request('MKCOL', folder)
+        if response.status_code not in (201, 405):
+            raise ConnectionError(f"{response.status_code} {response.reason}")
+
+    def _list_folder(self, folder: str) -> Tuple[List[Tuple[str, dict]], List[str]]:
+        response = self._request('PROPFIND', folder, data=PROPFIND_BODY,
+                                 headers={'Depth': '1', 'Content-Type': 'application/xml; charset=utf-8'})
+        if response.status_code != 207:
+            raise ConnectionError(f"{response.status_code} {response.reason}")
+        folder_path = unquote(urlparse(self.get_url(folder)).path).rstrip('/')
+        files, subfolders = [], []
+        for resource in ElementTree.fromstring(response.content).findall('d:response', DAV_NAMESPACE):
+            href = unquote(urlparse(resource.findtext('d:href', '', DAV_NAMESPACE)).path).rstrip('/')
+            if href == folder_path or not href.startswith(folder_path + '/'):
+                continue
+            name = href[len(folder_path) + 1:]
+            path = f"{folder}/{name}" if folder else name
+            properties = {}
+            for propstat in resource.findall('d:propstat', DAV_NAMESPACE):
+                if ' 200 ' in propstat.findtext('d:status', '', DAV_NAMESPACE):
+                    properties.update((element.tag.rpartition('}')[2], element)
+                                      for element in propstat.find('d:prop', DAV_NAMESPACE))
+            resource_type = properties.get('resourcetype')
+            if resource_type is not None and resource_type.find('d:collection', DAV_NAMESPACE) is not None:
+                subfolders.append(path)
+                continue
+            etag = (properties['getetag'].text or '').strip('"') if 'getetag' in properties else ''
+            modified = properties['getlastmodified'].text if 'getlastmodified' in properties else None
+            files.append((path, {'name': name, 'type': 'file',
+                                 'size': int(properties['getcontentlength'].text or 0)
+                                 if 'getcontentlength' in properties else 0,
+                                 'md5': etag if len(etag) == 32 else None,
+                                 'modified': parsedate_to_datetime(modified).isoformat() if modified
+                                 else '1970-01-01T00:00:00+00:00'}))
+        return files, subfolders
+
+    def list_folders(self, folders: List[str]) -> FolderItems:
+        """Метод получает содержимое нескольких папок параллельными запросами PROPFIND."""
+        files, subfolders = {}, []
+        for folder, (folder_files, folder_subfolders) in zip(folders, self.disk.request_pool.map(self._list_folder,
+                                                                                                   folders)):
+            files[folder] = folder_files
+            subfolders.extend(folder_subfolders)
+        return files, subfolders
@@ -0,0 +1,85 @@
+import os
+import time
+
+from typing import Optional
+
+from modules.transfer_scheduler import TokenBucket
+
+
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+
+class UploadStream:
+    """Файловый объект для потоковой передачи файла в теле PUT запроса.
+
+    Файл читается блоками не больше UPLOAD_CHUNK_SIZE, поэтому потребление памяти
+    не зависит от размера файла. Объект сообщает свой размер через __len__, что
+    позволяет requests отправить заголовок Content-Length вместо chunked-кодирования.
+    Передаётся ровно size байт, определённых при открытии: дописанные во время
+    загрузки данные не отправляются, а если файл уменьшился, чтение завершается
+    ошибкой и загрузка повторяется.
+
+    Args:
+        path (str): Путь к файлу.
+        speed_limit (int): Ограничение скорости передачи в байтах в секунду, 0 - без ограничения.
+        bandwidth (TokenBucket): Общее для всех загрузок ограничение скорости или None.
+
+    Attributes:
+        path (str): Путь к файлу.
+        size (int): Размер файла в байтах.
+        sent (int): Число уже прочитанных для отправки байт.
+        speed_limit (int): Ограничение скорости передачи в байтах в секунду.
+    """
+
+    def __init__(self, path: str, speed_limit: int = 0, bandwidth: Optional[TokenBucket] = None) -> None:
+        self.path = path
+        self.speed_limit = speed_limit
+        self.bandwidth = bandwidth
+        self._file = open(path, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size
+        self.sent = 0
+        self._started: Optional[float] = None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __enter__(self) -> 'UploadStream':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def read(self, size: int = -1) -> bytes:
+        """Метод читает очередной блок файла, соблюдая ограничение скорости.
+
+        :param size: максимальный размер блока.
+        :type size: int
+        :return: прочитанные данные, пустая строка после передачи size байт.
+        :rtype: bytes
+        :raise ConnectionError: если файл стал короче size байт.
+        """
+        if self._started is None:
+            self._started = time.monotonic()
+        if size is None or size < 0 or size > UPLOAD_CHUNK_SIZE:
+            size = UPLOAD_CHUNK_SIZE
+        size = min(size, self.size - self.sent)
+        if size <= 0:
+            return b''
+        data = self._file.read(size)
+        if len(data) < size:
+            raise ConnectionError(f"файл {self.path} уменьшился во время загрузки")
+        self.sent += len(data)
+        if self.bandwidth:
+            self.bandwidth.consume(len(data))
+        if self.speed_limit:
+            delay = self.sent / self.speed_limit - (time.monotonic() - self._started)
+            if delay > 0:
+                time.sleep(delay)
+        return data
+
+    def elapsed(self) -> float:
+        """Метод возвращает время, прошедшее с начала передачи, в секундах."""
+        return time.monotonic() - self._started if self._started is not None else 0.0
+
+    def close(self) -> None:
+        self._file.close()
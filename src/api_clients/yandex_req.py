@@ -1,10 +1,51 @@
 import json
-import requests
 import os
+import requests
+import threading
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from loguru import logger
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from api_clients.download_stream import DownloadStream
+from api_clients.http_client import HttpClient, get_http_client
+from api_clients.transports import (DELETE, LIST, MKDIR, MOVE, TRANSPORT_OPERATIONS, UPLOAD, WEBDAV_URL,
+                                     RestTransport, Transport, WebDavTransport)
+from modules.file_table import FileSnapshot, RemoteFile, RemoteTable, build_remote_tables
+from modules.transfer_scheduler import TokenBucket
+
+
+API_URL = 'https://cloud-api.yandex.net/v1/disk/resources'
+DOWNLOAD_ATTEMPTS = 3
+LIST_WORKERS = 4
+
+_shared_request_pool: Optional[ThreadPoolExecutor] = None
+_shared_request_pool_lock = threading.Lock()
+
+
+def get_request_pool() -> ThreadPoolExecutor:
+    """Функция возвращает общий для всех клиентов пул потоков для параллельных запросов к API.
+
+    :return: пул из LIST_WORKERS потоков.
+    :rtype: ThreadPoolExecutor
+    """
+    global _shared_request_pool
+    with _shared_request_pool_lock:
+        if _shared_request_pool is None:
+            _shared_request_pool = ThreadPoolExecutor(max_workers=LIST_WORKERS, thread_name_prefix="requests")
+        return _shared_request_pool
+
+
+def parse_modified(value: str) -> int:
+    """Функция переводит время модификации ресурса из ответа API в секунды с начала эпохи.
+
+    :param value: время в формате ISO 8601.
+    :type value: str
+    :return: время в секундах.
+    :rtype: int
+    """
+    return int(datetime.fromisoformat(value).timestamp())
 
 
 class YandexDisk:
@@ -13,54 +54,95 @@ class YandexDisk:
     Args:
         token (str): Токен доступа к Яндекс.Диску.
         path_to_the_folder (str): Директория в облочном хранилище.
+        client (HttpClient): HTTP клиент, по умолчанию общий для всего приложения.
+        upload_speed_limit (int): Ограничение скорости загрузки одного файла в байтах в секунду.
+        url (str): Адрес API ресурсов диска, по умолчанию API Яндекс.Диска.
+        bandwidth (TokenBucket): Общее для всех загрузок ограничение скорости или None.
+        webdav_url (str): Адрес WebDAV сервера.
+        webdav_operations (Iterable): Операции из TRANSPORT_OPERATIONS, выполняемые через WebDAV,
+                                      остальные выполняются через REST API.
         
     Attributes:
         token (str): Токен доступа к Яндекс.Диску.
         path_to_the_folder (str): Директория в облочном хранилище.
         url (str): Базовый урл для запросов API Яндекс.Диска.
+        folders (set): Папки, найденные при последнем получении списка файлов.
+        revision (int): Ревизия диска на момент последнего получения списка файлов.
         headers (dict): Заголовки для запросов.
+        client (HttpClient): HTTP клиент с пулом соединений.
+        upload_speed_limit (int): Ограничение скорости загрузки одного файла в байтах в секунду, 0 - без ограничения.
+        bandwidth (TokenBucket): Общее для всех загрузок ограничение скорости.
+        transports (dict): Способы выполнения операций {операция: Transport}.
+        request_pool (ThreadPoolExecutor): Общий пул потоков для параллельных запросов.
     """
     
-    def __init__(self, token: str, path_to_the_folder: str) -> None:
+    def __init__(self, token: str, path_to_the_folder: str, client: Optional[HttpClient] = None,
+                 upload_speed_limit: int = 0, url: str = API_URL, bandwidth: Optional[TokenBucket] = None,
+                 webdav_url: str = WEBDAV_URL, webdav_operations: Iterable[str] = ()) -> None:
+        self.client = client or get_http_client()
+        self.upload_speed_limit = upload_speed_limit
+        self.bandwidth = bandwidth
         self.token = token
         self.path_to_the_folder = path_to_the_folder
-        self.url = 'https://cloud-api.yandex.net/v1/disk/resources'
+        self.url = url
+        self.request_pool = get_request_pool()
+        self.folders: Set[str] = set()
+        self.revision: Optional[int] = None
+        self._snapshot: Optional[FileSnapshot] = None
+        self._revision_etag: Optional[str] = None
+        self._last_revision: Optional[int] = None
         self.headers = {'Content-Type': 'application/json',
                         'Accept': 'application/json',
                         'Authorization': f'OAuth {self.token}'}
+        rest, webdav = RestTransport(self), WebDavTransport(self, webdav_url)
+        self.transports: Dict[str, Transport] = {operation: webdav if operation in webdav_operations else rest
+                                                 for operation in TRANSPORT_OPERATIONS}
 
-    def _load_to_cloud(self, path: str, file_name: str,overwrite: bool) -> None:
-        req = self.get_link_for_download( file_name, overwrite)
-        with open(path, 'rb') as file:
-            requests.put(req['href'], files={'file':file})
-
-    def load(self, path) -> None:
+    def load(self, path, file_name: Optional[str] = None, hashes: Optional[Tuple[str, str]] = None) -> bool:
         """Метод для загрузки файла в хранилище.
         
         :param path: Путь к файлу на локальной машине.
         :type path: str
+        :param file_name: Путь к файлу относительно синхронизируемой директории,
+                          по умолчанию - имя файла.
+        :type file_name: str
+        :param hashes: MD5 и SHA256 файла, если они уже известны.
+        :type hashes: tuple
+        :return: True, если файл успешно записан.
+        :rtype: bool
         """
         try:
-            file_name = os.path.basename(path)
-            self._load_to_cloud(path, file_name, False)
+            file_name = file_name or os.path.basename(path)
+            self.transports[UPLOAD].upload(path, file_name, False, hashes)
             logger.info(f"Файл {file_name} успешно записан.")
+            return True
         except Exception as ex:
              logger.error(f"При записи файла '{file_name}'возникла ошибка: {ex}")
+             return False
       
-    def reload(self, path: str) -> None:
+    def reload(self, path: str, file_name: Optional[str] = None, hashes: Optional[Tuple[str, str]] = None) -> bool:
         """Метод для перезаписи файла в хранилище
         
         :param path: Путь к файлу на локальной машине.
         :type path: str
+        :param file_name: Путь к файлу относительно синхронизируемой директории,
+                          по умолчанию - имя файла.
+        :type file_name: str
+        :param hashes: MD5 и SHA256 файла, если они уже известны.
+        :type hashes: tuple
+        :return: True, если файл успешно перезаписан.
+        :rtype: bool
         """
         try:
-            file_name = os.path.basename(path)
-            self._load_to_cloud(path, file_name, True)
+            file_name = file_name or os.path.basename(path)
+            self.transports[UPLOAD].upload(path, file_name, True, hashes)
             logger.info(f"Файл {file_name} успешно перезаписан.")
+            return True
         except Exception as ex:
              logger.error(f"При перезаписи файла '{file_name}'возникла ошибка: {ex}")
+             return False
 
-    def delete(self, file_name: str, permanently: str = "false") -> None:
+    def delete(self, file_name: str, permanently: str = "false") -> bool:
         """Метод для удаления файла из хранилища.
         
         :param file_name: Название файла.
@@ -68,48 +150,212 @@ class YandexDisk:
         :param permanently: Флаг определяющий, нужно ли удалить файл 
                             полностью или отправить его в корзину.  
                             По умолчанию - false.
+        :return: True, если файл успешно удалён.
+        :rtype: bool
         """
         try:
-            response = requests.delete(f'{self.url}?path={self.path_to_the_folder}/{file_name}&permanently={permanently}', 
-                                       headers=self.headers)
-            if response.status_code not in (200, 202, 204):
-                logger.error(f"{response.status_code} {response.json()['message']}")
-            else:
-                logger.info(f"Файл {file_name} успешно удалён.")
+            self.transports[DELETE].delete(file_name, permanently)
+            logger.info(f"Файл {file_name} успешно удалён.")
+            return True
         except Exception as ex:
             logger.error(f"При удалении файла '{file_name}' возникла ошибка: {ex}")
+        return False
     
-    def get_info(self) -> Optional[dict]:
+    def move(self, source: str, file_name: str, overwrite: bool = False) -> bool:
+        """Метод для перемещения или переименования файла в хранилище без передачи содержимого.
+
+        :param source: Старый путь к файлу относительно синхронизируемой директории.
+        :type source: str
+        :param file_name: Новый путь к файлу относительно синхронизируемой директории.
+        :type file_name: str
+        :param overwrite: Перезаписать ли существующий файл с новым именем.
+        :type overwrite: bool
+        :return: True, если файл успешно перемещён.
+        :rtype: bool
+        """
+        try:
+            self.transports[MOVE].move(source, file_name, overwrite)
+            logger.info(f"Файл {source} успешно перемещён в {file_name}.")
+            return True
+        except Exception as ex:
+            logger.error(f"При перемещении файла '{source}' возникла ошибка: {ex}")
+        return False
+
+    def download(self, file_name: str, path: str, remote_file: RemoteFile) -> bool:
+        """Метод для скачивания файла из хранилища.
+
+        При обрыве соединения запрашивается новая ссылка на скачивание и докачиваются
+        только недостающие части файла, не более DOWNLOAD_ATTEMPTS раз.
+
+        :param file_name: Путь к файлу относительно синхронизируемой директории.
+        :type file_name: str
+        :param path: Путь к файлу на локальной машине.
+        :type path: str
+        :param remote_file: Сведения о файле в облаке из последнего списка файлов.
+        :type remote_file: RemoteFile
+        :return: True, если файл успешно скачан.
+        :rtype: bool
+        """
+        stream = None
+        try:
+            stream = DownloadStream(self.client, path, remote_file.size)
+            for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+                response = self.client.get(f'{self.url}/download', params={'path': self.get_remote_path(file_name)},
+                                           headers=self.headers)
+                if response.status_code != 200:
+                    raise ConnectionError(f"{response.status_code} {response.json()['message']}")
+                try:
+                    stream.fetch(response.json()['href'])
+                    break
+                except (requests.ConnectionError, requests.Timeout, ConnectionError) as ex:
+                    logger.warning(f"Скачивание файла {file_name} прервано ({ex}), "
+                                   f"попытка {attempt} из {DOWNLOAD_ATTEMPTS}.")
+            if not stream.done:
+                raise ConnectionError(f"файл не скачан после {DOWNLOAD_ATTEMPTS} попыток")
+            stream.commit(remote_file.md5, remote_file.sha256, remote_file.modified)
+            self.client.metrics.inc('synchroniser_downloaded_bytes_total', remote_file.size)
+            logger.info(f"Файл {file_name} успешно скачан.")
+            return True
+        except Exception as ex:
+            if stream is not None:
+                stream.discard()
+            logger.error(f"При скачивании файла '{file_name}' возникла ошибка: {ex}")
+            return False
+
+    def get_page(self, url: str, params: dict) -> dict:
+        """Метод запрашивает одну страницу списка ресурсов.
+
+        :param url: адрес запроса.
+        :type url: str
+        :param params: параметры запроса.
+        :type params: dict
+        :return: ответ API.
+        :rtype: dict
+        :raise ConnectionError: если API вернул код ответа, отличный от 200.
+        """
+        response = self.client.get(url, params=params, headers=self.headers)
+        if response.status_code != 200:
+            raise ConnectionError(f"{response.status_code} {response.json()['message']}")
+        return json.loads(response.content)
+
+    def _list_folders(self, folders: List[str]) -> Tuple[Dict[str, RemoteTable], List[str]]:
+        """Функция получает содержимое нескольких папок через способ, выбранный для получения списка.
+
+        :param folders: пути папок относительно синхронизируемой директории.
+        :type folders: list
+        :return: словарь таблиц файлов {папка: RemoteTable} и список вложенных папок.
+        :rtype: tuple
+        """
+        files, subfolders = self.transports[LIST].list_folders(folders)
+        return build_remote_tables(files, parse_modified), subfolders
+
+    def get_revision(self) -> Optional[int]:
+        """Метод запрашивает ревизию диска, которая меняется при любом изменении файлов на диске.
+
+        Запрос отправляется с заголовком If-None-Match, если сервер ранее вернул ETag,
+        и ответ 304 считается неизменной ревизией.
+
+        :return: ревизия диска или None, если её не удалось получить.
+        :rtype: int
+        """
+        headers = dict(self.headers)
+        if self._revision_etag:
+            headers['If-None-Match'] = self._revision_etag
+        try:
+            response = self.client.get(self.url.rsplit('/resources', 1)[0], params={'fields': 'revision'},
+                                       headers=headers)
+            if response.status_code == 304:
+                return self._last_revision
+            if response.status_code != 200:
+                return None
+            self._revision_etag = response.headers.get('ETag')
+            self._last_revision = response.json().get('revision')
+            return self._last_revision
+        except Exception as ex:
+            logger.warning(f"Не удалось получить ревизию диска: {ex}")
+            return None
+
+    def get_info(self, recursive: bool = False, cached: bool = False) -> Optional[FileSnapshot]:
         """Метод для получения информации о хранящихся в удалённом хранилище файлах
 
-        return dict: словарь с названиями файлов и датой их последней модификации.
+        :param recursive: обходить ли вложенные папки.
+        :type recursive: bool
+        :param cached: вернуть результат прошлого рекурсивного запроса, если ревизия
+                       диска с тех пор не изменилась. Ревизия запрашивается до получения
+                       списка, поэтому изменения во время получения списка не теряются.
+        :type cached: bool
+        return FileSnapshot: снимок {путь к файлу относительно синхронизируемой директории: RemoteFile}.
+                             Найденные папки сохраняются в атрибуте folders.
         """
+        revision = self.get_revision() if cached and recursive else None
+        if revision is not None and revision == self.revision and self._snapshot is not None:
+            return self._snapshot
+        files = self._get_info(recursive)
+        if recursive:
+            self._snapshot, self.revision = (files, revision) if files is not None else (None, None)
+        return files
+
+    def _get_info(self, recursive: bool) -> Optional[FileSnapshot]:
         try:
-            response = requests.get(f'{self.url}?path={self.path_to_the_folder}&fields=_embedded.items.name%2C%20_embedded.items.modified%20', headers=self.headers)
-            if response.status_code == 200:
-                result = json.loads(response.content)
-                list_files_in_cloud_storage = {}
-                for i in result['_embedded']['items']:
-                    list_files_in_cloud_storage[i['name']] = datetime.fromtimestamp(datetime.strptime(i['modified'], '%Y-%m-%dT%H:%M:%S%z').timestamp())
-                return list_files_in_cloud_storage
-            else:
-                logger.error(f"{response.status_code} {response.json()['message']}")
+            tables, folders = self._list_folders([''])
+            all_folders = set(folders)
+            while recursive and folders:
+                folder_tables, folders = self._list_folders(folders)
+                tables.update(folder_tables)
+                all_folders.update(folders)
+            self.folders = all_folders
+            return FileSnapshot(tables)
         except Exception as ex:
             logger.error(f"При получении информации о файлах в удалённом хранилище возникла ошибка: {ex}")
-        
-    def get_link_for_download(self, file_name: str, overwrite: bool) -> Optional[dict]:
-        """Функция отправляет get запрос на yandex cloud api  для получения ссылки  
-        на загрузку файла.
 
-        :param  file_name: Название файла.
-        :type   file_name: str
-        :return: Словарь с данными о ссылке на загрузку файла.
+    def create_folder(self, folder: str) -> bool:
+        """Метод создаёт папку в хранилище.
+
+        :param folder: Путь к папке относительно синхронизируемой директории.
+        :type folder: str
+        :return: True, если папка создана или уже существует.
+        :rtype: bool
         """
-        try:    
-            req = requests.get(f'{self.url}/upload?path={self.path_to_the_folder}/{file_name}&overwrite={overwrite}', headers=self.headers)
-            if req.status_code != 200:
-                logger.error(f"{req.status_code} {req.json()['message']}")
-            else:
-                return req.json()
+        try:
+            self.transports[MKDIR].create_folder(folder)
+            self.folders.add(folder)
+            return True
         except Exception as ex:
-            logger.error(ex)
+            logger.error(f"При создании папки '{folder}' возникла ошибка: {ex}")
+        return False
+
+    def create_folders(self, folders: List[str]) -> List[str]:
+        """Метод создаёт иерархию папок: родительские папки создаются раньше дочерних,
+        папки одного уровня вложенности создаются параллельно.
+
+        :param folders: Пути к папкам относительно синхронизируемой директории.
+        :type folders: list
+        :return: Список папок, которые не удалось создать.
+        :rtype: list
+        """
+        levels: Dict[int, List[str]] = {}
+        for folder in folders:
+            levels.setdefault(folder.count('/'), []).append(folder)
+        failed = []
+        for depth in sorted(levels):
+            level = []
+            for folder in levels[depth]:
+                if any(folder.startswith(f"{parent}/") for parent in failed):
+                    failed.append(folder)
+                else:
+                    level.append(folder)
+            failed.extend(folder for folder, created in zip(level, self.request_pool.map(self.create_folder, level))
+                          if not created)
+        if folders:
+            logger.info(f"Создано папок: {len(folders) - len(failed)} из {len(folders)}.")
+        return failed
+
+    def get_remote_path(self, relative_path: str) -> str:
+        """Метод возвращает путь к ресурсу в облачном хранилище.
+
+        :param relative_path: путь относительно синхронизируемой директории.
+        :type relative_path: str
+        :return: путь в облачном хранилище.
+        :rtype: str
+        """
+        return f"{self.path_to_the_folder}/{relative_path}" if relative_path else self.path_to_the_folder
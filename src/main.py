@@ -1,57 +1,98 @@
-import time
+import signal
 import sys
 from loguru import logger
 
 from api_clients.yandex_req import YandexDisk
 from modules.check_env import CheckEnv
+from modules.file_index import FileIndex
+from modules.metrics import METRICS, CycleProfiler, MetricsServer
+from modules.operation_journal import OperationJournal, journal_file_for
+from modules.poll_interval import PollInterval
+from modules.sync_daemon import SyncDaemon, WatchDaemon
+from modules.synchroniser import Synchroniser
+from modules.transfer_executor import TransferExecutor
+from modules.transfer_scheduler import AimdLimiter, TokenBucket
+from modules.watcher import create_watcher
 from utils import *
 
 
 config = CheckEnv(".env")
 config.set_path_and_token_from_yandex_cloud()
-TOKEN = config.get_token()
 local_path = config.get_local_directory()
-directory_in_cloud_storage = config.get_path_to_cloud_storage()
 interval_between_synchronizations = config.get_time_interval()
 log_file = config.get_log_file()
+watch_mode = config.get_watch_mode()
+debounce_interval = config.get_debounce_interval()
+max_transfer_workers = config.get_max_transfer_workers()
+upload_speed_limit = config.get_upload_speed_limit()
+bandwidth_limit = config.get_bandwidth_limit()
+metrics_port = config.get_metrics_port()
+metrics_summary_file = config.get_metrics_summary_file()
+profile_file = config.get_profile_file()
+sync_pairs = config.get_sync_pairs()
+ignore_patterns = config.get_ignore_patterns()
+stability_period = config.get_stability_period()
+webdav_url = config.get_webdav_url()
+webdav_operations = config.get_webdav_operations()
 
 logger.add(f'{log_file}', format="synchroniser {time:YYYY-MM-DD HH:mm:ss,SSS} {level} {message}", rotation='1 MB', compression='zip')
 
 
+def create_poll_interval(pair) -> PollInterval:
+    """Функция создаёт расписание циклов синхронизации для пары директорий.
+
+    :param pair: пара синхронизируемых директорий.
+    :type pair: SyncPair
+    :return: расписание циклов.
+    :rtype: PollInterval
+    """
+    timer = convert_time_to_seconds(pair.interval_between_synchronizations)
+    return PollInterval(timer, convert_time_to_seconds(pair.max_idle_interval) if pair.max_idle_interval else timer * 8)
+
+
 if __name__ == "__main__":
     try:
         if local_path:
-            timer = convert_time_to_seconds(interval_between_synchronizations)
-            logger.info(f"Программа синхронизации файлов начинает работу с директорией {local_path}.") 
-            connect = YandexDisk(path_to_the_folder=directory_in_cloud_storage, token=TOKEN)   
-            
-            while True:
-                local_files = detecting_files_in_local_directory(local_path)
-                files = generating_a_dict_of_files(local_path)
-    
-                get_info = connect.get_info()
-                if get_info is None:
-                    continue
-            
-            
-                download_list = creating_a_list_of_files_to_download(get_info, local_files)
-                if download_list:
-                    for i in download_list:
-                        connect.load(files[i].get_file_path())
-                
-                
-                update_list = creating_a_list_of_files_to_update(files, get_info)
-                if update_list:
-                    for i in update_list:
-                        connect.reload(files[i].get_file_path())
-
-
-                delete_list = creating_a_list_of_files_to_delete(get_info, local_files)
-                if delete_list:
-                    for file_name in delete_list:
-                        connect.delete(file_name)
-                        
-                time.sleep(timer)
+            logger.info(f"Программа синхронизации файлов начинает работу с директориями "
+                        f"{', '.join(pair.local_directory for pair in sync_pairs)}.")
+            bandwidth = TokenBucket(bandwidth_limit)
+            limiter = AimdLimiter(max_transfer_workers)
+            executor = TransferExecutor(max_transfer_workers, limiter=limiter)
+            watcher = None
+            if watch_mode == "inotify":
+                if len(sync_pairs) == 1:
+                    watcher = create_watcher(local_path)
+                else:
+                    logger.warning("Режим inotify поддерживается только для одной директории, "
+                                   "используется периодическая сверка.")
+            METRICS.summary_file = metrics_summary_file or None
+            if metrics_port:
+                MetricsServer(metrics_port)
+            profiler = None
+            if profile_file:
+                profiler = CycleProfiler(profile_file, profile_first_cycle=True)
+                signal.signal(signal.SIGUSR1, profiler.request)
+            jobs = []
+            for pair in sync_pairs:
+                connect = YandexDisk(path_to_the_folder=pair.path_on_yandex_cloud, token=pair.token,
+                                     upload_speed_limit=upload_speed_limit, bandwidth=bandwidth,
+                                     webdav_url=webdav_url, webdav_operations=webdav_operations)
+                synchroniser = Synchroniser(connect, pair.local_directory, FileIndex(pair.index_file), executor,
+                                            prune_unchanged_directories=watcher is not None,
+                                            profiler=profiler, sync_mode=pair.sync_mode,
+                                            conflict_policy=pair.conflict_policy,
+                                            journal=OperationJournal(journal_file_for(pair.index_file)),
+                                            ignore_patterns=ignore_patterns, stability_period=stability_period)
+                jobs.append((synchroniser, create_poll_interval(pair)))
+            connect.client.add_listener(limiter.record)
+
+            if watcher is None:
+                SyncDaemon(jobs).run()
+            else:
+                synchroniser, poll_interval = jobs[0]
+                logger.info("Включён режим отслеживания событий, полная сверка выполняется раз в "
+                            f"{interval_between_synchronizations}.")
+                WatchDaemon(synchroniser, poll_interval, watcher, debounce_interval).run()
     except KeyboardInterrupt:
         logger.info("Работы программы завершена.")
-        sys.exit()
\ No newline at end of file
+        sys.exit()
@@ -1,9 +1,38 @@
+import hashlib
+import json
 import os
 import re
 import sys
-import requests
 from loguru import logger
 from dotenv import dotenv_values
+from typing import List, NamedTuple
+
+from api_clients.http_client import get_http_client
+from api_clients.transports import TRANSPORT_OPERATIONS, WEBDAV_URL
+from modules.ignore_rules import DEFAULT_IGNORE_PATTERNS
+
+
+class SyncPair(NamedTuple):
+    """Пара синхронизируемых директорий со своими настройками.
+
+    Attributes:
+        local_directory (str): Путь к локальной директории.
+        path_on_yandex_cloud (str): Путь к директории в облачном хранилище.
+        token (str): Токен доступа к Яндекс.Диску.
+        interval_between_synchronizations (str): Период синхронизации в формате hh:mm:ss.
+        max_idle_interval (str): Максимальный период синхронизации без изменений в формате hh:mm:ss.
+        index_file (str): Путь к файлу индекса локальных файлов.
+        sync_mode (str): Режим синхронизации.
+        conflict_policy (str): Политика разрешения конфликтов.
+    """
+    local_directory: str
+    path_on_yandex_cloud: str
+    token: str
+    interval_between_synchronizations: str
+    max_idle_interval: str
+    index_file: str
+    sync_mode: str
+    conflict_policy: str
 
 
 class CheckEnv:
@@ -16,6 +45,24 @@ class CheckEnv:
         self._token = None
         self._path_to_cloud_storage = None
         self._interval_between_synchronizations = self._set_tine_interval()
+        self._index_file = self._set_optional_value("index_file",
+                                                    os.path.join(os.path.dirname(self._log_file), "sync_index.sqlite3"))
+        self._watch_mode = self._set_optional_value("watch_mode", "poll")
+        self._debounce_interval = float(self._set_optional_value("debounce_interval", "2"))
+        self._max_transfer_workers = int(self._set_optional_value("max_transfer_workers", "4"))
+        self._upload_speed_limit = int(self._set_optional_value("upload_speed_limit", "0")) * 1024
+        self._bandwidth_limit = int(self._set_optional_value("bandwidth_limit", "0")) * 1024
+        self._metrics_port = int(self._set_optional_value("metrics_port", "0"))
+        self._metrics_summary_file = self._set_optional_value("metrics_summary_file", "")
+        self._profile_file = self._set_optional_value("profile_file", "")
+        self._max_idle_interval = self._set_optional_value("max_idle_interval", "")
+        self._sync_mode = self._set_choice_value("sync_mode", ("upload", "two_way"))
+        self._conflict_policy = self._set_choice_value("conflict_policy", ("newer", "local", "remote", "keep_both"))
+        self._sync_pairs_file = self._set_optional_value("sync_pairs_file", "")
+        self._ignore_patterns = self._set_optional_value("ignore_patterns", "")
+        self._stability_period = float(self._set_optional_value("stability_period", "2"))
+        self._webdav_url = self._set_optional_value("webdav_url", WEBDAV_URL)
+        self._webdav_operations = self._set_operations_value("webdav_operations", TRANSPORT_OPERATIONS)
         
     def get_abspath(self, path: str) -> str:
         """Функция возвращяет абсолютный путь до файли или директории.
@@ -82,6 +129,42 @@ class CheckEnv:
             logger.error(ex)
             sys.exit()
 
+    def _set_optional_value(self, variable_name: str, default: str) -> str:
+        """Функция возвращает значение необязательной переменной конфигурационного файла.
+
+        param variable_name (str): Имя переменной в конфигурационом файле.
+        param default (str): Значение по умолчанию, если переменная не задана.
+        return str: Значение переменной.
+        """
+        return self._config.get(variable_name) or default
+
+    def _set_choice_value(self, variable_name: str, choices: tuple) -> str:
+        """Функция возвращает значение необязательной переменной с ограниченным набором значений.
+
+        param variable_name (str): Имя переменной в конфигурационом файле.
+        param choices (tuple): Допустимые значения, первое используется по умолчанию.
+        return str: Значение переменной.
+        """
+        value = self._set_optional_value(variable_name, choices[0])
+        if value not in choices:
+            logger.error(f'Переменная "{variable_name}" может принимать значения: {", ".join(choices)}.')
+            sys.exit()
+        return value
+
+    def _set_operations_value(self, variable_name: str, choices: tuple) -> List[str]:
+        """Функция возвращает список значений необязательной переменной, перечисленных через запятую.
+
+        param variable_name (str): Имя переменной в конфигурационом файле.
+        param choices (tuple): Допустимые значения.
+        return list: Список значений, по умолчанию пустой.
+        """
+        values = [value.strip() for value in self._set_optional_value(variable_name, "").split(',') if value.strip()]
+        unknown = [value for value in values if value not in choices]
+        if unknown:
+            logger.error(f'Переменная "{variable_name}" может содержать значения: {", ".join(choices)}.')
+            sys.exit()
+        return values
+
     def _set_tine_interval(self):
         """Функция задаёт значение в интервале времени между синхронизациями.
 
@@ -90,6 +173,60 @@ class CheckEnv:
         if self.checking_the_presence_of_a_variable_in_a_file("interval_between_synchronizations"):
             return self._config["interval_between_synchronizations"]
   
+    def _check_cloud_folder(self, token: str, path: str) -> None:
+        """Функция проверяет доступ к директории на Яндекс.Диске.
+
+        param token (str): Токен доступа.
+        param path (str): Путь к директории в облачном хранилище.
+        raise ValueError: Если токен не подходит.
+        raise FileNotFoundError: Если директория не найдена.
+        """
+        response = get_http_client().get('https://cloud-api.yandex.net/v1/disk/resources',
+                                         params={'path': path, 'fields': 'path'},
+                                         headers={'Accept': 'application/json', 'Authorization': f'OAuth {token}'})
+        if response.status_code == 401:
+            raise ValueError(f"Ошибка подключения к Яндекс.Диску для директории {path}. Проверьте токен.")
+        if response.status_code == 404:
+            raise FileNotFoundError(f"Директория {path} не найдена на Яндекс диске.")
+        if response.status_code != 200:
+            raise ConnectionError(f"{response.json()['message']}")
+
+    def _load_sync_pairs(self) -> List[SyncPair]:
+        """Функция загружает дополнительные пары директорий из JSON-файла sync_pairs_file.
+
+        Файл содержит список объектов с ключами local_directory и path_on_yandex_cloud.
+        Ключи token_yandex_disk, interval_between_synchronizations, max_idle_interval,
+        index_file, sync_mode и conflict_policy необязательны и по умолчанию берутся из .env.
+        Файл индекса по умолчанию создаётся рядом с лог-файлом, его имя строится из путей пары.
+
+        return list: Список пар директорий.
+        """
+        try:
+            with open(self.get_abspath(self._sync_pairs_file), encoding='utf-8') as file:
+                items = json.load(file)
+            pairs = []
+            for item in items:
+                self.check_path(item["local_directory"])
+                token = item.get("token_yandex_disk", self._token)
+                self._check_cloud_folder(token, item["path_on_yandex_cloud"])
+                digest = hashlib.sha1(f'{item["local_directory"]}|{item["path_on_yandex_cloud"]}'.encode()).hexdigest()
+                index_file = item.get("index_file") or \
+                    os.path.join(os.path.dirname(self._log_file), f"sync_index_{digest[:12]}.sqlite3")
+                sync_mode = item.get("sync_mode", self._sync_mode)
+                conflict_policy = item.get("conflict_policy", self._conflict_policy)
+                if sync_mode not in ("upload", "two_way") or \
+                        conflict_policy not in ("newer", "local", "remote", "keep_both"):
+                    raise ValueError(f"Неверный sync_mode или conflict_policy для {item['local_directory']}.")
+                pairs.append(SyncPair(self.get_abspath(item["local_directory"]), item["path_on_yandex_cloud"], token,
+                                      item.get("interval_between_synchronizations",
+                                               self._interval_between_synchronizations),
+                                      item.get("max_idle_interval", self._max_idle_interval),
+                                      index_file, sync_mode, conflict_policy))
+            return pairs
+        except Exception as ex:
+            logger.error(f"Ошибка в файле {self._sync_pairs_file}: {ex!r}")
+            sys.exit()
+
     def create_test_request_yandex_cloud(self):
         """Функция формирует get запрос  на yandex cloud api.
 
@@ -102,8 +239,8 @@ class CheckEnv:
                 headers = {'Content-Type': 'application/json',
                         'Accept': 'application/json', 
                         'Authorization': f'OAuth {self._config["token_yandex_disk"]}'}
-                response = requests.get(f"{url}?path={self._config['path_on_yandex_cloud']}",
-                                        headers=headers)
+                response = get_http_client().get(f"{url}?path={self._config['path_on_yandex_cloud']}",
+                                                 headers=headers)
                 return response
         except Exception as ex:
             logger.error(ex)  
@@ -166,3 +303,128 @@ class CheckEnv:
         return str: Время в формате "hh:mm:ss".
         """
         return self._interval_between_synchronizations
+
+    def get_index_file(self) -> str:
+        """Функция возвращяет путь до файла индекса локальных файлов.
+
+        return str: Путь до файла индекса.
+        """
+        return self._index_file
+
+    def get_watch_mode(self) -> str:
+        """Функция возвращяет режим обнаружения изменений: "poll" или "inotify".
+
+        return str: Режим обнаружения изменений.
+        """
+        return self._watch_mode
+
+    def get_debounce_interval(self) -> float:
+        """Функция возвращяет задержку перед обработкой событий файловой системы.
+
+        return float: Задержка в секундах.
+        """
+        return self._debounce_interval
+
+    def get_max_transfer_workers(self) -> int:
+        """Функция возвращяет число потоков для загрузки файлов в облачное хранилище.
+
+        return int: Число потоков.
+        """
+        return self._max_transfer_workers
+
+    def get_upload_speed_limit(self) -> int:
+        """Функция возвращяет ограничение скорости загрузки одного файла.
+
+        return int: Скорость в байтах в секунду, 0 - без ограничения.
+        """
+        return self._upload_speed_limit
+
+    def get_bandwidth_limit(self) -> int:
+        """Функция возвращяет общее ограничение скорости всех загрузок.
+
+        return int: Скорость в байтах в секунду, 0 - без ограничения.
+        """
+        return self._bandwidth_limit
+
+    def get_metrics_port(self) -> int:
+        """Функция возвращяет порт HTTP сервера метрик.
+
+        return int: Номер порта, 0 - сервер метрик не запускается.
+        """
+        return self._metrics_port
+
+    def get_metrics_summary_file(self) -> str:
+        """Функция возвращяет путь к файлу для записи итогов циклов синхронизации.
+
+        return str: Путь к файлу, пустая строка - итоги пишутся в лог.
+        """
+        return self._metrics_summary_file
+
+    def get_profile_file(self) -> str:
+        """Функция возвращяет путь к файлу для сохранения профиля цикла синхронизации.
+
+        return str: Путь к файлу, пустая строка - профилирование выключено.
+        """
+        return self._profile_file
+
+    def get_sync_mode(self) -> str:
+        """Функция возвращяет режим синхронизации: "upload" или "two_way".
+
+        return str: Режим синхронизации.
+        """
+        return self._sync_mode
+
+    def get_conflict_policy(self) -> str:
+        """Функция возвращяет политику разрешения конфликтов двусторонней синхронизации.
+
+        return str: "newer", "local", "remote" или "keep_both".
+        """
+        return self._conflict_policy
+
+    def get_max_idle_interval(self) -> str:
+        """Функция возвращяет максимальный интервал между синхронизациями при отсутствии изменений.
+
+        return str: Интервал в формате hh:mm:ss, пустая строка - восемь базовых интервалов.
+        """
+        return self._max_idle_interval
+
+    def get_sync_pairs(self) -> List[SyncPair]:
+        """Функция возвращяет все синхронизируемые пары директорий: пару из .env и пары из sync_pairs_file.
+
+        return list: Список пар директорий.
+        """
+        pairs = [SyncPair(self._local_directory, self._path_to_cloud_storage, self._token,
+                          self._interval_between_synchronizations, self._max_idle_interval, self._index_file,
+                          self._sync_mode, self._conflict_policy)]
+        if self._sync_pairs_file:
+            pairs.extend(self._load_sync_pairs())
+        return pairs
+
+    def get_ignore_patterns(self) -> List[str]:
+        """Функция возвращяет шаблоны исключения файлов: стандартные и заданные в .env.
+
+        return list: Список шаблонов в формате .gitignore.
+        """
+        return list(DEFAULT_IGNORE_PATTERNS) + [pattern.strip() for pattern in self._ignore_patterns.split(',')
+                                                if pattern.strip()]
+
+    def get_stability_period(self) -> float:
+        """Функция возвращяет время, в течение которого файл не должен меняться перед загрузкой.
+
+        return float: Время в секундах.
+        """
+        return self._stability_period
+
+    def get_webdav_url(self) -> str:
+        """Функция возвращяет адрес WebDAV сервера Яндекс.Диска.
+
+        return str: Адрес сервера.
+        """
+        return self._webdav_url
+
+    def get_webdav_operations(self) -> List[str]:
+        """Функция возвращяет операции, которые выполняются через WebDAV вместо REST API.
+
+        return list: Список операций из upload, delete, move, mkdir, list.
+        """
+        return self._webdav_operations
@@ -0,0 +1,186 @@
+import sqlite3
+
+from loguru import logger
+from typing import Dict, List, Optional, Tuple
+
+from modules.file_table import IndexTable
+
+
+class FileIndex:
+    """Класс для хранения состояния локальных файлов между циклами синхронизации.
+
+    Индекс хранится в базе SQLite и переживает перезапуск программы. Для каждого
+    файла запоминается размер, время модификации в наносекундах, inode, время
+    модификации файла в облачном хранилище и MD5 содержимого на момент последней
+    синхронизации. Отдельная таблица хранит кэш хешей содержимого файлов. Копия
+    индекса и кэша в памяти хранится в таблицах IndexTable: целые значения в
+    массивах, а хеши в двоичном виде.
+
+    Args:
+        index_file (str): Путь к файлу индекса.
+
+    Attributes:
+        index_file (str): Путь к файлу индекса.
+        _entries (IndexTable): Копия индекса в памяти {имя файла: (size, mtime_ns, inode, remote_modified, md5)}.
+        _hashes (IndexTable): Кэш хешей {имя файла: (size, mtime_ns, inode, md5, sha256)}.
+    """
+
+    def __init__(self, index_file: str) -> None:
+        self.index_file = index_file
+        self._connection = sqlite3.connect(self.index_file)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS files ("
+                                 "path TEXT PRIMARY KEY, "
+                                 "size INTEGER NOT NULL, "
+                                 "mtime_ns INTEGER NOT NULL, "
+                                 "inode INTEGER NOT NULL, "
+                                 "remote_modified INTEGER)")
+        columns = [row[1] for row in self._connection.execute("PRAGMA table_info(files)")]
+        if "md5" not in columns:
+            self._connection.execute("ALTER TABLE files ADD COLUMN md5 TEXT")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS hashes ("
+                                 "path TEXT PRIMARY KEY, "
+                                 "size INTEGER NOT NULL, "
+                                 "mtime_ns INTEGER NOT NULL, "
+                                 "inode INTEGER NOT NULL, "
+                                 "md5 TEXT NOT NULL, "
+                                 "sha256 TEXT NOT NULL)")
+        self._connection.commit()
+        self._entries = self._load_table(IndexTable('qqQq', (16,)),
+                                         "SELECT path, size, mtime_ns, inode, remote_modified, md5 FROM files")
+        self._hashes = self._load_table(IndexTable('qqQ', (16, 32)),
+                                        "SELECT path, size, mtime_ns, inode, md5, sha256 FROM hashes")
+        logger.info(f"Загружен индекс {self.index_file}: {len(self._entries)} файлов.")
+
+    def _load_table(self, table: IndexTable, query: str) -> IndexTable:
+        """Функция загружает таблицу индекса из базы в память.
+
+        Имена файлов интернируются в IndexTable.put, поэтому индекс и снимки сканирования
+        хранят одни и те же строки.
+
+        return IndexTable: таблица {имя файла: строка запроса без пути}.
+        """
+        for row in self._connection.execute(query):
+            table.put(row[0], row[1:])
+        return table
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def detect_changes(self, stats: Dict[str, Tuple[int, int, int]]) -> Tuple[List[str], List[str]]:
+        """Метод сравнивает текущее состояние директории с индексом.
+
+        :param stats: словарь или снимок FileSnapshot {имя файла: (size, mtime_ns, inode)} текущего сканирования.
+        :type stats: dict
+        :return: список изменённых или новых файлов и список файлов, пропавших с диска.
+        :rtype: tuple
+        """
+        synced_stat = self._entries.stat
+        changed = [name for name, stat in stats.items() if synced_stat(name) != stat]
+        names = stats.keys()
+        removed = [name for name in self._entries if name not in names]
+        return changed, removed
+
+    def get_remote_modified(self, name: str) -> Optional[int]:
+        """Геттер для времени модификации файла в облаке на момент последней синхронизации.
+
+        :param name: имя файла.
+        :type name: str
+        :return: время в секундах с начала эпохи или None, если файла нет в индексе.
+        :rtype: int
+        """
+        entry = self._entries.get(name)
+        return entry[3] if entry else None
+
+    def get_synced_stat(self, name: str) -> Optional[Tuple[int, int, int]]:
+        """Геттер для кортежа (size, mtime_ns, inode) файла на момент последней синхронизации.
+
+        :param name: имя файла.
+        :type name: str
+        :return: кортеж или None, если файла нет в индексе.
+        :rtype: tuple
+        """
+        return self._entries.stat(name)
+
+    def get_synced_md5(self, name: str) -> Optional[str]:
+        """Геттер для MD5 содержимого файла на момент последней синхронизации.
+
+        :param name: имя файла.
+        :type name: str
+        :return: MD5 или None, если он неизвестен.
+        :rtype: str
+        """
+        entry = self._entries.get(name)
+        return entry[4] if entry else None
+
+    def mark_synced(self, name: str, stat: Tuple[int, int, int], remote_modified: Optional[int] = None,
+                    md5: Optional[str] = None) -> None:
+        """Метод записывает в индекс состояние синхронизированного файла.
+
+        :param name: имя файла.
+        :type name: str
+        :param stat: кортеж (size, mtime_ns, inode) файла.
+        :type stat: tuple
+        :param remote_modified: время модификации файла в облаке в секундах.
+        :type remote_modified: int
+        :param md5: MD5 содержимого файла.
+        :type md5: str
+        """
+        if md5 is None:
+            cached = self.get_cached_hashes(name, stat)
+            md5 = cached[0] if cached else None
+        self._entries.put(name, (*stat, remote_modified, md5))
+        self._connection.execute("INSERT OR REPLACE INTO files (path, size, mtime_ns, inode, remote_modified, md5) "
+                                 "VALUES (?, ?, ?, ?, ?, ?)", (name, *stat, remote_modified, md5))
+
+    def get_cached_hashes(self, name: str, stat: Tuple[int, int, int]) -> Optional[Tuple[str, str]]:
+        """Метод возвращает хеши файла из кэша, если файл не менялся с момента их вычисления.
+
+        :param name: имя файла.
+        :type name: str
+        :param stat: кортеж (size, mtime_ns, inode) файла.
+        :type stat: tuple
+        :return: кортеж (md5, sha256) или None.
+        :rtype: tuple
+        """
+        if self._hashes.stat(name) != stat:
+            return None
+        return self._hashes.get(name)[3:]
+
+    def store_hashes(self, name: str, stat: Tuple[int, int, int], md5: str, sha256: str) -> None:
+        """Метод сохраняет хеши файла в кэш.
+
+        :param name: имя файла.
+        :type name: str
+        :param stat: кортеж (size, mtime_ns, inode) файла.
+        :type stat: tuple
+        :param md5: MD5 содержимого файла.
+        :type md5: str
+        :param sha256: SHA256 содержимого файла.
+        :type sha256: str
+        """
+        self._hashes.put(name, (*stat, md5, sha256))
+        self._connection.execute("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)",
+                                 (name, *stat, md5, sha256))
+
+    def forget(self, name: str) -> None:
+        """Метод удаляет файл из индекса.
+
+        :param name: имя файла.
+        :type name: str
+        """
+        if self._entries.pop(name):
+            self._connection.execute("DELETE FROM files WHERE path = ?", (name,))
+        if self._hashes.pop(name):
+            self._connection.execute("DELETE FROM hashes WHERE path = ?", (name,))
+
+    def commit(self) -> None:
+        """Метод сохраняет накопленные за цикл изменения индекса на диск."""
+        self._connection.commit()
+
+    def close(self) -> None:
+        """Метод сохраняет изменения и закрывает базу индекса."""
+        self._connection.commit()
+        self._connection.close()
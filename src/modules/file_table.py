@@ -0,0 +1,358 @@
+import sys
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+
+NO_HASH_MD5 = bytes(16)
+NO_HASH_SHA256 = bytes(32)
+NO_VALUE = -2 ** 63
+
+
+class RemoteFile(NamedTuple):
+    """Сведения о файле в облачном хранилище.
+
+    Attributes:
+        path (str): Путь относительно синхронизируемой директории.
+        size (int): Размер файла в байтах.
+        md5 (str): MD5 содержимого файла.
+        sha256 (str): SHA256 содержимого файла.
+        modified (int): Время последней модификации в секундах с начала эпохи.
+    """
+    path: str
+    size: int
+    md5: Optional[str]
+    sha256: Optional[str]
+    modified: int
+
+
+class FileTable:
+    """Файлы одной локальной директории в виде столбцов.
+
+    Пути хранятся интернированными строками в порядке сортировки, поэтому поиск
+    выполняется бинарным поиском без словаря, а размер, время модификации в
+    наносекундах и inode - в массивах array по 8 байт на файл. Строки таблицы
+    добавляются в порядке возрастания путей.
+
+    Attributes:
+        names (list): Отсортированные пути файлов относительно корня.
+        sizes (array): Размеры файлов в байтах.
+        mtimes (array): Время модификации файлов в наносекундах.
+        inodes (array): Номера inode файлов.
+    """
+    __slots__ = ('names', 'sizes', 'mtimes', 'inodes')
+
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self.sizes = array('q')
+        self.mtimes = array('q')
+        self.inodes = array('Q')
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, FileTable) and self.names == other.names and self.sizes == other.sizes and \
+            self.mtimes == other.mtimes and self.inodes == other.inodes
+
+    def append(self, name: str, size: int, mtime_ns: int, inode: int) -> None:
+        """Метод добавляет файл в конец таблицы.
+
+        :param name: путь файла относительно корня.
+        :type name: str
+        :param size: размер файла в байтах.
+        :type size: int
+        :param mtime_ns: время модификации в наносекундах.
+        :type mtime_ns: int
+        :param inode: номер inode.
+        :type inode: int
+        """
+        self.names.append(sys.intern(name))
+        self.sizes.append(size)
+        self.mtimes.append(mtime_ns)
+        self.inodes.append(inode)
+
+    def find(self, name: str) -> int:
+        position = bisect_left(self.names, name)
+        return position if position < len(self.names) and self.names[position] == name else -1
+
+    def row(self, position: int) -> Tuple[int, int, int]:
+        return self.sizes[position], self.mtimes[position], self.inodes[position]
+
+    def items(self) -> Iterator[Tuple[str, Tuple[int, int, int]]]:
+        return zip(self.names, zip(self.sizes, self.mtimes, self.inodes))
+
+
+class RemoteTable:
+    """Файлы одной папки облачного хранилища в виде столбцов.
+
+    Хеши хранятся в двоичном виде в общих bytearray (16 байт MD5 и 32 байта SHA256
+    на файл), отсутствующий хеш обозначается нулевыми байтами. Объекты RemoteFile
+    создаются только при обращении к файлу.
+
+    Attributes:
+        names (list): Отсортированные пути файлов относительно синхронизируемой директории.
+        sizes (array): Размеры файлов в байтах.
+        modified (array): Время модификации файлов в секундах.
+        md5 (bytearray): MD5 файлов подряд.
+        sha256 (bytearray): SHA256 файлов подряд.
+    """
+    __slots__ = ('names', 'sizes', 'modified', 'md5', 'sha256')
+
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self.sizes = array('q')
+        self.modified = array('q')
+        self.md5 = bytearray()
+        self.sha256 = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def append(self, name: str, size: int, modified: int, md5: Optional[str], sha256: Optional[str]) -> None:
+        """Метод добавляет файл в конец таблицы.
+
+        :param name: путь файла относительно синхронизируемой директории.
+        :type name: str
+        :param size: размер файла в байтах.
+        :type size: int
+        :param modified: время модификации в секундах.
+        :type modified: int
+        :param md5: MD5 в шестнадцатеричном виде или None.
+        :type md5: str
+        :param sha256: SHA256 в шестнадцатеричном виде или None.
+        :type sha256: str
+        """
+        self.names.append(sys.intern(name))
+        self.sizes.append(size)
+        self.modified.append(modified)
+        self.md5 += bytes.fromhex(md5) if md5 else NO_HASH_MD5
+        self.sha256 += bytes.fromhex(sha256) if sha256 else NO_HASH_SHA256
+
+    def find(self, name: str) -> int:
+        position = bisect_left(self.names, name)
+        return position if position < len(self.names) and self.names[position] == name else -1
+
+    def row(self, position: int) -> RemoteFile:
+        md5 = self.md5[position * 16:position * 16 + 16]
+        sha256 = self.sha256[position * 32:position * 32 + 32]
+        return RemoteFile(self.names[position], self.sizes[position],
+                          md5.hex() if md5 != NO_HASH_MD5 else None,
+                          sha256.hex() if sha256 != NO_HASH_SHA256 else None,
+                          self.modified[position])
+
+    def items(self) -> Iterator[Tuple[str, RemoteFile]]:
+        return ((name, self.row(position)) for position, name in enumerate(self.names))
+
+
+class IndexTable:
+    """Изменяемая таблица файлов индекса в виде столбцов.
+
+    Номер строки файла хранится в словаре {путь: номер строки}, целые значения -
+    в массивах array по 8 байт на файл, а хеши - в двоичном виде в общих bytearray.
+    Отсутствующее целое значение обозначается NO_VALUE, а отсутствующий хеш -
+    нулевыми байтами. Строки удалённых файлов переиспользуются при добавлении новых.
+
+    Args:
+        typecodes (str): Коды типов array столбцов с целыми значениями.
+        hash_sizes (tuple): Длины хешей в байтах.
+
+    Attributes:
+        rows (dict): Номера строк {путь: номер строки}.
+        columns (list): Столбцы с целыми значениями.
+        hashes (list): Столбцы с хешами.
+    """
+    __slots__ = ('rows', 'columns', 'hashes', 'hash_sizes', '_free')
+
+    def __init__(self, typecodes: str, hash_sizes: Tuple[int, ...] = ()) -> None:
+        self.rows: Dict[str, int] = {}
+        self.columns = [array(typecode) for typecode in typecodes]
+        self.hash_sizes = hash_sizes
+        self.hashes = [bytearray() for _ in hash_sizes]
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.rows)
+
+    def stat(self, name: str) -> Optional[Tuple[int, ...]]:
+        """Метод возвращает первые три целых значения строки, обычно (size, mtime_ns, inode).
+
+        :param name: путь файла.
+        :type name: str
+        :return: кортеж или None, если файла нет в таблице.
+        :rtype: tuple
+        """
+        row = self.rows.get(name)
+        if row is None:
+            return None
+        columns = self.columns
+        return columns[0][row], columns[1][row], columns[2][row]
+
+    def get(self, name: str) -> Optional[tuple]:
+        """Метод возвращает строку таблицы.
+
+        :param name: путь файла.
+        :type name: str
+        :return: кортеж из целых значений и хешей в шестнадцатеричном виде или None, если файла нет в таблице.
+        :rtype: tuple
+        """
+        row = self.rows.get(name)
+        if row is None:
+            return None
+        values = [None if column[row] == NO_VALUE else column[row] for column in self.columns]
+        for column, size in zip(self.hashes, self.hash_sizes):
+            value = column[row * size:row * size + size]
+            values.append(value.hex() if any(value) else None)
+        return tuple(values)
+
+    def put(self, name: str, values: tuple) -> None:
+        """Метод добавляет или заменяет строку таблицы.
+
+        :param name: путь файла.
+        :type name: str
+        :param values: целые значения (None - отсутствующее), затем хеши в шестнадцатеричном виде или None.
+        :type values: tuple
+        """
+        row = self.rows.get(name)
+        if row is None:
+            row = self._free.pop() if self._free else len(self.columns[0])
+            if row == len(self.columns[0]):
+                for column in self.columns:
+                    column.append(0)
+                for column, size in zip(self.hashes, self.hash_sizes):
+                    column += bytes(size)
+            self.rows[sys.intern(name)] = row
+        for column, value in zip(self.columns, values):
+            column[row] = NO_VALUE if value is None else value
+        for column, size, value in zip(self.hashes, self.hash_sizes, values[len(self.columns):]):
+            column[row * size:row * size + size] = bytes.fromhex(value) if value else bytes(size)
+
+    def pop(self, name: str) -> bool:
+        """Метод удаляет строку таблицы.
+
+        :param name: путь файла.
+        :type name: str
+        :return: True, если файл был в таблице.
+        :rtype: bool
+        """
+        row = self.rows.pop(name, None)
+        if row is None:
+            return False
+        self._free.append(row)
+        return True
+
+
+class FileSnapshot(Mapping):
+    """Снимок дерева файлов: словарь {путь: сведения о файле} поверх таблиц директорий.
+
+    Снимок не хранит отдельной записи на каждый файл: путь ищется бинарным поиском
+    в таблице его директории, а сведения о файле собираются из столбцов при обращении.
+    Таблицы неизменённых директорий переиспользуются между циклами. Для локальных
+    файлов значением является кортеж (size, mtime_ns, inode), для файлов в облаке -
+    RemoteFile.
+
+    Args:
+        tables (dict): Таблицы {директория: FileTable или RemoteTable}.
+        excluded (set): Пути, которые считаются отсутствующими в снимке.
+
+    Attributes:
+        tables (dict): Таблицы {директория: FileTable или RemoteTable}.
+        excluded (frozenset): Пути, которые считаются отсутствующими в снимке.
+    """
+    __slots__ = ('tables', 'excluded', '_length')
+
+    def __init__(self, tables: Optional[dict] = None, excluded: Iterable[str] = ()) -> None:
+        self.tables = {directory: table for directory, table in (tables or {}).items() if len(table)}
+        self.excluded = frozenset(name for name in excluded if self._find(name)[0] is not None)
+        self._length = sum(len(table) for table in self.tables.values()) - len(self.excluded)
+
+    def _find(self, name: str) -> Tuple[Optional[object], int]:
+        table = self.tables.get(name.rpartition('/')[0])
+        if table is None:
+            return None, -1
+        position = table.find(name)
+        return (table, position) if position >= 0 else (None, -1)
+
+    def __getitem__(self, name: str):
+        if name in self.excluded:
+            raise KeyError(name)
+        table, position = self._find(name)
+        if table is None:
+            raise KeyError(name)
+        return table.row(position)
+
+    def get(self, name: str, default=None):
+        if name in self.excluded:
+            return default
+        table, position = self._find(name)
+        return table.row(position) if table is not None else default
+
+    def __contains__(self, name) -> bool:
+        return isinstance(name, str) and name not in self.excluded and self._find(name)[0] is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for table in self.tables.values():
+            if self.excluded:
+                yield from (name for name in table.names if name not in self.excluded)
+            else:
+                yield from table.names
+
+    def __len__(self) -> int:
+        return self._length
+
+    def items(self) -> Iterator[tuple]:
+        for table in self.tables.values():
+            if self.excluded:
+                yield from ((name, value) for name, value in table.items() if name not in self.excluded)
+            else:
+                yield from table.items()
+
+    def keys(self) -> Set[str]:
+        """Метод возвращает множество путей снимка, над которым выполняются операции множеств.
+
+        :return: множество путей.
+        :rtype: set
+        """
+        names = set()
+        for table in self.tables.values():
+            names.update(table.names)
+        return names - self.excluded if self.excluded else names
+
+    def without(self, names: Iterable[str]) -> 'FileSnapshot':
+        """Метод возвращает снимок без указанных путей, не копируя таблицы.
+
+        :param names: исключаемые пути.
+        :type names: Iterable
+        :return: новый снимок.
+        :rtype: FileSnapshot
+        """
+        return FileSnapshot(self.tables, self.excluded | set(names))
+
+
+def build_remote_tables(files: Dict[str, List[Tuple[str, dict]]], parse_modified) -> Dict[str, RemoteTable]:
+    """Функция собирает таблицы файлов облачного хранилища из ответов API, сгруппированных по папкам.
+
+    :param files: словарь {папка: [(путь, ресурс из ответа API)]}.
+    :type files: dict
+    :param parse_modified: функция, переводящая строку времени модификации в секунды.
+    :type parse_modified: Callable
+    :return: словарь {папка: RemoteTable}.
+    :rtype: dict
+    """
+    tables = {}
+    for folder, items in files.items():
+        table = RemoteTable()
+        items.sort(key=lambda pair: pair[0])
+        for path, item in items:
+            table.append(path, item.get('size', 0), parse_modified(item['modified']), item.get('md5'),
+                         item.get('sha256'))
+        tables[folder] = table
+    return tables
@@ -1,26 +1,54 @@
 import os
 import time
 
-from datetime import datetime, timedelta, timezone
+from datetime import datetime
+
+from modules.file_table import FileTable
+
 
 class FileInTheCheckedDirectory:
     """Класс для работы с лочальными файлами в директории.
-    
+
+    Объект не хранит копию сведений о файле, а ссылается на строку таблицы
+    FileTable, заполненной при сканировании директории: имя, размер, время
+    модификации и inode читаются из её столбцов при обращении.
+
     Args:
-        file_name (str): Имя файла.
+        table (FileTable): Таблица файлов директории.
+        position (int): Номер строки файла в таблице.
         path (str): путь к локальной директории.
-        
+
     Attributes:
-        file_name (str): Имя файла.
+        table (FileTable): Таблица файлов директории.
+        position (int): Номер строки файла в таблице.
         path (str): путь к локальной директории.
+        name (str): Имя файла.
         file_modification_date (datetime): дата и время последней модификации файла.
     """
-    
-    def __init__(self, file_name, path) -> None:
-        self.name = file_name
+    __slots__ = ('table', 'position', 'path')
+
+    def __init__(self, table: FileTable, position: int, path: str) -> None:
+        self.table = table
+        self.position = position
         self.path = path
-        self.file_modification_date = self.set_the_last_modification_date_of_a_file()
-           
+
+    @property
+    def name(self) -> str:
+        return self.table.names[self.position]
+
+    @property
+    def size(self) -> int:
+        return self.table.sizes[self.position]
+
+    @property
+    def stat(self) -> tuple:
+        """Кортеж (size, mtime_ns, inode) файла из результата сканирования."""
+        return self.table.row(self.position)
+
+    @property
+    def file_modification_date(self) -> datetime:
+        return datetime.fromtimestamp(self.table.mtimes[self.position] / 1e9)
+
     def get_file_path(self) -> str:
         """Функция возвращает абсолютный путь к файлу.
 
@@ -29,36 +57,35 @@ class FileInTheCheckedDirectory:
         """
         file_path = os.path.abspath(os.path.join(self.path, self.name))
         return file_path
-    
+
     def get_file_name(self) -> str:
         """Геттер для получении имени файла.
-        
+
         return: name
         rtype: str
         """
         return self.name
-    
-    def get_modification_date(self) -> str:
-        """Геттер для получения даты последнего изменения файла. 
-        
+
+    def get_modification_date(self) -> datetime:
+        """Геттер для получения даты последнего изменения файла.
+
         return: file_modification_date
         rtype: datetime
         """
         return self.file_modification_date
-     
-    def set_the_last_modification_date_of_a_file(self):
-        """Функция устанавливает время последнего изменения файла.
+
+    def set_the_last_modification_date_of_a_file(self) -> datetime:
+        """Функция читает с диска время последнего изменения файла.
 
         return: дату и время последней модификации.
         rtype: datetime
         """
         modification_date = datetime.fromtimestamp(os.path.getmtime(self.get_file_path()))
         return modification_date
-    
+
     def time_format_conversion(self):
         "Функция конвертирует дату и время на локальной в дату и время в UTC"
         time_now = -time.timezone
-        modification_date = int(self.checking_the_last_modification_date_of_a_file().timestamp())
+        modification_date = int(self.get_modification_date().timestamp())
         utc_time = datetime.fromtimestamp(modification_date - time_now)
         return utc_time
- 
\ No newline at end of file
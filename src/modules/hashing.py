@@ -0,0 +1,142 @@
+import hashlib
+import os
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from loguru import logger
+from typing import Dict, Optional, Tuple
+
+from modules.file_index import FileIndex
+from modules.metrics import METRICS, Metrics
+
+
+HASH_CHUNK_SIZE = 1024 * 1024
+HASH_WORKERS = 4
+
+_shared_pool: Optional[ThreadPoolExecutor] = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_hashing_pool() -> ThreadPoolExecutor:
+    """Функция возвращает общий для всех синхронизируемых директорий пул потоков хеширования.
+
+    :return: пул из HASH_WORKERS потоков.
+    :rtype: ThreadPoolExecutor
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="hashing")
+        return _shared_pool
+
+
+def compute_file_hashes(path: str) -> Tuple[str, str]:
+    """Функция вычисляет MD5 и SHA256 файла за одно чтение блоками фиксированного размера.
+
+    :param path: путь к файлу.
+    :type path: str
+    :return: кортеж (md5, sha256) в шестнадцатеричном виде.
+    :rtype: tuple
+    """
+    md5 = hashlib.md5()
+    sha256 = hashlib.sha256()
+    buffer = bytearray(HASH_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as file:
+        while True:
+            size = file.readinto(buffer)
+            if not size:
+                break
+            md5.update(view[:size])
+            sha256.update(view[:size])
+    return md5.hexdigest(), sha256.hexdigest()
+
+
+class FileHasher:
+    """Класс для вычисления хешей локальных файлов с кэшированием результатов.
+
+    Хеши вычисляются в пуле потоков (hashlib освобождает GIL на больших блоках)
+    и сохраняются в индексе с ключом (size, mtime_ns, inode), поэтому неизменённый
+    файл повторно не читается даже после перезапуска программы. Число прочитанных
+    файлов и байт, время хеширования и попадания в кэш суммируются в метриках и
+    накапливаются до вызова take_cycle_stats, который возвращает их для итогов цикла.
+
+    Args:
+        index (FileIndex): Индекс локальных файлов, в котором хранится кэш хешей.
+        pool (ThreadPoolExecutor): Пул потоков для вычисления хешей, по умолчанию общий.
+        metrics (Metrics): Реестр метрик.
+
+    Attributes:
+        index (FileIndex): Индекс локальных файлов.
+        _cycle (dict): Статистика хеширования с последнего вызова take_cycle_stats.
+    """
+
+    def __init__(self, index: FileIndex, pool: Optional[ThreadPoolExecutor] = None,
+                 metrics: Metrics = METRICS) -> None:
+        self.index = index
+        self.metrics = metrics
+        self._pool = pool or get_hashing_pool()
+        self._cycle = {'files': 0, 'bytes': 0, 'cache_hits': 0, 'seconds': 0.0}
+
+    def take_cycle_stats(self) -> dict:
+        """Метод возвращает статистику хеширования за цикл и начинает новый цикл.
+
+        :return: словарь с числом прочитанных файлов и байт, попаданий в кэш, временем
+                 хеширования, скоростью в байтах в секунду и долей попаданий в кэш.
+        :rtype: dict
+        """
+        cycle = self._cycle
+        self._cycle = {'files': 0, 'bytes': 0, 'cache_hits': 0, 'seconds': 0.0}
+        requested = cycle['files'] + cycle['cache_hits']
+        cycle['throughput'] = round(cycle['bytes'] / cycle['seconds']) if cycle['seconds'] else 0
+        cycle['cache_hit_rate'] = round(cycle['cache_hits'] / requested, 4) if requested else 0.0
+        cycle['seconds'] = round(cycle['seconds'], 4)
+        return cycle
+
+    def hash_files(self, path: str, stats: Dict[str, Tuple[int, int, int]]) -> Dict[str, Tuple[str, str]]:
+        """Метод возвращает хеши указанных файлов, вычисляя только отсутствующие в кэше.
+
+        :param path: путь к локальной директории.
+        :type path: str
+        :param stats: словарь {имя файла: (size, mtime_ns, inode)}.
+        :type stats: dict
+        :return: словарь {имя файла: (md5, sha256)}, файлы с ошибкой чтения пропускаются.
+        :rtype: dict
+        """
+        hashes = {}
+        missing = []
+        for name, stat in stats.items():
+            cached = self.index.get_cached_hashes(name, stat)
+            if cached:
+                hashes[name] = cached
+            else:
+                missing.append(name)
+        if not stats:
+            return hashes
+
+        start = time.perf_counter()
+        futures = {name: self._pool.submit(compute_file_hashes, os.path.join(path, name)) for name in missing}
+        hashed_bytes = 0
+        for name, future in futures.items():
+            try:
+                hashes[name] = future.result()
+            except OSError as ex:
+                logger.error(f"Не удалось вычислить хеш файла '{name}': {ex}")
+                continue
+            self.index.store_hashes(name, stats[name], *hashes[name])
+            hashed_bytes += stats[name][0]
+        duration = time.perf_counter() - start
+        cache_hits = len(stats) - len(missing)
+        self._cycle['files'] += len(missing)
+        self._cycle['bytes'] += hashed_bytes
+        self._cycle['cache_hits'] += cache_hits
+        self._cycle['seconds'] += duration
+        self.metrics.inc('synchroniser_hashed_files_total', len(missing))
+        self.metrics.inc('synchroniser_hashed_bytes_total', hashed_bytes)
+        self.metrics.inc('synchroniser_hash_seconds_total', duration)
+        self.metrics.inc('synchroniser_hash_cache_hits_total', cache_hits)
+        logger.info(f"Хеширование: {len(missing)} файлов, {hashed_bytes / 2 ** 20:.1f} МБ за {duration:.2f} с "
+                    f"({hashed_bytes / 2 ** 20 / duration if hashed_bytes else 0:.1f} МБ/с), "
+                    f"из кэша {cache_hits} из {len(stats)}.")
+        return hashes
@@ -0,0 +1,195 @@
+import os
+import re
+
+from loguru import logger
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+from api_clients.download_stream import PART_SUFFIX
+
+
+IGNORE_FILE_NAME = '.syncignore'
+DEFAULT_IGNORE_PATTERNS = ('*' + PART_SUFFIX, '*.part', '*.crdownload', '*.tmp', '*.swp', '*.swx', '*~',
+                           '.#*', '~$*', '.DS_Store', 'Thumbs.db')
+
+Rule = Tuple[Pattern, bool, bool]
+
+
+def compile_pattern(pattern: str) -> Optional[Rule]:
+    """Функция переводит строку шаблона в формате .gitignore в регулярное выражение.
+
+    Поддерживаются комментарии, отрицание "!", шаблоны только для директорий
+    с "/" на конце, привязка к директории файла правил при наличии "/" в начале
+    или середине шаблона, а также "*", "?", "[...]" и "**".
+
+    :param pattern: строка шаблона.
+    :type pattern: str
+    :return: тройка (регулярное выражение, отрицание, только для директорий) или None
+             для пустых строк и комментариев.
+    :rtype: tuple
+    """
+    pattern = pattern.rstrip('\n')
+    if pattern.endswith(' ') and not pattern.endswith('\\ '):
+        pattern = pattern.rstrip(' ')
+    if not pattern or pattern.startswith('#'):
+        return None
+    negate = pattern.startswith('!')
+    if negate:
+        pattern = pattern[1:]
+    elif pattern.startswith('\\'):
+        pattern = pattern[1:]
+    directory_only = pattern.endswith('/')
+    pattern = pattern.rstrip('/')
+    if not pattern:
+        return None
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+
+    regex, position = [], 0
+    while position < len(pattern):
+        char = pattern[position]
+        if pattern.startswith('**/', position):
+            regex.append('(?:.*/)?')
+            position += 3
+            continue
+        if pattern.startswith('/**', position) and position + 3 == len(pattern):
+            regex.append('/.*')
+            position += 3
+            continue
+        if pattern.startswith('**', position):
+            regex.append('.*')
+            position += 2
+            continue
+        if char == '*':
+            regex.append('[^/]*')
+        elif char == '?':
+            regex.append('[^/]')
+        elif char == '[':
+            end = pattern.find(']', position + 2 if pattern[position + 1:position + 2] in ('!', ']') else position + 1)
+            if end < 0:
+                regex.append('\\[')
+            else:
+                body = pattern[position + 1:end].replace('\\', '\\\\')
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                regex.append(f'[{body}]')
+                position = end
+        elif char == '\\' and position + 1 < len(pattern):
+            position += 1
+            regex.append(re.escape(pattern[position]))
+        else:
+            regex.append(re.escape(char))
+        position += 1
+    prefix = '' if anchored else '(?:.*/)?'
+    return re.compile(f'{prefix}{"".join(regex)}', re.DOTALL), negate, directory_only
+
+
+class IgnoreRules:
+    """Правила исключения файлов из синхронизации в формате .gitignore.
+
+    Глобальные шаблоны задаются в настройках и действуют во всём дереве. Кроме
+    того, в любой директории может лежать файл IGNORE_FILE_NAME, шаблоны которого
+    действуют относительно этой директории. Как и в git, побеждает последнее
+    подходящее правило, правила вложенной директории важнее правил родительской,
+    а содержимое исключённой директории не просматривается и не может быть
+    возвращено отрицанием. Правила файла IGNORE_FILE_NAME перечитываются, когда
+    меняется время его модификации.
+
+    Args:
+        root (str): Путь к синхронизируемой директории.
+        patterns (Iterable): Глобальные шаблоны.
+
+    Attributes:
+        root (str): Путь к синхронизируемой директории.
+        _global_rules (list): Скомпилированные глобальные шаблоны.
+        _directory_rules (dict): Правила из файлов директорий {директория: (mtime_ns, правила)}.
+        _ignored_directories (dict): Кэш решений по директориям {директория: исключена ли она}.
+    """
+
+    def __init__(self, root: str, patterns: Iterable[str] = DEFAULT_IGNORE_PATTERNS) -> None:
+        self.root = root
+        self._global_rules = [rule for rule in map(compile_pattern, patterns) if rule]
+        self._directory_rules: Dict[str, Tuple[int, List[Rule]]] = {}
+        self._ignored_directories: Dict[str, bool] = {}
+
+    def load_directory(self, directory: str, present: Optional[bool] = None) -> None:
+        """Метод читает файл правил директории, если он появился, изменился или был удалён.
+
+        :param directory: путь директории относительно корня, "" - корень.
+        :type directory: str
+        :param present: есть ли в директории файл правил, None - проверить на диске.
+        :type present: bool
+        """
+        path = os.path.join(self.root, directory, IGNORE_FILE_NAME)
+        mtime_ns = None
+        if present is not False:
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                pass
+        cached = self._directory_rules.get(directory)
+        if mtime_ns is None:
+            if cached is None or cached[1]:
+                self._directory_rules[directory] = (0, [])
+                if cached is not None:
+                    self._ignored_directories.clear()
+            return
+        if cached and cached[0] == mtime_ns:
+            return
+        try:
+            with open(path, encoding='utf-8', errors='replace') as file:
+                rules = [rule for rule in map(compile_pattern, file) if rule]
+        except OSError as ex:
+            logger.warning(f"Не удалось прочитать файл правил {path}: {ex}")
+            rules = []
+        self._directory_rules[directory] = (mtime_ns, rules)
+        self._ignored_directories.clear()
+
+    def _match(self, path: str, is_dir: bool) -> bool:
+        ignored = False
+        for rule, negate, directory_only in self._global_rules:
+            if (is_dir or not directory_only) and rule.fullmatch(path):
+                ignored = not negate
+        parts = path.split('/')
+        for depth in range(len(parts)):
+            base = '/'.join(parts[:depth])
+            if base not in self._directory_rules:
+                self.load_directory(base)
+            relative_path = '/'.join(parts[depth:])
+            for rule, negate, directory_only in self._directory_rules[base][1]:
+                if (is_dir or not directory_only) and rule.fullmatch(relative_path):
+                    ignored = not negate
+        return ignored
+
+    def is_ignored(self, path: str, is_dir: bool = False) -> bool:
+        """Метод проверяет, исключён ли путь из синхронизации.
+
+        Путь исключён, если подходит под правила он сам или одна из его родительских директорий.
+
+        :param path: путь относительно корня через "/".
+        :type path: str
+        :param is_dir: является ли путь директорией.
+        :type is_dir: bool
+        :return: True, если путь исключён.
+        :rtype: bool
+        """
+        directory = path.rpartition('/')[0]
+        if directory and self.is_ignored_directory(directory):
+            return True
+        if is_dir:
+            return self.is_ignored_directory(path)
+        return self._match(path, False)
+
+    def is_ignored_directory(self, directory: str) -> bool:
+        """Метод проверяет, исключена ли директория вместе с её родительскими директориями.
+
+        :param directory: путь директории относительно корня.
+        :type directory: str
+        :return: True, если директория исключена.
+        :rtype: bool
+        """
+        ignored = self._ignored_directories.get(directory)
+        if ignored is None:
+            parent = directory.rpartition('/')[0]
+            ignored = bool(parent) and self.is_ignored_directory(parent) or self._match(directory, True)
+            self._ignored_directories[directory] = ignored
+        return ignored
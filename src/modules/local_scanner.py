@@ -0,0 +1,108 @@
+import os
+
+from loguru import logger
+from typing import Dict, List, Optional, Set, Tuple
+
+from modules.file_table import FileSnapshot, FileTable
+from modules.ignore_rules import IGNORE_FILE_NAME, IgnoreRules
+
+
+class LocalScanner:
+    """Класс для рекурсивного обхода локальной директории через os.scandir.
+
+    Для каждого файла выполняется ровно один вызов stat через DirEntry.stat(), а
+    результаты обхода каждой директории хранятся в компактной таблице FileTable.
+    Если таблица директории после повторного чтения совпала с прошлой, используется
+    прошлая таблица, поэтому снимки соседних циклов разделяют неизменённые таблицы.
+    Сканер запоминает время модификации каждой директории, и при включённом
+    режиме prune_unchanged_directories содержимое директорий, время модификации
+    которых не изменилось, берётся из результатов прошлого обхода без stat файлов.
+    Время модификации директории меняется только при добавлении, удалении или
+    переименовании записей, поэтому этот режим безопасен лишь при отслеживании
+    изменений файлов через inotify. Файлы и директории, исключённые правилами
+    IgnoreRules, пропускаются до вызова stat, а в исключённые директории сканер
+    не заходит.
+
+    Args:
+        root (str): Путь к синхронизируемой директории.
+        prune_unchanged_directories (bool): Пропускать ли директории без изменений.
+        ignore_rules (IgnoreRules): Правила исключения, по умолчанию шаблоны DEFAULT_IGNORE_PATTERNS.
+
+    Attributes:
+        root (str): Путь к синхронизируемой директории.
+        prune_unchanged_directories (bool): Пропускать ли директории без изменений.
+        ignore_rules (IgnoreRules): Правила исключения.
+        _directories (dict): Результаты прошлого обхода
+                             {директория: (mtime_ns, FileTable, [поддиректории])}.
+    """
+
+    def __init__(self, root: str, prune_unchanged_directories: bool = False,
+                 ignore_rules: Optional[IgnoreRules] = None) -> None:
+        self.root = root
+        self.prune_unchanged_directories = prune_unchanged_directories
+        self.ignore_rules = ignore_rules if ignore_rules is not None else IgnoreRules(root)
+        self._directories: Dict[str, Tuple[int, FileTable, List[str]]] = {}
+
+    def scan_directory(self, relative_path: str, absolute_path: str) -> Tuple[FileTable, List[str]]:
+        """Метод читает содержимое одной директории без обхода поддиректорий.
+
+        :param relative_path: путь директории относительно корня.
+        :type relative_path: str
+        :param absolute_path: абсолютный путь директории.
+        :type absolute_path: str
+        :return: таблица файлов и список поддиректорий.
+        :rtype: tuple
+        """
+        files, subdirectories = FileTable(), []
+        with os.scandir(absolute_path) as iterator:
+            entries = sorted(iterator, key=lambda entry: entry.name)
+        self.ignore_rules.load_directory(relative_path, any(entry.name == IGNORE_FILE_NAME for entry in entries))
+        for entry in entries:
+            path = f"{relative_path}/{entry.name}" if relative_path else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if not self.ignore_rules.is_ignored_directory(path):
+                    subdirectories.append(path)
+            elif not self.ignore_rules.is_ignored(path) and entry.is_file():
+                stat = entry.stat()
+                files.append(path, stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        return files, subdirectories
+
+    def scan(self, full: bool = False) -> Tuple[FileSnapshot, Set[str]]:
+        """Метод обходит дерево директории.
+
+        :param full: выполнить полный обход без пропуска неизменённых директорий.
+        :type full: bool
+        :return: снимок {путь файла: (size, mtime_ns, inode)} и множество путей директорий,
+                 пути указываются относительно корня через "/".
+        :rtype: tuple
+        """
+        tables, directories = {}, set()
+        scanned = {}
+        stack = ['']
+        while stack:
+            relative_path = stack.pop()
+            absolute_path = os.path.join(self.root, relative_path) if relative_path else self.root
+            try:
+                mtime_ns = os.stat(absolute_path).st_mtime_ns
+                cached = self._directories.get(relative_path)
+                if self.prune_unchanged_directories and not full and cached and cached[0] == mtime_ns:
+                    directory_files, subdirectories = cached[1], cached[2]
+                else:
+                    directory_files, subdirectories = self.scan_directory(relative_path, absolute_path)
+                    if cached and cached[1] == directory_files:
+                        directory_files = cached[1]
+            except OSError as ex:
+                if not relative_path:
+                    raise
+                logger.warning(f"Не удалось прочитать директорию {absolute_path}: {ex}")
+                continue
+            scanned[relative_path] = (mtime_ns, directory_files, subdirectories)
+            tables[relative_path] = directory_files
+            directories.update(subdirectories)
+            stack.extend(subdirectories)
+        self._directories = scanned
+        return FileSnapshot(tables), directories
+
+    def reset(self) -> None:
+        """Метод забывает результаты прошлого обхода, чтобы следующий обход прочитал все директории."""
+        self._directories = {}
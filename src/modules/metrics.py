@@ -0,0 +1,242 @@
+import cProfile
+import json
+import threading
+import time
+
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from loguru import logger
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_DESCRIPTIONS = {
+    'synchroniser_phase_seconds': 'Длительность фаз цикла синхронизации.',
+    'synchroniser_cycles_total': 'Число выполненных циклов синхронизации.',
+    'synchroniser_api_request_seconds': 'Время ответа API по адресам.',
+    'synchroniser_api_requests_total': 'Число запросов к API по адресам.',
+    'synchroniser_api_errors_total': 'Число ошибок соединения и ответов 5xx по адресам.',
+    'synchroniser_api_throttled_total': 'Число ответов 429 по адресам.',
+    'synchroniser_operations_total': 'Число операций с файлами по типу и результату.',
+    'synchroniser_uploaded_bytes_total': 'Объём загруженных данных в байтах.',
+    'synchroniser_upload_seconds_total': 'Суммарное время передачи загруженных файлов.',
+    'synchroniser_downloaded_bytes_total': 'Объём скачанных данных в байтах.',
+    'synchroniser_hashed_files_total': 'Число прочитанных для вычисления хешей файлов.',
+    'synchroniser_hashed_bytes_total': 'Объём прочитанных для вычисления хешей данных в байтах.',
+    'synchroniser_hash_seconds_total': 'Суммарное время вычисления хешей.',
+    'synchroniser_hash_cache_hits_total': 'Число хешей, взятых из кэша индекса.',
+    'synchroniser_transfer_queue_depth': 'Число операций в очереди исполнителя.',
+    'synchroniser_event_queue_depth': 'Число событий файловой системы в очереди.',
+    'synchroniser_journal_operations_total': 'Число операций, записанных в журнал.',
+    'synchroniser_journal_entries_total': 'Число созданных записей журнала после объединения операций.',
+    'synchroniser_journal_pending': 'Число незавершённых операций в журнале.',
+}
+
+
+def _escape_label_value(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape_label_value(value)}"' for key, value in pairs) + '}'
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами интервалов в формате Prometheus."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for position, border in enumerate(self.buckets):
+            if value <= border:
+                self.counts[position] += 1
+                break
+
+
+class Metrics:
+    """Реестр метрик программы: счётчики, измерители и гистограммы с метками.
+
+    Метрики отдаются в текстовом формате Prometheus, а итоги каждого цикла
+    синхронизации записываются отдельной JSON-строкой.
+
+    Args:
+        summary_file (str): Путь к файлу для записи итогов циклов, None - итоги пишутся в лог.
+
+    Attributes:
+        summary_file (str): Путь к файлу для записи итогов циклов.
+    """
+
+    def __init__(self, summary_file: Optional[str] = None) -> None:
+        self.summary_file = summary_file
+        self._counters: Dict[str, Dict[tuple, float]] = {}
+        self._gauges: Dict[str, Dict[tuple, float]] = {}
+        self._histograms: Dict[str, Dict[tuple, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Метод увеличивает счётчик."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        """Метод устанавливает значение измерителя."""
+        with self._lock:
+            self._gauges.setdefault(name, {})[tuple(sorted(labels.items()))] = value
+
+    def add(self, name: str, value: float, **labels) -> None:
+        """Метод изменяет значение измерителя на указанную величину."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._gauges.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Метод добавляет наблюдение в гистограмму."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            series.setdefault(key, Histogram()).observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[dict]:
+        """Контекстный менеджер, измеряющий длительность блока в гистограмме.
+
+        Длительность также записывается в ключ "seconds" возвращаемого словаря.
+        """
+        result = {}
+        start = time.perf_counter()
+        try:
+            yield result
+        finally:
+            result['seconds'] = time.perf_counter() - start
+            self.observe(name, result['seconds'], **labels)
+
+    def render(self) -> str:
+        """Метод возвращает все метрики в текстовом формате Prometheus."""
+        lines: List[str] = []
+        with self._lock:
+            for kind, metrics in (('counter', self._counters), ('gauge', self._gauges)):
+                for name, series in sorted(metrics.items()):
+                    self._render_header(lines, name, kind)
+                    for labels, value in series.items():
+                        lines.append(f'{name}{_format_labels(labels)} {value}')
+            for name, series in sorted(self._histograms.items()):
+                self._render_header(lines, name, 'histogram')
+                for labels, histogram in series.items():
+                    cumulative = 0
+                    for border, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{_format_labels(labels, ("le", str(border)))} {cumulative}')
+                    lines.append(f'{name}_bucket{_format_labels(labels, ("le", "+Inf"))} {histogram.count}')
+                    lines.append(f'{name}_sum{_format_labels(labels)} {histogram.sum}')
+                    lines.append(f'{name}_count{_format_labels(labels)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _render_header(lines: List[str], name: str, kind: str) -> None:
+        if name in METRIC_DESCRIPTIONS:
+            lines.append(f'# HELP {name} {METRIC_DESCRIPTIONS[name]}')
+        lines.append(f'# TYPE {name} {kind}')
+
+    def write_cycle_summary(self, summary: dict) -> None:
+        """Метод записывает итоги цикла синхронизации одной JSON-строкой.
+
+        :param summary: итоги цикла.
+        :type summary: dict
+        """
+        self.inc('synchroniser_cycles_total')
+        line = json.dumps(summary, ensure_ascii=False)
+        if self.summary_file:
+            with open(self.summary_file, 'a', encoding='utf-8') as file:
+                file.write(line + '\n')
+        else:
+            logger.debug(f"Итоги цикла: {line}")
+
+
+METRICS = Metrics()
+
+
+class MetricsServer:
+    """HTTP сервер, отдающий метрики в формате Prometheus по адресу /metrics.
+
+    Args:
+        port (int): Порт сервера.
+        metrics (Metrics): Реестр метрик.
+        host (str): Адрес, на котором слушает сервер.
+    """
+
+    def __init__(self, port: int, metrics: Metrics = METRICS, host: str = '127.0.0.1') -> None:
+        registry = metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True, name='metrics').start()
+        logger.info(f"Метрики доступны по адресу http://{host}:{self._server.server_port}/metrics.")
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class CycleProfiler:
+    """Класс для профилирования одного цикла синхронизации через cProfile.
+
+    Профилирование включается методом request, например из обработчика сигнала,
+    и выполняется для ближайшего цикла. Результат сохраняется в файл, который
+    можно открыть через pstats или snakeviz.
+
+    Args:
+        profile_file (str): Путь к файлу для сохранения профиля.
+        profile_first_cycle (bool): Профилировать ли первый цикл.
+    """
+
+    def __init__(self, profile_file: str, profile_first_cycle: bool = False) -> None:
+        self.profile_file = profile_file
+        self._requested = profile_first_cycle
+
+    def request(self, *args) -> None:
+        """Метод запрашивает профилирование следующего цикла."""
+        self._requested = True
+
+    @contextmanager
+    def cycle(self) -> Iterator[None]:
+        """Контекстный менеджер, профилирующий цикл, если профилирование было запрошено."""
+        if not self._requested:
+            yield
+            return
+        self._requested = False
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(self.profile_file)
+            logger.info(f"Профиль цикла синхронизации сохранён в {self.profile_file}.")
@@ -0,0 +1,215 @@
+import os
+import sqlite3
+import threading
+
+from loguru import logger
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from modules.metrics import METRICS, Metrics
+from modules.transfer_executor import LOAD, RELOAD, DELETE, MOVE
+
+
+COALESCED_OPERATIONS = {
+    (LOAD, LOAD): LOAD,
+    (LOAD, RELOAD): LOAD,
+    (LOAD, DELETE): None,
+    (RELOAD, LOAD): RELOAD,
+    (RELOAD, RELOAD): RELOAD,
+    (RELOAD, DELETE): DELETE,
+    (DELETE, LOAD): RELOAD,
+    (DELETE, RELOAD): RELOAD,
+    (DELETE, DELETE): DELETE,
+}
+
+
+class JournalEntry(NamedTuple):
+    """Незавершённая операция с облачным хранилищем.
+
+    Attributes:
+        operation (str): Тип операции: load, reload, delete или move.
+        name (str): Путь к файлу относительно синхронизируемой директории.
+        source (str): Старый путь файла для операции move.
+        operations (int): Число операций, объединённых в эту запись.
+        started (bool): Признак того, что выполнение операции начиналось.
+        sequence (int): Номер версии записи.
+    """
+    operation: str
+    name: str
+    source: Optional[str] = None
+    operations: int = 1
+    started: bool = False
+    sequence: int = 0
+
+
+def journal_file_for(index_file: str) -> str:
+    """Функция возвращает путь к журналу операций, который хранится рядом с индексом.
+
+    :param index_file: путь к файлу индекса.
+    :type index_file: str
+    :return: путь вида "<индекс без расширения>.journal.sqlite3".
+    :rtype: str
+    """
+    return f"{os.path.splitext(index_file)[0]}.journal.sqlite3"
+
+
+class OperationJournal:
+    """Журнал незавершённых операций с облачным хранилищем (write-ahead log).
+
+    Операции записываются в журнал до постановки в очередь исполнителя, перед
+    выполнением отмечаются как начатые, а после успешного выполнения удаляются
+    из журнала. Каждое изменение сразу сохраняется в базе SQLite в режиме WAL,
+    поэтому после аварийного завершения процесса в журнале остаются только
+    невыполненные операции.
+
+    По каждому файлу хранится не больше одной записи: новая операция объединяется
+    с ожидающей по таблице COALESCED_OPERATIONS, поэтому многократные изменения
+    файла приводят к одной загрузке, а удаление ещё не загруженного файла отменяет
+    его загрузку. Ожидающее перемещение, с которым объединяется новая операция,
+    раскладывается на удаление старого пути и загрузку нового. Если выполнение
+    записи уже начиналось, её результат считается неизвестным и загрузка
+    объединяется как перезапись.
+
+    Args:
+        journal_file (str): Путь к файлу журнала или ":memory:".
+        metrics (Metrics): Реестр метрик.
+
+    Attributes:
+        journal_file (str): Путь к файлу журнала.
+        _entries (dict): Копия журнала в памяти {путь: JournalEntry}.
+    """
+
+    def __init__(self, journal_file: str, metrics: Metrics = METRICS) -> None:
+        self.journal_file = journal_file
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(journal_file, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS operations ("
+                                 "path TEXT PRIMARY KEY, "
+                                 "operation TEXT NOT NULL, "
+                                 "source TEXT, "
+                                 "operations INTEGER NOT NULL, "
+                                 "started INTEGER NOT NULL, "
+                                 "sequence INTEGER NOT NULL)")
+        self._connection.commit()
+        self._entries: Dict[str, JournalEntry] = {
+            row[0]: JournalEntry(row[1], row[0], row[2], row[3], bool(row[4]), row[5]) for row in
+            self._connection.execute("SELECT path, operation, source, operations, started, sequence FROM operations")}
+        self._sequence = max((entry.sequence for entry in self._entries.values()), default=0)
+        self.metrics.set('synchroniser_journal_pending', len(self._entries))
+        if self._entries:
+            logger.info(f"В журнале {journal_file} {len(self._entries)} незавершённых операций.")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def pending(self) -> List[JournalEntry]:
+        """Метод возвращает незавершённые операции.
+
+        :return: список записей журнала.
+        :rtype: list
+        """
+        with self._lock:
+            return list(self._entries.values())
+
+    def _put(self, name: str, operation: Optional[str], source: Optional[str], operations: int) -> None:
+        if operation is None:
+            del self._entries[name]
+            self._connection.execute("DELETE FROM operations WHERE path = ?", (name,))
+            return
+        self._sequence += 1
+        self._entries[name] = JournalEntry(operation, name, source, operations, False, self._sequence)
+        self._connection.execute("INSERT OR REPLACE INTO operations VALUES (?, ?, ?, ?, ?, ?)",
+                                 (name, operation, source, operations, 0, self._sequence))
+
+    def _merge(self, operation: str, name: str, source: Optional[str], touched: Dict[str, None]) -> None:
+        touched[name] = None
+        previous = self._entries.get(name)
+        if previous is None and operation != MOVE:
+            self._put(name, operation, source, 1)
+            self.metrics.inc('synchroniser_journal_entries_total')
+            return
+        if operation == MOVE:
+            if previous is None and source not in self._entries:
+                self._put(name, MOVE, source, 1)
+                self.metrics.inc('synchroniser_journal_entries_total')
+                return
+            self._merge(DELETE, source, None, touched)
+            operation = LOAD
+            if previous is None:
+                self._put(name, LOAD, None, 1)
+                self.metrics.inc('synchroniser_journal_entries_total')
+                return
+        previous_operation = previous.operation
+        if previous_operation == MOVE:
+            if previous.started:
+                previous_operation = RELOAD
+            else:
+                self._merge(DELETE, previous.source, None, touched)
+                previous_operation = LOAD
+        elif previous_operation == LOAD and previous.started:
+            previous_operation = RELOAD
+        self._put(name, COALESCED_OPERATIONS[previous_operation, operation], None, previous.operations + 1)
+
+    def record(self, operations: Iterable[Tuple[str, str, Optional[str]]],
+               superseded: Iterable[str] = ()) -> List[JournalEntry]:
+        """Метод записывает операции в журнал одной транзакцией, объединяя их с ожидающими.
+
+        :param operations: операции (тип, путь, старый путь для move или None).
+        :type operations: Iterable
+        :param superseded: пути, ожидающие записи по которым удаляются перед записью
+                           операций, потому что операции вычислены заново по фактическому
+                           состоянию файлов.
+        :type superseded: Iterable
+        :return: записи журнала по затронутым путям, которые нужно выполнить.
+        :rtype: list
+        """
+        touched: Dict[str, None] = {}
+        with self._lock:
+            for name in superseded:
+                if name in self._entries:
+                    self._put(name, None, None, 0)
+            for operation, name, source in operations:
+                self.metrics.inc('synchroniser_journal_operations_total')
+                self._merge(operation, name, source, touched)
+            self._connection.commit()
+            self.metrics.set('synchroniser_journal_pending', len(self._entries))
+            return [self._entries[name] for name in touched if name in self._entries]
+
+    def start(self, entry: JournalEntry) -> None:
+        """Метод отмечает, что выполнение операции началось.
+
+        :param entry: запись журнала.
+        :type entry: JournalEntry
+        """
+        with self._lock:
+            current = self._entries.get(entry.name)
+            if current is not None and current.sequence == entry.sequence:
+                self._entries[entry.name] = current._replace(started=True)
+                self._connection.execute("UPDATE operations SET started = 1 WHERE path = ? AND sequence = ?",
+                                         (entry.name, entry.sequence))
+                self._connection.commit()
+
+    def complete(self, entry: JournalEntry) -> None:
+        """Метод удаляет выполненную или отменённую операцию из журнала.
+
+        Запись, которая была объединена с новой операцией после постановки
+        в очередь, не удаляется.
+
+        :param entry: запись журнала.
+        :type entry: JournalEntry
+        """
+        with self._lock:
+            current = self._entries.get(entry.name)
+            if current is not None and current.sequence == entry.sequence:
+                del self._entries[entry.name]
+                self._connection.execute("DELETE FROM operations WHERE path = ? AND sequence = ?",
+                                         (entry.name, entry.sequence))
+                self._connection.commit()
+                self.metrics.set('synchroniser_journal_pending', len(self._entries))
+
+    def close(self) -> None:
+        """Метод закрывает базу журнала."""
+        with self._lock:
+            self._connection.close()
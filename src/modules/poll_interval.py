@@ -0,0 +1,62 @@
+import random
+
+from loguru import logger
+
+
+class PollInterval:
+    """Класс, вычисляющий паузу перед следующим циклом синхронизации.
+
+    После успешного цикла с изменениями пауза равна базовому интервалу. Пока циклы
+    не находят изменений, пауза увеличивается в idle_factor раз, но не больше
+    max_interval. После неудачного цикла пауза растёт экспоненциально от
+    failure_backoff, поэтому недоступность API не превращается в непрерывные повторы.
+
+    Args:
+        interval (float): Базовый интервал между синхронизациями в секундах.
+        max_interval (float): Максимальный интервал в секундах.
+        failure_backoff (float): Пауза после первой неудачи в секундах.
+        idle_factor (float): Множитель интервала после цикла без изменений.
+
+    Attributes:
+        interval (float): Базовый интервал между синхронизациями в секундах.
+        max_interval (float): Максимальный интервал в секундах.
+        current (float): Текущий интервал между успешными синхронизациями.
+        failures (int): Число неудачных циклов подряд.
+    """
+
+    def __init__(self, interval: float, max_interval: float, failure_backoff: float = 5.0,
+                 idle_factor: float = 2.0) -> None:
+        self.interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.failure_backoff = failure_backoff
+        self.idle_factor = idle_factor
+        self.current = interval
+        self.failures = 0
+
+    def reset(self) -> None:
+        """Метод возвращает интервал к базовому значению после обнаруженных изменений."""
+        self.current = self.interval
+
+    def next_delay(self, success: bool, idle: bool = False) -> float:
+        """Метод возвращает паузу перед следующим циклом.
+
+        :param success: завершился ли цикл успешно.
+        :type success: bool
+        :param idle: не было ли в цикле изменений ни локально, ни в облаке.
+        :type idle: bool
+        :return: пауза в секундах.
+        :rtype: float
+        """
+        if not success:
+            self.failures += 1
+            delay = min(self.max_interval, self.failure_backoff * 2 ** (self.failures - 1))
+            delay *= 1 + random.random() / 4
+            logger.warning(f"Цикл синхронизации не выполнен ({self.failures} подряд), "
+                           f"повтор через {delay:.0f} с.")
+            return delay
+        self.failures = 0
+        if idle:
+            self.current = min(self.max_interval, self.current * self.idle_factor)
+        else:
+            self.current = self.interval
+        return self.current
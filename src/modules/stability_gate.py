@@ -0,0 +1,89 @@
+import os
+import time
+
+from loguru import logger
+from typing import Dict, Optional, Set
+
+
+O_ACCMODE = 0o3
+
+
+def files_open_for_writing(root: str) -> Set[str]:
+    """Функция находит файлы директории, открытые каким-либо процессом на запись.
+
+    Просматриваются дескрипторы в /proc/<pid>/fd, доступные текущему пользователю,
+    а режим открытия берётся из /proc/<pid>/fdinfo. В системах без /proc
+    возвращается пустое множество.
+
+    :param root: путь к синхронизируемой директории.
+    :type root: str
+    :return: множество путей файлов относительно корня.
+    :rtype: set
+    """
+    root = os.path.realpath(root)
+    prefix = root.rstrip('/') + '/'
+    result = set()
+    try:
+        processes = [name for name in os.listdir('/proc') if name.isdigit()]
+    except OSError:
+        return result
+    for pid in processes:
+        try:
+            descriptors = os.listdir(f'/proc/{pid}/fd')
+        except OSError:
+            continue
+        for descriptor in descriptors:
+            try:
+                target = os.readlink(f'/proc/{pid}/fd/{descriptor}')
+                if not target.startswith(prefix):
+                    continue
+                with open(f'/proc/{pid}/fdinfo/{descriptor}') as file:
+                    flags = next((int(line.split()[1], 8) for line in file if line.startswith('flags:')), 0)
+            except (OSError, ValueError):
+                continue
+            if flags & O_ACCMODE:
+                result.add(target[len(prefix):])
+    return result
+
+
+class StabilityGate:
+    """Отсрочка загрузки файлов, запись которых, возможно, ещё не завершена.
+
+    Файл откладывается до следующего цикла, если время его модификации моложе
+    quiet_period секунд или если он открыт каким-либо процессом на запись.
+    Открытые файлы ищутся только когда есть изменённые файлы, поэтому холостой
+    цикл не просматривает /proc.
+
+    Args:
+        root (str): Путь к синхронизируемой директории.
+        quiet_period (float): Время в секундах, в течение которого файл не должен меняться.
+
+    Attributes:
+        root (str): Путь к синхронизируемой директории.
+        quiet_period (float): Время в секундах, в течение которого файл не должен меняться.
+    """
+
+    def __init__(self, root: str, quiet_period: float = 0.0) -> None:
+        self.root = root
+        self.quiet_period = quiet_period
+
+    def unstable(self, stats: Dict[str, tuple], now: Optional[float] = None) -> Set[str]:
+        """Метод возвращает файлы, загрузку которых нужно отложить.
+
+        :param stats: словарь {путь файла: (size, mtime_ns, inode)} изменённых файлов.
+        :type stats: dict
+        :param now: текущее время в секундах, по умолчанию time.time().
+        :type now: float
+        :return: множество путей отложенных файлов.
+        :rtype: set
+        """
+        if not stats:
+            return set()
+        now = time.time() if now is None else now
+        border = (now - self.quiet_period) * 1e9
+        postponed = {path for path, stat in stats.items() if stat[1] > border} if self.quiet_period else set()
+        postponed.update(files_open_for_writing(self.root) & stats.keys())
+        if postponed:
+            logger.debug(f"Загрузка {len(postponed)} файлов отложена до окончания записи: "
+                         f"{', '.join(sorted(postponed)[:10])}.")
+        return postponed
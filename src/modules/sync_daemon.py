@@ -0,0 +1,132 @@
+import heapq
+import time
+
+from loguru import logger
+from typing import List, Tuple
+
+from modules.metrics import METRICS
+from modules.poll_interval import PollInterval
+from modules.synchroniser import Synchroniser
+from modules.watcher import EventQueue, InotifyWatcher
+
+
+class SyncDaemon:
+    """Класс, выполняющий по расписанию синхронизацию нескольких директорий в одном процессе.
+
+    Все синхронизаторы используют общие HTTP клиент, пул потоков передачи, предел
+    числа загрузок и ограничение скорости, поэтому число соединений и потоков не
+    растёт с числом директорий. Циклы выполняются по очереди в порядке наступления
+    сроков, а первые сроки равномерно распределяются по наименьшему интервалу,
+    чтобы сверки директорий не начинались одновременно. Интервал каждой директории
+    вычисляется её собственным PollInterval.
+
+    Args:
+        jobs (list): Список пар (Synchroniser, PollInterval).
+
+    Attributes:
+        jobs (list): Список пар (Synchroniser, PollInterval).
+    """
+
+    def __init__(self, jobs: List[Tuple[Synchroniser, PollInterval]]) -> None:
+        self.jobs = jobs
+        now = time.monotonic()
+        step = min(poll_interval.interval for _, poll_interval in jobs) / len(jobs) if jobs else 0
+        self._schedule = [(now + number * step, number) for number in range(len(jobs))]
+        heapq.heapify(self._schedule)
+
+    def run_next(self) -> None:
+        """Метод дожидается ближайшего срока и выполняет цикл синхронизации соответствующей директории."""
+        due, number = heapq.heappop(self._schedule)
+        delay = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        synchroniser, poll_interval = self.jobs[number]
+        try:
+            success = synchroniser.full_synchronization()
+        except Exception as ex:
+            logger.exception(f"Ошибка синхронизации директории {synchroniser.local_path}: {ex}")
+            success = False
+        delay = poll_interval.next_delay(success, synchroniser.last_cycle_idle)
+        heapq.heappush(self._schedule, (time.monotonic() + delay, number))
+
+    def run(self) -> None:
+        """Метод выполняет циклы синхронизации всех директорий до остановки программы."""
+        logger.info(f"Синхронизация {len(self.jobs)} директорий в одном процессе.")
+        while True:
+            self.run_next()
+
+
+class WatchDaemon:
+    """Класс, выполняющий синхронизацию одной директории по событиям наблюдателя inotify.
+
+    События попадают в очередь с задержкой и обрабатываются после её истечения, а
+    полная сверка выполняется по расписанию PollInterval как страховка от потерянных
+    событий. Сверка обходит только директории с изменившимся временем модификации,
+    поэтому ожидающие события не удаляются из очереди и обрабатываются после неё.
+    Если на часть дерева не удалось установить наблюдение, каждая сверка обходит
+    дерево полностью. Ошибка любого шага, как и в SyncDaemon, записывается в журнал и не
+    останавливает программу: после паузы, вычисленной PollInterval для неудачного
+    цикла, выполняется сверка полным обходом дерева, которая учитывает и события,
+    обработка которых была прервана. События, пришедшие во время паузы, ядро
+    накапливает в очереди inotify.
+
+    Args:
+        synchroniser (Synchroniser): Синхронизатор директории.
+        poll_interval (PollInterval): Расписание полных сверок.
+        watcher (InotifyWatcher): Наблюдатель за директорией.
+        debounce_interval (float): Интервал задержки событий в секундах.
+
+    Attributes:
+        synchroniser (Synchroniser): Синхронизатор директории.
+        poll_interval (PollInterval): Расписание полных сверок.
+        watcher (InotifyWatcher): Наблюдатель за директорией.
+        queue (EventQueue): Очередь событий.
+        next_full_synchronization (float): Момент следующей полной сверки по time.monotonic().
+        _full_scan (bool): Нужен ли при следующей сверке полный обход дерева.
+    """
+
+    def __init__(self, synchroniser: Synchroniser, poll_interval: PollInterval, watcher: InotifyWatcher,
+                 debounce_interval: float) -> None:
+        self.synchroniser = synchroniser
+        self.poll_interval = poll_interval
+        self.watcher = watcher
+        self.queue = EventQueue(debounce_interval)
+        self.next_full_synchronization = time.monotonic()
+        self._full_scan = True
+
+    def _synchronize(self) -> None:
+        full_scan = self._full_scan or self.watcher.resync_required or self.watcher.polling_required
+        self._full_scan = False
+        self.watcher.resync_required = False
+        success = self.synchroniser.full_synchronization(full_scan)
+        self.next_full_synchronization = time.monotonic() + \
+            self.poll_interval.next_delay(success, self.synchroniser.last_cycle_idle)
+
+    def run_next(self) -> None:
+        """Метод дожидается событий или срока сверки и выполняет одну итерацию обработки."""
+        try:
+            deadline = min(self.next_full_synchronization,
+                           self.queue.next_deadline() or self.next_full_synchronization)
+            events = self.watcher.read_events(max(deadline - time.monotonic(), 0))
+            for name, kind in events:
+                self.queue.push(name, kind)
+            METRICS.set('synchroniser_event_queue_depth', len(self.queue))
+            self.synchroniser.record_events(events)
+            self.synchroniser.collect_background_uploads()
+            if self.watcher.resync_required or time.monotonic() >= self.next_full_synchronization:
+                self._synchronize()
+            events = self.queue.pop_ready()
+            if events:
+                for name in self.synchroniser.process_events(events):
+                    self.queue.push(name, events[name])
+                self.poll_interval.reset()
+        except Exception as ex:
+            logger.exception(f"Ошибка синхронизации директории {self.synchroniser.local_path}: {ex}")
+            self._full_scan = True
+            time.sleep(self.poll_interval.next_delay(False))
+            self.next_full_synchronization = time.monotonic()
+
+    def run(self) -> None:
+        """Метод обрабатывает события до остановки программы."""
+        while True:
+            self.run_next()
@@ -0,0 +1,248 @@
+import os
+import time
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from modules.file_index import FileIndex
+
+
+HashFunction = Callable[[Dict[str, tuple]], Dict[str, Tuple[str, str]]]
+
+CONFLICT_POLICIES = ('newer', 'local', 'remote', 'keep_both')
+
+
+@dataclass
+class SyncPlan:
+    """План действий одного цикла синхронизации.
+
+    Attributes:
+        upload (list): Файлы, которых нет в облаке.
+        overwrite (list): Файлы, содержимое которых в облаке устарело.
+        delete (list): Файлы в облаке, которых нет на локальном диске.
+        move (list): Пары (старый путь, новый путь) переименованных или перемещённых файлов.
+        unchanged (list): Изменённые локально файлы, содержимое которых совпадает с облаком.
+        download (list): Файлы, которые нужно скачать из облака.
+        delete_local (list): Локальные файлы, удалённые в облаке.
+        conflicts (list): Файлы, изменённые с обеих сторон, локальная копия которых
+                          сохраняется под другим именем перед скачиванием.
+    """
+    upload: List[str] = field(default_factory=list)
+    overwrite: List[str] = field(default_factory=list)
+    delete: List[str] = field(default_factory=list)
+    move: List[Tuple[str, str]] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    download: List[str] = field(default_factory=list)
+    delete_local: List[str] = field(default_factory=list)
+    conflicts: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.upload or self.overwrite or self.delete or self.move or self.download or self.delete_local)
+
+
+def same_content(hashes: Optional[Tuple[str, str]], remote_file) -> bool:
+    """Функция сравнивает хеши локального файла с хешами файла в облаке.
+
+    :param hashes: кортеж (md5, sha256) локального файла или None.
+    :type hashes: tuple
+    :param remote_file: сведения о файле в облаке.
+    :type remote_file: RemoteFile
+    :return: True, если содержимое совпадает.
+    :rtype: bool
+    """
+    if hashes is None:
+        return False
+    return hashes[0] == remote_file.md5 if remote_file.md5 else hashes[1] == remote_file.sha256
+
+
+def conflict_copy_name(path: str, now: Optional[float] = None) -> str:
+    """Функция возвращает имя, под которым сохраняется локальная копия конфликтующего файла.
+
+    :param path: путь к файлу.
+    :type path: str
+    :param now: время конфликта в секундах, по умолчанию текущее.
+    :type now: float
+    :return: путь вида "dir/name.conflict-YYYYMMDD-HHMMSS.ext".
+    :rtype: str
+    """
+    stem, extension = os.path.splitext(path)
+    return f"{stem}.conflict-{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}{extension}"
+
+
+def detect_moves(sources: Dict[str, Tuple[int, Optional[str]]], targets: Dict[str, tuple],
+                 hash_files: HashFunction) -> List[Tuple[str, str]]:
+    """Функция находит переименованные и перемещённые файлы по размеру и MD5 содержимого.
+
+    Хеши вычисляются только для новых файлов, размер которых совпадает с размером
+    одного из исчезнувших файлов, поэтому в типичном цикле ничего не читается.
+
+    :param sources: исчезнувшие файлы {путь: (size, md5)}.
+    :type sources: dict
+    :param targets: новые файлы {путь: (size, mtime_ns, inode)}.
+    :type targets: dict
+    :param hash_files: функция, возвращающая {путь: (md5, sha256)} для словаря файлов.
+    :type hash_files: Callable
+    :return: список пар (старый путь, новый путь).
+    :rtype: list
+    """
+    sources_by_size: Dict[int, List[Tuple[str, str]]] = {}
+    for path, (size, md5) in sources.items():
+        if md5:
+            sources_by_size.setdefault(size, []).append((path, md5))
+    candidates = {path: stat for path, stat in targets.items() if stat[0] in sources_by_size}
+    if not candidates:
+        return []
+    hashes = hash_files(candidates)
+    moves = []
+    for path in sorted(candidates):
+        if path not in hashes:
+            continue
+        same_size = sources_by_size[candidates[path][0]]
+        for position, (source, md5) in enumerate(same_size):
+            if md5 == hashes[path][0]:
+                moves.append((source, path))
+                del same_size[position]
+                break
+    return moves
+
+
+def create_sync_plan(local_files: Dict[str, tuple], changed_files: Iterable[str],
+                     remote_files: dict, hash_files: HashFunction) -> SyncPlan:
+    """Функция за один проход сопоставляет локальные файлы с файлами в облаке и строит план.
+
+    Множества новых и исчезнувших файлов вычисляются операциями над ключами
+    словарей. Изменённый локально файл перезаписывается, если его размер отличается
+    от размера в облаке, а при одинаковом размере - если отличаются хеши содержимого.
+    Время модификации не учитывается, поэтому восстановленный из резервной копии
+    файл с более старым временем тоже загружается. Исчезнувший в облаке файл и новый локальный файл
+    с тем же размером и содержимым считаются одним переименованным файлом.
+
+    :param local_files: словарь {путь: (size, mtime_ns, inode)} локальных файлов.
+    :type local_files: dict
+    :param changed_files: пути локальных файлов, изменившихся с прошлой синхронизации.
+    :type changed_files: Iterable
+    :param remote_files: словарь {путь: RemoteFile} файлов в облаке.
+    :type remote_files: dict
+    :param hash_files: функция, возвращающая {путь: (md5, sha256)} для словаря файлов.
+    :type hash_files: Callable
+    :return: план синхронизации.
+    :rtype: SyncPlan
+    """
+    plan = SyncPlan()
+    local_only = local_files.keys() - remote_files.keys()
+    remote_only = remote_files.keys() - local_files.keys()
+
+    candidates = [path for path in changed_files if path in remote_files]
+
+    plan.move = detect_moves({path: (remote_files[path].size, remote_files[path].md5) for path in remote_only},
+                             {path: local_files[path] for path in local_only}, hash_files)
+    moved_sources = {source for source, _ in plan.move}
+    moved_targets = {target for _, target in plan.move}
+    plan.upload = sorted(local_only - moved_targets)
+    plan.delete = sorted(remote_only - moved_sources)
+
+    hashes = hash_files({path: local_files[path] for path in candidates
+                         if local_files[path][0] == remote_files[path].size})
+    for path in candidates:
+        if same_content(hashes.get(path), remote_files[path]):
+            plan.unchanged.append(path)
+        else:
+            plan.overwrite.append(path)
+    return plan
+
+
+def _remote_changed(path: str, remote_file, index: FileIndex) -> Optional[bool]:
+    synced_md5 = index.get_synced_md5(path)
+    if synced_md5 and remote_file.md5:
+        return remote_file.md5 != synced_md5
+    synced_modified = index.get_remote_modified(path)
+    if synced_modified is not None:
+        return remote_file.modified != synced_modified
+    return None
+
+
+def create_two_way_plan(local_files: Dict[str, tuple], changed_files: Iterable[str], remote_files: dict,
+                        index: FileIndex, hash_files: HashFunction, conflict_policy: str = 'newer') -> SyncPlan:
+    """Функция строит план двусторонней синхронизации.
+
+    Изменения с каждой стороны определяются относительно состояния на момент
+    последней синхронизации, сохранённого в индексе: локальные - по (size, mtime_ns,
+    inode), в облаке - по MD5 или времени модификации. Содержимое сравнивается по
+    размеру, а при одинаковом размере - по хешам, до сравнения времени модификации,
+    которое используется только для разрешения конфликтов. Это позволяет отличить файл,
+    удалённый локально, от файла, добавленного в облаке. Изменение файла всегда
+    важнее удаления на другой стороне. Файл, изменённый с обеих сторон, считается
+    конфликтом, если содержимое различается, и разрешается политикой conflict_policy:
+    newer - побеждает более новая версия, local - локальная, remote - версия из облака,
+    keep_both - локальная копия сохраняется под именем conflict_copy_name, а версия
+    из облака скачивается.
+
+    :param local_files: словарь {путь: (size, mtime_ns, inode)} локальных файлов.
+    :type local_files: dict
+    :param changed_files: пути локальных файлов, изменившихся с прошлой синхронизации.
+    :type changed_files: Iterable
+    :param remote_files: словарь {путь: RemoteFile} файлов в облаке.
+    :type remote_files: dict
+    :param index: индекс с состоянием на момент последней синхронизации.
+    :type index: FileIndex
+    :param hash_files: функция, возвращающая {путь: (md5, sha256)} для словаря файлов.
+    :type hash_files: Callable
+    :param conflict_policy: политика разрешения конфликтов из CONFLICT_POLICIES.
+    :type conflict_policy: str
+    :return: план синхронизации.
+    :rtype: SyncPlan
+    """
+    plan = SyncPlan()
+    changed_files = set(changed_files)
+
+    compare = {}
+    for path in local_files.keys() & remote_files.keys():
+        remote_changed = _remote_changed(path, remote_files[path], index) if path in index else True
+        local_changed = path in changed_files
+        if remote_changed is None or remote_changed or local_changed:
+            compare[path] = (local_changed, remote_changed)
+    hashes = hash_files({path: local_files[path] for path in compare
+                         if local_files[path][0] == remote_files[path].size})
+    for path, (local_changed, remote_changed) in compare.items():
+        remote_file = remote_files[path]
+        if same_content(hashes.get(path), remote_file):
+            plan.unchanged.append(path)
+        elif path in index and remote_changed is None:
+            (plan.overwrite if local_changed else plan.download).append(path)
+        elif path in index and not remote_changed:
+            plan.overwrite.append(path)
+        elif path in index and not local_changed:
+            plan.download.append(path)
+        elif conflict_policy == 'local' or conflict_policy == 'newer' and \
+                local_files[path][1] / 1e9 > remote_file.modified:
+            plan.overwrite.append(path)
+        else:
+            if conflict_policy == 'keep_both':
+                plan.conflicts.append(path)
+            plan.download.append(path)
+
+    new_local_files = []
+    for path in local_files.keys() - remote_files.keys():
+        if path not in index:
+            new_local_files.append(path)
+        elif path in changed_files:
+            plan.upload.append(path)
+        else:
+            plan.delete_local.append(path)
+
+    deleted_locally = {}
+    for path in remote_files.keys() - local_files.keys():
+        remote_file = remote_files[path]
+        if path in index and not _remote_changed(path, remote_file, index):
+            deleted_locally[path] = (remote_file.size, remote_file.md5)
+        else:
+            plan.download.append(path)
+
+    plan.move = detect_moves(deleted_locally, {path: local_files[path] for path in new_local_files}, hash_files)
+    moved_sources = {source for source, _ in plan.move}
+    moved_targets = {target for _, target in plan.move}
+    plan.upload = sorted(plan.upload + [path for path in new_local_files if path not in moved_targets])
+    plan.delete = sorted(path for path in deleted_locally if path not in moved_sources)
+    plan.download.sort()
+    plan.delete_local.sort()
+    return plan
@@ -0,0 +1,618 @@
+import os
+import time
+
+from concurrent.futures import Future
+from contextlib import nullcontext
+from loguru import logger
+from stat import S_ISREG
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from api_clients.transports import UPLOAD as UPLOAD_TRANSPORT
+from api_clients.yandex_req import YandexDisk
+from modules.file_index import FileIndex
+from modules.hashing import FileHasher
+from modules.ignore_rules import DEFAULT_IGNORE_PATTERNS, IGNORE_FILE_NAME, IgnoreRules
+from modules.local_scanner import LocalScanner
+from modules.metrics import METRICS, CycleProfiler, Metrics
+from modules.operation_journal import JournalEntry, OperationJournal
+from modules.stability_gate import StabilityGate
+from modules.sync_plan import SyncPlan, conflict_copy_name, create_sync_plan, create_two_way_plan, detect_moves
+from modules.transfer_executor import TransferExecutor, TransferResult, LOAD, RELOAD, DELETE, MOVE, DOWNLOAD, \
+    DELETE_LOCAL, report_transfer_results, summarize_transfer_results
+from modules.transfer_scheduler import LARGE, transfer_priority
+from modules.watcher import DELETED
+from utils import creating_a_list_of_folders_to_create, creating_a_list_of_folders_to_delete, \
+    excluding_files_in_folders, collecting_parent_folders
+
+
+UPLOAD = "upload"
+TWO_WAY = "two_way"
+SYNC_MODES = (UPLOAD, TWO_WAY)
+
+
+class Synchroniser:
+    """Класс, выполняющий синхронизацию одной локальной директории с папкой в облачном хранилище.
+
+    Args:
+        connect (YandexDisk): Клиент Яндекс.Диска.
+        local_path (str): Путь к локальной директории.
+        index (FileIndex): Индекс локальных файлов.
+        executor (TransferExecutor): Исполнитель операций с облачным хранилищем.
+        prune_unchanged_directories (bool): Пропускать ли при сверке директории без изменений.
+        metrics (Metrics): Реестр метрик.
+        profiler (CycleProfiler): Профилировщик циклов синхронизации или None.
+        sync_mode (str): Режим синхронизации: upload - только загрузка в облако,
+                         two_way - двусторонняя синхронизация.
+        conflict_policy (str): Политика разрешения конфликтов в режиме two_way.
+        journal (OperationJournal): Журнал незавершённых операций, по умолчанию
+                                    журнал в памяти, который не переживает перезапуск.
+        ignore_patterns (Iterable): Глобальные шаблоны исключения в формате .gitignore.
+        stability_period (float): Время в секундах, в течение которого файл не должен
+                                  меняться, чтобы его можно было загрузить.
+
+    Attributes:
+        connect (YandexDisk): Клиент Яндекс.Диска.
+        local_path (str): Путь к локальной директории.
+        index (FileIndex): Индекс локальных файлов.
+        executor (TransferExecutor): Исполнитель операций с облачным хранилищем.
+        hasher (FileHasher): Вычислитель хешей локальных файлов.
+        scanner (LocalScanner): Сканер локальной директории.
+        metrics (Metrics): Реестр метрик.
+        profiler (CycleProfiler): Профилировщик циклов синхронизации или None.
+        last_cycle_idle (bool): Признак того, что последний цикл не нашёл изменений.
+        sync_mode (str): Режим синхронизации.
+        conflict_policy (str): Политика разрешения конфликтов в режиме two_way.
+        journal (OperationJournal): Журнал незавершённых операций.
+        ignore_rules (IgnoreRules): Правила исключения файлов из синхронизации.
+        stability_gate (StabilityGate): Отсрочка загрузки файлов, запись которых не завершена.
+        _background (dict): Фоновые загрузки больших файлов {имя файла: (Future, (size, mtime_ns, inode))}.
+    """
+
+    def __init__(self, connect: YandexDisk, local_path: str, index: FileIndex, executor: TransferExecutor,
+                 prune_unchanged_directories: bool = False, metrics: Metrics = METRICS,
+                 profiler: Optional[CycleProfiler] = None, sync_mode: str = UPLOAD,
+                 conflict_policy: str = 'newer', journal: Optional[OperationJournal] = None,
+                 ignore_patterns: Iterable[str] = DEFAULT_IGNORE_PATTERNS, stability_period: float = 0.0) -> None:
+        self.connect = connect
+        self.local_path = local_path
+        self.index = index
+        self.executor = executor
+        self.hasher = FileHasher(index, metrics=metrics)
+        self.ignore_rules = IgnoreRules(local_path, ignore_patterns)
+        self.scanner = LocalScanner(local_path, prune_unchanged_directories, self.ignore_rules)
+        self.stability_gate = StabilityGate(local_path, stability_period)
+        self.metrics = metrics
+        self.profiler = profiler
+        self.sync_mode = sync_mode
+        self.conflict_policy = conflict_policy
+        self.journal = journal if journal is not None else OperationJournal(':memory:', metrics)
+        self.last_cycle_idle = False
+        self._journal_replayed = False
+        self._background: Dict[str, Tuple[Future, tuple]] = {}
+
+    def _stat_file(self, name: str) -> Optional[Tuple[int, int, int]]:
+        """Метод читает состояние локального файла одним системным вызовом.
+
+        :param name: имя файла относительно синхронизируемой директории.
+        :type name: str
+        :return: кортеж (size, mtime_ns, inode) или None, если файла нет или это не обычный файл.
+        :rtype: tuple
+        """
+        try:
+            stat = os.stat(os.path.join(self.local_path, name))
+        except OSError:
+            return None
+        if not S_ISREG(stat.st_mode):
+            return None
+        return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+    def _hash_files(self, stats: Dict[str, tuple]) -> Dict[str, Tuple[str, str]]:
+        return self.hasher.hash_files(self.local_path, stats)
+
+    def apply_transfer_results(self, results: list, local_files: dict, moves: Optional[dict] = None,
+                               remote_files: Optional[dict] = None) -> None:
+        """Метод переносит в индекс результаты успешно выполненных операций.
+
+        :param results: список результатов операций TransferResult.
+        :type results: list
+        :param local_files: словарь {имя файла: (size, mtime_ns, inode)}.
+        :type local_files: dict
+        :param moves: словарь {новый путь: старый путь} перемещённых файлов.
+        :type moves: dict
+        :param remote_files: словарь {имя файла: RemoteFile} скачанных файлов.
+        :type remote_files: dict
+        """
+        if self.sync_mode == TWO_WAY:
+            # Без MD5 в индексе нельзя отличить файл, изменённый в облаке, от загруженного
+            # программой, поэтому хеши загруженных файлов вычисляются, если их нет в кэше.
+            self._hash_files({result.name: local_files[result.name] for result in results
+                              if result.success and result.operation in (LOAD, RELOAD)})
+        for result in results:
+            if not result.success:
+                continue
+            if result.operation in (DELETE, DELETE_LOCAL):
+                self.index.forget(result.name)
+            elif result.operation == DOWNLOAD:
+                stat = os.stat(os.path.join(self.local_path, result.name))
+                remote_file = remote_files[result.name]
+                self.index.mark_synced(result.name, (stat.st_size, stat.st_mtime_ns, stat.st_ino),
+                                       remote_file.modified, remote_file.md5)
+            elif result.operation == MOVE:
+                source = moves[result.name]
+                remote_modified, md5 = self.index.get_remote_modified(source), self.index.get_synced_md5(source)
+                self.index.forget(source)
+                self.index.mark_synced(result.name, local_files[result.name], remote_modified, md5)
+            else:
+                self.index.mark_synced(result.name, local_files[result.name])
+        self.index.commit()
+
+    def _journalled(self, entry: JournalEntry, function, *args) -> bool:
+        self.journal.start(entry)
+        success = function(*args)
+        if success:
+            self.journal.complete(entry)
+        return success
+
+    def _submit(self, entry: JournalEntry, local_files: dict) -> bool:
+        """Метод ставит в очередь исполнителя операцию из журнала.
+
+        Загрузка большого файла ставится в фоновом режиме: цикл синхронизации её не
+        ожидает, а результат переносится в индекс методом collect_background_uploads.
+
+        :param entry: запись журнала.
+        :type entry: JournalEntry
+        :param local_files: словарь {имя файла: (size, mtime_ns, inode)}.
+        :type local_files: dict
+        :return: True, если операция поставлена в фоновом режиме.
+        :rtype: bool
+        """
+        stat = None
+        if entry.operation == MOVE:
+            function, args = self.connect.move, (entry.source, entry.name)
+        elif entry.operation == DELETE:
+            function, args = self.connect.delete, (entry.name,)
+        else:
+            function = self.connect.load if entry.operation == LOAD else self.connect.reload
+            args = (os.path.join(self.local_path, entry.name), entry.name)
+            stat = local_files[entry.name]
+            if self.connect.transports[UPLOAD_TRANSPORT].uses_hashes:
+                args += (self.index.get_cached_hashes(entry.name, stat),)
+        background = stat is not None and transfer_priority(stat[0], stat[1])[0] == LARGE
+        future = self.executor.submit(entry.operation, entry.name, self._journalled, entry, function, *args,
+                                      stat=stat, background=background)
+        if background:
+            self._background[entry.name] = (future, stat)
+        return background
+
+    def collect_background_uploads(self) -> List[str]:
+        """Метод переносит в индекс результаты завершившихся фоновых загрузок больших файлов.
+
+        Запись журнала завершившейся загрузки удаляется при её выполнении, а
+        неудавшаяся загрузка остаётся в журнале и вычисляется заново следующей сверкой.
+
+        :return: имена файлов, загрузка которых ещё выполняется.
+        :rtype: list
+        """
+        done = {name: task for name, task in self._background.items() if task[0].done()}
+        if done:
+            for name in done:
+                del self._background[name]
+            results = [future.result() for future, _ in done.values()]
+            report_transfer_results(results)
+            self.apply_transfer_results(results, {name: stat for name, (_, stat) in done.items()})
+        return list(self._background)
+
+    def record_events(self, events: List[Tuple[str, str]]) -> None:
+        """Метод сразу записывает в журнал события наблюдателя, которые ещё ждут обработки.
+
+        Повторные изменения файла объединяются в журнале в одну запись, а создание
+        и удаление файла до обработки взаимно уничтожаются. Если программа завершится
+        до обработки событий, записи будут выполнены при следующем запуске.
+
+        :param events: список пар (имя файла, тип события).
+        :type events: list
+        """
+        events = [(name, kind) for name, kind in events if not self.ignore_rules.is_ignored(name)]
+        if events:
+            self.journal.record((DELETE if kind == DELETED else RELOAD if name in self.index else LOAD, name, None)
+                                for name, kind in events)
+
+    def replay_journal(self) -> int:
+        """Метод выполняет операции, оставшиеся в журнале после аварийного завершения программы.
+
+        Каждая запись сверяется с текущим состоянием файла: существующий файл,
+        изменившийся с последней синхронизации, перезаписывается в облаке, пропавший -
+        удаляется, а загрузка файла, который был создан и удалён до начала передачи,
+        отменяется. Неудавшиеся операции удаляются из журнала, так как следующая
+        за повтором полная сверка вычисляет их заново. В режиме two_way пути из журнала
+        сверяются с облаком методом _synchronize_two_way_paths, чтобы повтор не
+        перезаписал и не удалил файл, изменённый в облаке.
+
+        :return: число выполненных операций.
+        :rtype: int
+        """
+        self._journal_replayed = True
+        if self.sync_mode == TWO_WAY:
+            entries = self.journal.pending()
+            if entries:
+                logger.info(f"Повтор {len(entries)} незавершённых операций из журнала.")
+                names = {entry.name for entry in entries} | {entry.source for entry in entries if entry.source}
+                try:
+                    self._synchronize_two_way_paths(names, [entry.name for entry in entries])
+                except ConnectionError as ex:
+                    logger.error(f"Повтор операций из журнала отложен: {ex}.")
+                    self._journal_replayed = False
+                    return 0
+            return len(entries)
+        replay, local_files, moves = [], {}, {}
+        for entry in self.journal.pending():
+            path = os.path.join(self.local_path, entry.name)
+            stat = self._stat_file(entry.name)
+            if stat is not None:
+                local_files[entry.name] = stat
+            if entry.operation == MOVE:
+                operation = MOVE if entry.name in local_files else None
+            elif entry.name in local_files:
+                synced = self.index.get_synced_stat(entry.name) == local_files[entry.name]
+                operation = None if synced else RELOAD
+            elif os.path.isdir(path) or entry.operation == LOAD and not entry.started and entry.name not in self.index:
+                operation = None
+            else:
+                operation = DELETE
+            if operation is None:
+                self.journal.complete(entry)
+            else:
+                replay.append(entry._replace(operation=operation))
+                if operation == MOVE:
+                    moves[entry.name] = entry.source
+        if not replay:
+            return 0
+        logger.info(f"Повтор {len(replay)} незавершённых операций из журнала.")
+        waited = [entry for entry in replay if not self._submit(entry, local_files)]
+        results = self.executor.wait()
+        self.apply_transfer_results(results, local_files, moves)
+        for entry, result in zip(waited, results):
+            if not result.success:
+                self.journal.complete(entry)
+        return len(replay)
+
+    def run_moves(self, moves: List[Tuple[str, str]], local_files: dict,
+                  superseded: Iterable[str] = ()) -> List[Tuple[str, str]]:
+        """Метод выполняет перемещения файлов в облачном хранилище и дожидается их завершения.
+
+        :param moves: список пар (старый путь, новый путь).
+        :type moves: list
+        :param local_files: словарь {имя файла: (size, mtime_ns, inode)}.
+        :type local_files: dict
+        :param superseded: пути, записи журнала по которым заменяются вычисленными заново операциями.
+        :type superseded: Iterable
+        :return: список перемещений, которые не удалось выполнить.
+        :rtype: list
+        """
+        entries = self.journal.record(((MOVE, target, source) for source, target in moves), superseded)
+        if not entries:
+            return []
+        for entry in entries:
+            self._submit(entry, local_files)
+        results = self.executor.wait()
+        self.apply_transfer_results(results, local_files, {target: source for source, target in moves})
+        failed = {result.name for result in results if result.operation == MOVE and not result.success}
+        return [(source, target) for source, target in moves if target in failed]
+
+    def _plan_folders(self, plan: SyncPlan, local_files: dict, local_folders: Set[str],
+                      remote_files: dict) -> Tuple[List[str], List[str], List[str], List[str]]:
+        """Метод определяет папки, которые нужно создать и удалить с каждой стороны.
+
+        В режиме upload облако повторяет локальное дерево. В режиме two_way папка,
+        которой нет на одной из сторон, удаляется на другой только если все файлы
+        в ней удаляются по плану, иначе она считается новой и создаётся.
+
+        :return: папки для создания и удаления в облаке, папки для создания и удаления
+                 на локальном диске.
+        :rtype: tuple
+        """
+        remote_folders = {folder for folder in self.connect.folders
+                          if not self.ignore_rules.is_ignored_directory(folder)}
+        if self.sync_mode != TWO_WAY:
+            return (creating_a_list_of_folders_to_create(remote_folders, local_folders),
+                    creating_a_list_of_folders_to_delete(remote_folders, local_folders), [], [])
+        leaving_remote = set(plan.delete) | {source for source, _ in plan.move}
+        removed_locally = (remote_folders - local_folders) & collecting_parent_folders(plan.delete) - \
+            collecting_parent_folders(remote_files.keys() - leaving_remote)
+        delete_local = set(plan.delete_local)
+        removed_remotely = (local_folders - remote_folders) & collecting_parent_folders(delete_local) - \
+            collecting_parent_folders(local_files.keys() - delete_local)
+        return (creating_a_list_of_folders_to_create(remote_folders, local_folders - removed_remotely),
+                creating_a_list_of_folders_to_delete(removed_locally, set()),
+                creating_a_list_of_folders_to_create(local_folders, remote_folders - removed_locally),
+                sorted(removed_remotely, key=lambda folder: folder.count('/'), reverse=True))
+
+    def _download(self, file_name: str, remote_file, expected_stat: Optional[tuple]) -> bool:
+        path = os.path.join(self.local_path, file_name)
+        try:
+            stat = os.stat(path)
+            current_stat = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        except FileNotFoundError:
+            current_stat = None
+        if current_stat != expected_stat:
+            logger.warning(f"Файл {file_name} изменился во время синхронизации, скачивание отложено.")
+            return False
+        return self.connect.download(file_name, path, remote_file)
+
+    def _delete_local_file(self, file_name: str, expected_stat: tuple) -> bool:
+        path = os.path.join(self.local_path, file_name)
+        try:
+            stat = os.stat(path)
+            if (stat.st_size, stat.st_mtime_ns, stat.st_ino) != expected_stat:
+                logger.warning(f"Файл {file_name} изменился во время синхронизации, удаление отменено.")
+                return False
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        logger.info(f"Файл {file_name} удалён, так как он удалён в облаке.")
+        return True
+
+    def _save_conflict_copy(self, file_name: str) -> bool:
+        copy_name = conflict_copy_name(file_name)
+        try:
+            os.rename(os.path.join(self.local_path, file_name), os.path.join(self.local_path, copy_name))
+        except OSError as ex:
+            logger.error(f"Не удалось сохранить локальную копию конфликтующего файла {file_name}: {ex}")
+            return False
+        logger.warning(f"Файл {file_name} изменён и локально, и в облаке: локальная версия сохранена "
+                       f"как {copy_name}.")
+        return True
+
+    def _remove_empty_folders(self, folders: List[str]) -> None:
+        for folder in folders:
+            try:
+                os.rmdir(os.path.join(self.local_path, folder))
+            except OSError:
+                pass
+
+    def _run_plan(self, plan: SyncPlan, local_files: dict, remote_files: dict,
+                  folders_to_delete: List[str] = ()) -> List[TransferResult]:
+        """Метод выполняет операции плана, кроме перемещений, и переносит их результаты в индекс.
+
+        :param plan: план синхронизации.
+        :type plan: SyncPlan
+        :param local_files: словарь {имя файла: (size, mtime_ns, inode)}.
+        :type local_files: dict
+        :param remote_files: словарь {имя файла: RemoteFile} файлов в облаке.
+        :type remote_files: dict
+        :param folders_to_delete: папки, удаляемые в облаке вместе с содержимым.
+        :type folders_to_delete: list
+        :return: результаты операций, которые ожидал цикл.
+        :rtype: list
+        """
+        folders_to_delete = list(folders_to_delete)
+        entries = self.journal.record(
+            [(DELETE, file_name, None)
+             for file_name in folders_to_delete + excluding_files_in_folders(plan.delete, folders_to_delete)] +
+            [(LOAD, file_name, None) for file_name in plan.upload] +
+            [(RELOAD, file_name, None) for file_name in plan.overwrite])
+        for entry in entries:
+            self._submit(entry, local_files)
+
+        for file_name in plan.delete_local:
+            self.executor.submit(DELETE_LOCAL, file_name, self._delete_local_file, file_name,
+                                 local_files[file_name])
+
+        for file_name in plan.conflicts:
+            if not self._save_conflict_copy(file_name):
+                plan.download.remove(file_name)
+
+        for file_name in plan.download:
+            remote_file = remote_files[file_name]
+            self.executor.submit(DOWNLOAD, file_name, self._download, file_name, remote_file,
+                                 None if file_name in plan.conflicts else local_files.get(file_name),
+                                 stat=(remote_file.size, remote_file.modified * 10 ** 9, 0))
+
+        results = self.executor.wait()
+        self.apply_transfer_results(results, local_files, remote_files=remote_files)
+        return results
+
+    def _synchronize_two_way_paths(self, names: Set[str], superseded: Iterable[str]) -> List[str]:
+        """Метод синхронизирует в режиме two_way только указанные пути.
+
+        Для путей строится план create_two_way_plan по списку файлов в облаке, поэтому
+        изменения в облаке проверяются так же, как при полной сверке: локальное удаление
+        не удаляет файл, изменённый в облаке, а локальная правка файла, изменённого
+        в облаке, разрешается политикой conflict_policy.
+
+        :param names: пути файлов относительно синхронизируемой директории.
+        :type names: set
+        :param superseded: пути, записи журнала по которым заменяются операциями плана.
+        :type superseded: Iterable
+        :return: список отложенных файлов.
+        :rtype: list
+        :raise ConnectionError: если не удалось получить список файлов в облаке.
+        """
+        local_files, removed_files = {}, []
+        for name in names:
+            stat = self._stat_file(name)
+            if stat is not None:
+                local_files[name] = stat
+            elif name in self.index:
+                removed_files.append(name)
+        uploading = set(self.collect_background_uploads())
+        changed_files = self.index.detect_changes(local_files)[0]
+        postponed = self.stability_gate.unstable({name: local_files[name] for name in changed_files
+                                                  if name not in uploading})
+        postponed |= uploading & names
+        get_info = self.connect.get_info(recursive=True, cached=True)
+        if get_info is None:
+            raise ConnectionError("не удалось получить список файлов в облаке")
+
+        local_files = {name: stat for name, stat in local_files.items() if name not in postponed}
+        changed_files = [name for name in changed_files if name not in postponed]
+        remote_files = {name: get_info[name] for name in names if name in get_info and name not in postponed}
+        plan = create_two_way_plan(local_files, changed_files, remote_files, self.index, self._hash_files,
+                                   self.conflict_policy)
+        for name in plan.unchanged:
+            self.index.mark_synced(name, local_files[name], remote_files[name].modified, remote_files[name].md5)
+        for name in removed_files:
+            if name not in remote_files and name not in postponed:
+                self.index.forget(name)
+        for source, target in self.run_moves(plan.move, local_files,
+                                             [name for name in superseded if name not in postponed]):
+            plan.delete.append(source)
+            plan.upload.append(target)
+        self._run_plan(plan, local_files, remote_files)
+        return sorted(postponed)
+
+    def full_synchronization(self, full_scan: bool = True) -> bool:
+        """Метод выполняет полную сверку локальной директории с облачным хранилищем.
+
+        Длительность каждой фазы цикла учитывается в метриках, а итоги цикла
+        записываются через Metrics.write_cycle_summary. Цикл не дожидается фоновых
+        загрузок больших файлов: файлы, загрузка которых ещё выполняется, в сверке
+        не участвуют, а результаты завершившихся загрузок переносятся в индекс.
+
+        :param full_scan: обходить ли директории, время модификации которых не изменилось.
+        :type full_scan: bool
+        :return: False, если не удалось получить список файлов в облаке.
+        :rtype: bool
+        """
+        summary = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'folder': self.local_path,
+                   'full_scan': full_scan, 'phases': {}}
+        with self.profiler.cycle() if self.profiler else nullcontext():
+            success = self._full_synchronization(full_scan, summary)
+        summary['phases'] = {phase: round(timer['seconds'], 4) for phase, timer in summary['phases'].items()}
+        summary['hashing'] = self.hasher.take_cycle_stats()
+        summary['success'] = success
+        self.metrics.write_cycle_summary(summary)
+        return success
+
+    def _full_synchronization(self, full_scan: bool, summary: dict) -> bool:
+        phases = summary['phases']
+        if not self._journal_replayed:
+            with self.metrics.timer('synchroniser_phase_seconds', phase='replay') as phases['replay']:
+                summary['replayed'] = self.replay_journal()
+
+        uploading = set(self.collect_background_uploads())
+        with self.metrics.timer('synchroniser_phase_seconds', phase='scan') as phases['scan']:
+            local_files, local_folders = self.scanner.scan(full=full_scan)
+            changed_files, removed_files = self.index.detect_changes(local_files)
+            postponed = self.stability_gate.unstable({file_name: local_files[file_name]
+                                                      for file_name in changed_files if file_name not in uploading})
+            postponed |= uploading
+            if postponed:
+                local_files = local_files.without(postponed)
+            changed_files = [file_name for file_name in changed_files if file_name not in postponed]
+            removed_files = [file_name for file_name in removed_files if file_name not in uploading]
+        summary.update(local_files=len(local_files), changed_files=len(changed_files),
+                       removed_files=len(removed_files), postponed_files=len(postponed) - len(uploading),
+                       background_uploads=len(uploading))
+
+        with self.metrics.timer('synchroniser_phase_seconds', phase='remote_listing') as phases['remote_listing']:
+            get_info = self.connect.get_info(recursive=True, cached=True)
+        if get_info is None:
+            return False
+        summary['remote_files'] = len(get_info)
+        excluded = postponed | {file_name for file_name in get_info.keys() - local_files.keys()
+                                if self.ignore_rules.is_ignored(file_name)}
+        if excluded:
+            get_info = get_info.without(excluded)
+
+        with self.metrics.timer('synchroniser_phase_seconds', phase='planning') as phases['planning']:
+            two_way = self.sync_mode == TWO_WAY
+            if two_way:
+                plan = create_two_way_plan(local_files, changed_files, get_info, self.index, self._hash_files,
+                                           self.conflict_policy)
+            else:
+                plan = create_sync_plan(local_files, changed_files, get_info, self._hash_files)
+            for file_name in plan.unchanged:
+                self.index.mark_synced(file_name, local_files[file_name], get_info[file_name].modified,
+                                       get_info[file_name].md5 if two_way else None)
+            for file_name in removed_files:
+                if file_name not in get_info:
+                    self.index.forget(file_name)
+            folders_to_create, folders_to_delete, local_folders_to_create, local_folders_to_delete = \
+                self._plan_folders(plan, local_files, local_folders, get_info)
+        self.last_cycle_idle = not (changed_files or removed_files or postponed or plan)
+        summary['idle'] = self.last_cycle_idle
+        summary['plan'] = {'upload': len(plan.upload), 'overwrite': len(plan.overwrite),
+                           'delete': len(plan.delete), 'move': len(plan.move),
+                           'download': len(plan.download), 'delete_local': len(plan.delete_local),
+                           'conflicts': len(plan.conflicts)}
+
+        with self.metrics.timer('synchroniser_phase_seconds', phase='moves') as phases['moves']:
+            self.connect.create_folders(folders_to_create)
+            for folder in local_folders_to_create:
+                os.makedirs(os.path.join(self.local_path, folder), exist_ok=True)
+            superseded = [entry.name for entry in self.journal.pending() if entry.name not in uploading]
+            for source, target in self.run_moves(plan.move, local_files, superseded):
+                plan.delete.append(source)
+                plan.upload.append(target)
+
+        with self.metrics.timer('synchroniser_phase_seconds', phase='transfers') as phases['transfers']:
+            results = self._run_plan(plan, local_files, get_info, folders_to_delete)
+            self._remove_empty_folders(local_folders_to_delete)
+        summary.update(summarize_transfer_results(results, local_files))
+        summary['throughput'] = round(summary['uploaded_bytes'] / max(phases['transfers']['seconds'], 1e-9))
+        logger.debug(f"Статистика запросов к API: {self.connect.client.get_stats()}")
+        return True
+
+    def process_events(self, events: dict) -> List[str]:
+        """Метод переносит в облачное хранилище изменения, полученные от наблюдателя.
+
+        Фактическое состояние файла проверяется в момент обработки, поэтому
+        устаревшие события в очереди не приводят к лишним запросам. Файлы, содержимое
+        которых совпадает с содержимым на момент последней синхронизации, не загружаются,
+        а пара из удалённого и нового файла с одинаковым содержимым переносится в облаке
+        одним перемещением. Вычисленные операции заменяют в журнале записи событий,
+        сделанные методом record_events. События по исключённым файлам пропускаются,
+        а файлы, запись которых не завершена или фоновая загрузка которых ещё
+        выполняется, возвращаются для повторной обработки. В режиме two_way пути
+        из событий сверяются с облаком методом _synchronize_two_way_paths.
+
+        :param events: словарь {имя файла: тип события}.
+        :type events: dict
+        :return: список отложенных файлов.
+        :rtype: list
+        :raise ConnectionError: если в режиме two_way не удалось получить список файлов в облаке.
+        """
+        for directory in {name.rpartition('/')[0] for name in events
+                          if name.rpartition('/')[2] == IGNORE_FILE_NAME}:
+            self.ignore_rules.load_directory(directory)
+            self.scanner.reset()
+        events = {name: kind for name, kind in events.items() if not self.ignore_rules.is_ignored(name)}
+        if self.sync_mode == TWO_WAY:
+            return self._synchronize_two_way_paths(set(events), events)
+        local_files = {}
+        deleted_files = []
+        for name in events:
+            stat = self._stat_file(name)
+            if stat is not None:
+                local_files[name] = stat
+            elif name in self.index:
+                deleted_files.append(name)
+        uploading = set(self.collect_background_uploads())
+        changed_files = self.index.detect_changes(local_files)[0]
+        postponed = self.stability_gate.unstable({name: local_files[name] for name in changed_files
+                                                  if name not in uploading})
+        postponed |= uploading & events.keys()
+        deleted_files = [name for name in deleted_files if name not in postponed]
+        changed_files = [name for name in changed_files if name not in postponed]
+
+        moves = detect_moves({name: (self.index.get_synced_stat(name)[0], self.index.get_synced_md5(name))
+                              for name in deleted_files},
+                             {name: local_files[name] for name in changed_files if name not in self.index},
+                             self._hash_files)
+        failed_moves = self.run_moves(moves, local_files, [name for name in events if name not in postponed])
+        moved_files = {name for move in moves if move not in failed_moves for name in move}
+
+        operations = [(DELETE, name, None) for name in deleted_files if name not in moved_files]
+        changed_files = [name for name in changed_files if name not in moved_files]
+        hashes = self._hash_files({name: local_files[name] for name in changed_files
+                                   if self.index.get_synced_md5(name)})
+        for name in changed_files:
+            if name in hashes and hashes[name][0] == self.index.get_synced_md5(name):
+                self.index.mark_synced(name, local_files[name], self.index.get_remote_modified(name))
+            else:
+                operations.append((RELOAD, name, None))
+        for entry in self.journal.record(operations):
+            self._submit(entry, local_files)
+        self.apply_transfer_results(self.executor.wait(), local_files)
+        return sorted(postponed)
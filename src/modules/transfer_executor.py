@@ -0,0 +1,235 @@
+import heapq
+import itertools
+import threading
+import time
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from loguru import logger
+from typing import Callable, Dict, List, Optional, Tuple
+
+from modules.metrics import METRICS, Metrics
+from modules.transfer_scheduler import LARGE, SMALL, AimdLimiter, transfer_priority
+
+
+MAX_TRANSFER_WORKERS = 16
+
+LOAD = "load"
+RELOAD = "reload"
+DELETE = "delete"
+MOVE = "move"
+DOWNLOAD = "download"
+DELETE_LOCAL = "delete_local"
+
+
+@dataclass
+class TransferResult:
+    """Результат одной операции с облачным хранилищем.
+
+    Attributes:
+        operation (str): Тип операции: load, reload, delete, move, download или delete_local.
+        name (str): Имя файла.
+        success (bool): Признак успешного выполнения.
+        duration (float): Длительность операции в секундах.
+        error (str): Текст ошибки, если операция завершилась исключением.
+    """
+    operation: str
+    name: str
+    success: bool
+    duration: float
+    error: Optional[str] = None
+
+
+class TransferExecutor:
+    """Класс для параллельного выполнения операций с облачным хранилищем.
+
+    Удаления и перемещения выполняются в отдельном пуле потоков, поэтому быстрые
+    операции не ждут окончания долгих загрузок. Загрузки выбираются из очередей
+    по ключу transfer_priority: недавно изменённые и небольшие файлы загружаются
+    первыми, а большие файлы идут в отдельной очереди, для которой зарезервировано
+    max_large_workers потоков, поэтому они не простаивают за мелкими правками. Пока
+    есть свободные потоки, большие файлы могут занять и их, но один поток всегда
+    остаётся для мелких правок. Число одновременных загрузок из основной очереди
+    дополнительно ограничивается адаптивным пределом AimdLimiter, а загрузки больших
+    файлов ограничены только числом потоков, чтобы сниженный после ответов 429
+    предел не оказался целиком занят ими. Операции, поставленные с признаком
+    background, не ожидаются методом wait: их результат получают через
+    возвращённый методом submit объект Future, поэтому загрузка большого файла
+    может продолжаться после окончания цикла синхронизации. Общее число потоков
+    ограничено значением MAX_TRANSFER_WORKERS, чтобы не превышать лимиты API Яндекс.Диска.
+
+    Args:
+        max_workers (int): Число потоков для загрузки файлов.
+        max_delete_workers (int): Число потоков для удаления файлов.
+        metrics (Metrics): Реестр метрик.
+        limiter (AimdLimiter): Адаптивный предел числа одновременных загрузок или None.
+        max_large_workers (int): Число потоков, зарезервированных для больших файлов.
+
+    Attributes:
+        max_workers (int): Число потоков для загрузки файлов.
+        max_delete_workers (int): Число потоков для удаления файлов.
+        limiter (AimdLimiter): Адаптивный предел числа одновременных загрузок.
+    """
+
+    def __init__(self, max_workers: int = 4, max_delete_workers: int = 2, metrics: Metrics = METRICS,
+                 limiter: Optional[AimdLimiter] = None, max_large_workers: int = 1) -> None:
+        self.metrics = metrics
+        self.limiter = limiter
+        if max_workers + max_delete_workers > MAX_TRANSFER_WORKERS:
+            logger.warning(f"Число потоков передачи ограничено значением {MAX_TRANSFER_WORKERS}.")
+            max_workers = max(1, min(max_workers, MAX_TRANSFER_WORKERS - 1))
+            max_delete_workers = max(1, MAX_TRANSFER_WORKERS - max_workers)
+        self.max_workers = max_workers
+        self.max_delete_workers = max_delete_workers
+        self._large_slots = max(0, min(max_large_workers, max_workers - 1))
+        self._delete_pool = ThreadPoolExecutor(max_workers=max_delete_workers, thread_name_prefix="delete")
+        self._queues: Dict[bool, list] = {False: [], True: []}
+        self._active_large = 0
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._workers = [threading.Thread(target=self._upload_worker, name=f"upload_{number}", daemon=True)
+                         for number in range(max_workers)]
+        for worker in self._workers:
+            worker.start()
+        self._futures: List[Tuple[Future, str, str]] = []
+
+    def submit(self, operation: str, name: str, function: Callable[..., bool], *args,
+               stat: Optional[tuple] = None, background: bool = False) -> Future:
+        """Метод ставит операцию в очередь на выполнение.
+
+        :param operation: тип операции: load, reload, delete, move, download или delete_local.
+        :type operation: str
+        :param name: имя файла.
+        :type name: str
+        :param function: функция, выполняющая операцию и возвращающая True при успехе.
+        :type function: Callable
+        :param stat: кортеж (size, mtime_ns, inode) передаваемого файла для выбора очерёдности.
+        :type stat: tuple
+        :param background: не ожидать операцию в методе wait.
+        :type background: bool
+        :return: объект Future с результатом TransferResult.
+        :rtype: Future
+        """
+        self.metrics.add('synchroniser_transfer_queue_depth', 1)
+        if operation in (DELETE, MOVE, DELETE_LOCAL):
+            future = self._delete_pool.submit(self._run, operation, name, function, *args)
+        else:
+            future = Future()
+            priority = transfer_priority(stat[0], stat[1]) if stat else (SMALL, 0)
+            with self._condition:
+                heapq.heappush(self._queues[priority[0] == LARGE],
+                               (priority, next(self._sequence), future, operation, name, function, args))
+                self._condition.notify()
+        if not background:
+            self._futures.append((future, operation, name))
+        return future
+
+    def _next_upload(self) -> Optional[tuple]:
+        small, large = self._queues[False], self._queues[True]
+        while True:
+            if large and (self._active_large < self._large_slots or
+                          not small and self._active_large < self.max_workers - 1):
+                self._active_large += 1
+                return heapq.heappop(large)
+            if small:
+                return heapq.heappop(small)
+            if self._closed:
+                return None
+            self._condition.wait()
+
+    def _upload_worker(self) -> None:
+        while True:
+            with self._condition:
+                task = self._next_upload()
+            if task is None:
+                return
+            priority, _, future, operation, name, function, args = task
+            limited = self.limiter is not None and priority[0] != LARGE
+            if limited:
+                self.limiter.acquire()
+            try:
+                if future.set_running_or_notify_cancel():
+                    future.set_result(self._run(operation, name, function, *args))
+            finally:
+                if limited:
+                    self.limiter.release()
+                if priority[0] == LARGE:
+                    with self._condition:
+                        self._active_large -= 1
+                        self._condition.notify_all()
+
+    def _run(self, operation: str, name: str, function: Callable[..., bool], *args) -> TransferResult:
+        start = time.perf_counter()
+        try:
+            result = TransferResult(operation, name, bool(function(*args)), time.perf_counter() - start)
+        except Exception as ex:
+            result = TransferResult(operation, name, False, time.perf_counter() - start, str(ex))
+        self.metrics.add('synchroniser_transfer_queue_depth', -1)
+        self.metrics.inc('synchroniser_operations_total', operation=operation,
+                         result='success' if result.success else 'failure')
+        return result
+
+    def wait(self) -> List[TransferResult]:
+        """Метод дожидается выполнения поставленных операций, кроме фоновых, и формирует отчёт.
+
+        :return: список результатов операций в порядке постановки в очередь.
+        :rtype: list
+        """
+        results = [future.result() for future, _, _ in self._futures]
+        self._futures = []
+        if results:
+            report_transfer_results(results)
+        return results
+
+    def shutdown(self) -> None:
+        """Метод дожидается выполнения поставленных операций и останавливает потоки."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for worker in self._workers:
+            worker.join()
+        self._delete_pool.shutdown(wait=True)
+
+
+def report_transfer_results(results: List[TransferResult]) -> None:
+    """Функция записывает в лог итоги выполнения операций за цикл синхронизации.
+
+    :param results: список результатов операций.
+    :type results: list
+    """
+    failures = [result for result in results if not result.success]
+    summary = {operation: sum(1 for result in results if result.operation == operation and result.success)
+               for operation in (LOAD, RELOAD, DELETE, MOVE, DOWNLOAD, DELETE_LOCAL)}
+    logger.info(f"Итоги цикла: записано {summary[LOAD]}, перезаписано {summary[RELOAD]}, "
+                f"удалено {summary[DELETE]}, перемещено {summary[MOVE]}, скачано {summary[DOWNLOAD]}, "
+                f"удалено локально {summary[DELETE_LOCAL]}, ошибок {len(failures)}.")
+    for failure in failures:
+        logger.error(f"Операция {failure.operation} для файла '{failure.name}' не выполнена"
+                     f"{': ' + failure.error if failure.error else '.'}")
+
+
+def summarize_transfer_results(results: List[TransferResult], local_files: dict) -> dict:
+    """Функция подсчитывает итоги операций для записи в сводку цикла синхронизации.
+
+    :param results: список результатов операций.
+    :type results: list
+    :param local_files: словарь {имя файла: (size, mtime_ns, inode)}.
+    :type local_files: dict
+    :return: словарь с числом успешных операций, ошибок, загруженных байт и
+             суммарным временем работы потоков по типам операций.
+    :rtype: dict
+    """
+    operations = {operation: 0 for operation in (LOAD, RELOAD, DELETE, MOVE, DOWNLOAD, DELETE_LOCAL)}
+    busy_seconds = {operation: 0.0 for operation in operations}
+    uploaded_bytes = 0
+    for result in results:
+        busy_seconds[result.operation] += result.duration
+        if result.success:
+            operations[result.operation] += 1
+            if result.operation in (LOAD, RELOAD):
+                uploaded_bytes += local_files[result.name][0]
+    return {'operations': operations,
+            'failures': sum(1 for result in results if not result.success),
+            'uploaded_bytes': uploaded_bytes,
+            'busy_seconds': {operation: round(seconds, 3) for operation, seconds in busy_seconds.items()}}
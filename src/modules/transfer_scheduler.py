@@ -0,0 +1,152 @@
+import threading
+import time
+
+from loguru import logger
+from typing import Optional, Tuple
+
+
+LARGE_FILE_SIZE = 32 * 1024 * 1024
+RECENT_CHANGE_WINDOW = 10 * 60
+
+RECENT = 0
+SMALL = 1
+LARGE = 2
+
+
+def transfer_priority(size: int, mtime_ns: int, now: Optional[float] = None) -> Tuple[int, int]:
+    """Функция вычисляет ключ очерёдности загрузки файла: чем меньше ключ, тем раньше загрузка.
+
+    Первыми загружаются небольшие файлы, изменённые за последние RECENT_CHANGE_WINDOW
+    секунд, затем остальные небольшие файлы по возрастанию размера. Файлы не меньше
+    LARGE_FILE_SIZE загружаются в отдельной очереди.
+
+    :param size: размер файла в байтах.
+    :type size: int
+    :param mtime_ns: время модификации файла в наносекундах.
+    :type mtime_ns: int
+    :param now: текущее время в секундах, по умолчанию time.time().
+    :type now: float
+    :return: пара (класс приоритета, размер).
+    :rtype: tuple
+    """
+    if size >= LARGE_FILE_SIZE:
+        return LARGE, size
+    now = time.time() if now is None else now
+    if now - mtime_ns / 1e9 <= RECENT_CHANGE_WINDOW:
+        return RECENT, size
+    return SMALL, size
+
+
+class TokenBucket:
+    """Общее для всех загрузок ограничение скорости передачи по алгоритму token bucket.
+
+    Args:
+        rate (int): Скорость пополнения в байтах в секунду, 0 - без ограничения.
+        burst (int): Ёмкость корзины в байтах, по умолчанию скорость за одну секунду.
+
+    Attributes:
+        rate (int): Скорость пополнения в байтах в секунду.
+        burst (int): Ёмкость корзины в байтах.
+    """
+
+    def __init__(self, rate: int, burst: Optional[int] = None) -> None:
+        self.rate = rate
+        self.burst = burst or rate
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, amount: int) -> None:
+        """Метод забирает из корзины amount байт, при необходимости дожидаясь их накопления.
+
+        Запросы больше ёмкости корзины уводят её в долг, который погашается
+        ожиданием, поэтому средняя скорость не превышает rate.
+
+        :param amount: число байт.
+        :type amount: int
+        """
+        if not self.rate or amount <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay:
+            time.sleep(delay)
+
+
+class AimdLimiter:
+    """Адаптивное ограничение числа одновременных загрузок по схеме AIMD.
+
+    Пока ответы API приходят без ошибок и быстрее latency_threshold, предел
+    увеличивается на единицу за каждые limit успешных запросов. Ответ 429, 5xx
+    или ошибка соединения уменьшает предел в decrease раз, но не чаще одного
+    раза за cooldown секунд, чтобы одна волна ошибок не обрушила его до минимума.
+
+    Args:
+        maximum (int): Максимальный предел.
+        initial (int): Начальный предел, по умолчанию половина максимального.
+        minimum (int): Минимальный предел.
+        latency_threshold (float): Время ответа в секундах, выше которого запрос не увеличивает предел.
+        decrease (float): Множитель уменьшения предела.
+        cooldown (float): Минимальный интервал между уменьшениями в секундах.
+
+    Attributes:
+        limit (float): Текущий предел числа одновременных загрузок.
+        active (int): Число выполняющихся загрузок.
+    """
+
+    def __init__(self, maximum: int, initial: Optional[int] = None, minimum: int = 1,
+                 latency_threshold: float = 2.0, decrease: float = 0.5, cooldown: float = 1.0) -> None:
+        self.maximum = maximum
+        self.minimum = minimum
+        self.latency_threshold = latency_threshold
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.limit = float(max(minimum, min(maximum, initial or (maximum + 1) // 2)))
+        self.active = 0
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """Метод дожидается свободного места в пределе и занимает его."""
+        with self._condition:
+            while self.active >= int(self.limit):
+                self._condition.wait()
+            self.active += 1
+
+    def release(self) -> None:
+        """Метод освобождает место, занятое методом acquire."""
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+    def record(self, endpoint: str, duration: float, status_code: Optional[int]) -> None:
+        """Метод изменяет предел по результату запроса к API.
+
+        Сигнатура совпадает с обработчиком HttpClient.add_listener.
+
+        :param endpoint: имя адреса API.
+        :type endpoint: str
+        :param duration: время ответа в секундах.
+        :type duration: float
+        :param status_code: код ответа или None при ошибке соединения.
+        :type status_code: int
+        """
+        with self._condition:
+            if status_code is None or status_code == 429 or status_code >= 500:
+                now = time.monotonic()
+                if now - self._last_decrease >= self.cooldown:
+                    self._last_decrease = now
+                    self._successes = 0
+                    self.limit = max(float(self.minimum), self.limit * self.decrease)
+                    logger.debug(f"{endpoint}: ответ {status_code}, предел загрузок снижен до {int(self.limit)}.")
+            elif duration <= self.latency_threshold and self.limit < self.maximum:
+                self._successes += 1
+                if self._successes >= int(self.limit):
+                    self._successes = 0
+                    self.limit = min(float(self.maximum), self.limit + 1)
+                    self._condition.notify_all()
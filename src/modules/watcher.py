@@ -0,0 +1,226 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import time
+
+from loguru import logger
+from typing import Dict, List, Optional, Tuple
+
+from api_clients.download_stream import PART_SUFFIX
+
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE |\
+             IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+
+EVENT_HEADER = struct.Struct("iIII")
+
+MODIFIED = "modified"
+DELETED = "deleted"
+
+
+class InotifyWatcher:
+    """Класс для отслеживания изменений в дереве директорий через inotify ядра Linux.
+
+    Наблюдение устанавливается на каждую поддиректорию. Создание, удаление и
+    перемещение директорий не разбираются по отдельности: наблюдатель выставляет
+    признак resync_required, после которого выполняется полная сверка дерева.
+
+    Args:
+        path (str): Путь к отслеживаемой директории.
+
+    Attributes:
+        path (str): Путь к отслеживаемой директории.
+        resync_required (bool): Признак потери событий или изменения структуры дерева,
+                                после которого нужна полная синхронизация.
+        polling_required (bool): Признак того, что на часть поддиректорий не удалось
+                                 установить наблюдение, и каждая периодическая
+                                 синхронизация должна обходить дерево полностью.
+        _watches (dict): Словарь {дескриптор наблюдения: путь директории относительно корня}.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.resync_required = False
+        self.polling_required = False
+        self._watches: Dict[int, str] = {}
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify не поддерживается в данной системе.")
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "Не удалось инициализировать inotify.")
+        if not self._add_watches(""):
+            os.close(self._fd)
+            raise OSError(ctypes.get_errno(), f"Не удалось отслеживать директорию {path}.")
+
+    def _add_watches(self, relative_path: str) -> bool:
+        """Функция устанавливает наблюдение на директорию и все её поддиректории.
+
+        :param relative_path: путь директории относительно корня.
+        :type relative_path: str
+        :return: False, если не удалось установить наблюдение на корень дерева.
+        :rtype: bool
+        """
+        stack = [relative_path]
+        while stack:
+            current = stack.pop()
+            absolute_path = os.path.join(self.path, current) if current else self.path
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(absolute_path), WATCH_MASK)
+            if wd < 0:
+                if not current:
+                    return False
+                error = ctypes.get_errno()
+                self.resync_required = True
+                if error != errno.ENOENT:
+                    logger.warning(f"Не удалось отслеживать директорию {absolute_path}: {os.strerror(error)}. "
+                                   f"Изменения в ней будут найдены полным обходом при периодической "
+                                   f"синхронизации.")
+                    self.polling_required = True
+                continue
+            self._watches[wd] = current
+            try:
+                with os.scandir(absolute_path) as entries:
+                    stack.extend(f"{current}/{entry.name}" if current else entry.name
+                                 for entry in entries if entry.is_dir(follow_symlinks=False))
+            except OSError:
+                continue
+        return True
+
+    def read_events(self, timeout: Optional[float]) -> List[Tuple[str, str]]:
+        """Метод ожидает события файловой системы не дольше указанного времени.
+
+        :param timeout: максимальное время ожидания в секундах, None - без ограничения.
+        :type timeout: float
+        :return: список пар (путь файла относительно корня, тип события).
+        :rtype: list
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(buffer[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                self.resync_required = True
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                self.resync_required = self.resync_required or directory == ""
+                continue
+            path = f"{directory}/{name}" if directory else name
+            if name.endswith(PART_SUFFIX):
+                continue
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_watches(path)
+                self.resync_required = True
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                events.append((path, DELETED))
+            else:
+                events.append((path, MODIFIED))
+        return events
+
+    def close(self) -> None:
+        """Метод освобождает дескриптор inotify."""
+        os.close(self._fd)
+
+
+class EventQueue:
+    """Очередь событий с задержкой и объединением повторных событий по одному файлу.
+
+    Файл попадает в обработку только после того, как по нему не было событий
+    в течение интервала задержки, поэтому серия записей в файл превращается
+    в одну загрузку.
+
+    Args:
+        debounce (float): Интервал задержки в секундах.
+
+    Attributes:
+        debounce (float): Интервал задержки в секундах.
+        _pending (dict): Словарь {имя файла: (тип последнего события, время последнего события)}.
+    """
+
+    def __init__(self, debounce: float) -> None:
+        self.debounce = debounce
+        self._pending: Dict[str, Tuple[str, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def push(self, name: str, kind: str) -> None:
+        """Метод добавляет событие в очередь, заменяя предыдущее событие по тому же файлу.
+
+        :param name: имя файла.
+        :type name: str
+        :param kind: тип события.
+        :type kind: str
+        """
+        self._pending[name] = (kind, time.monotonic())
+
+    def next_deadline(self) -> Optional[float]:
+        """Метод возвращает момент, когда будет готово ближайшее событие.
+
+        :return: значение time.monotonic() или None, если очередь пуста.
+        :rtype: float
+        """
+        if not self._pending:
+            return None
+        return min(moment for _, moment in self._pending.values()) + self.debounce
+
+    def pop_ready(self) -> Dict[str, str]:
+        """Метод извлекает из очереди события, по которым истёк интервал задержки.
+
+        :return: словарь {имя файла: тип события}.
+        :rtype: dict
+        """
+        border = time.monotonic() - self.debounce
+        ready = {name: kind for name, (kind, moment) in self._pending.items() if moment <= border}
+        for name in ready:
+            del self._pending[name]
+        return ready
+
+
+def create_watcher(path: str) -> Optional[InotifyWatcher]:
+    """Функция создаёт наблюдатель за директорией, если inotify доступен.
+
+    :param path: путь к отслеживаемой директории.
+    :type path: str
+    :return: наблюдатель или None, если inotify недоступен.
+    :rtype: InotifyWatcher
+    """
+    try:
+        return InotifyWatcher(path)
+    except (OSError, AttributeError) as ex:
+        logger.warning(f"Режим отслеживания событий недоступен, используется периодическая синхронизация: {ex}")
+        return None
@@ -1,7 +1,8 @@
 import os
-from typing import List
+from typing import Iterable, List, Set
 from datetime import datetime, timedelta
 from modules.files_in_the_checked_directory import FileInTheCheckedDirectory
+from modules.local_scanner import LocalScanner
 
 
 def detecting_files_in_local_directory(path_dir: str) -> list[str]:
@@ -18,67 +19,84 @@ def detecting_files_in_local_directory(path_dir: str) -> list[str]:
 def generating_a_dict_of_files(path: str) -> dict:
     """Функция создаёт словарь хронящий в себе названия и даты последней модификации файлов
     из локальной директории выбраной для синхронизации с облочным хранилищем.
+
+    Директория читается сканером LocalScanner, а значения словаря ссылаются на строки
+    полученной таблицы FileTable.
     
     :param path: путь к локальной директории.
     :type path: str
     :return: словарь с информацией о файлах.
     :rtype: dict
     """
-    list_local_files = {}
-    for item in detecting_files_in_local_directory(path):
-        list_local_files[f"{item}"] = FileInTheCheckedDirectory(item, path)
-    return list_local_files
-       
-def creating_a_list_of_files_to_download(list_files_in_cloud_storage: dict, local_files) -> List[str]:
-    """Функция создаёт список файлов которые нужно загрузить в облочное хранилище. 
-    
-    :param list_files_in_cloud_storage: словарь содержащий информацию о файлах на сервере.
-    :type list_files_in_cloud_storage: dict
-    :param local_files: список содержащий информацию о файлах на локальном диске.
-    :type local_files: list
-    :return: список файлов для загрузки.
+    files = LocalScanner(path).scan_directory('', path)[0]
+    return {name: FileInTheCheckedDirectory(files, position, path) for position, name in enumerate(files.names)}
+
+def creating_a_list_of_folders_to_create(remote_folders: set, local_folders: set) -> List[str]:
+    """Функция создаёт список папок, которых нет в облачном хранилище,
+    упорядоченный так, что родительские папки идут раньше дочерних.
+
+    :param remote_folders: множество папок в облаке
+    :type remote_folders: set
+    :param local_folders: множество папок на локальном диске
+    :type local_folders: set
+    :return: список папок для создания
     :rtype: list
     """
-    list_files_to_download = []
-    for file_name in local_files:
-        if file_name not in list_files_in_cloud_storage.keys():
-            list_files_to_download.append(file_name)
-    return list_files_to_download
+    return sorted(local_folders - remote_folders, key=lambda folder: (folder.count('/'), folder))
 
-def creating_a_list_of_files_to_update(files: dict, list_files_in_cloud_storage)-> List[str]:
-    """Функция создайт список файлов которые были изменены и их нужно обновить 
-    в облочном хранилище.
-    
-    :param files: словарь со всеми файлами локальной папки
-    :type files: dict
-    :param list_files_in_cloud_storage: словарь с файлами облачного хранилища
-    :type list_files_in_cloud_storage: dict
-    :return: список файлов для обновления
+def creating_a_list_of_folders_to_delete(remote_folders: set, local_folders: set) -> List[str]:
+    """Функция создаёт список папок в облаке, которых нет на локальном диске.
+    В список попадают только верхние из таких папок, вложенные удаляются вместе с ними.
+
+    :param remote_folders: множество папок в облаке
+    :type remote_folders: set
+    :param local_folders: множество папок на локальном диске
+    :type local_folders: set
+    :return: список папок для удаления
     :rtype: list
     """
-    list_files_to_update = []
-    for item in files:
-        if item in list_files_in_cloud_storage.keys()\
-            and (files[item].get_modification_date() > list_files_in_cloud_storage[item]):
-            list_files_to_update.append(item)
-    return list_files_to_update
-            
-def creating_a_list_of_files_to_delete(list_files_in_cloud_storage, local_files) -> List[str]:
-    """Функция создаёт список файлов  в облаке, которые не найдены локально и
-    их нужно удалить из облочного хранилища.
-    
-    :param list_files_in_cloud_storage: словарь файлов в облаке
-    :type list_files_in_cloud_storage: dict
-    :param local_files: список файлов на локальном диске
-    :type local_files: list
-    :return: список файлов для удаления
+    missing_folders = remote_folders - local_folders
+    return sorted(folder for folder in missing_folders
+                  if '/' not in folder or folder.rsplit('/', 1)[0] not in missing_folders)
+
+def excluding_files_in_folders(list_files: List[str], folders: List[str]) -> List[str]:
+    """Функция исключает из списка файлы, находящиеся внутри указанных папок.
+
+    :param list_files: список путей файлов
+    :type list_files: list
+    :param folders: список путей папок
+    :type folders: list
+    :return: список файлов вне указанных папок
     :rtype: list
     """
-    list_files_to_delete = []
-    for file_name in list_files_in_cloud_storage.keys():
-        if file_name not in local_files:
-            list_files_to_delete.append(file_name)
-    return list_files_to_delete
+    folders = set(folders)
+    result = []
+    for file_name in list_files:
+        parent = file_name
+        while '/' in parent:
+            parent = parent.rsplit('/', 1)[0]
+            if parent in folders:
+                break
+        else:
+            result.append(file_name)
+    return result
+
+def collecting_parent_folders(list_files: Iterable[str]) -> Set[str]:
+    """Функция собирает все папки, в которых находятся файлы, включая вложенные.
+
+    :param list_files: пути файлов
+    :type list_files: Iterable
+    :return: множество путей папок
+    :rtype: set
+    """
+    folders = set()
+    for file_name in list_files:
+        while '/' in file_name:
+            file_name = file_name.rsplit('/', 1)[0]
+            if file_name in folders:
+                break
+            folders.add(file_name)
+    return folders
 
 def convert_time_to_seconds(time: str) -> int:
     """Функция конвертирует знчение времени в формате "hh:mm:ss" в секунды.
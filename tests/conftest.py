@@ -0,0 +1,53 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from api_clients.http_client import HttpClient
+from api_clients.yandex_req import YandexDisk
+from fake_yandex_disk import FakeYandexDisk
+from modules.file_index import FileIndex
+from modules.metrics import Metrics
+from modules.operation_journal import OperationJournal, journal_file_for
+from modules.synchroniser import Synchroniser
+from modules.transfer_executor import TransferExecutor
+
+REMOTE_FOLDER = "/Sync"
+
+
+@pytest.fixture
+def fake_disk():
+    disk = FakeYandexDisk(keep_content=True).start()
+    disk.mkdirs(REMOTE_FOLDER)
+    yield disk
+    disk.stop()
+
+
+@pytest.fixture
+def make_synchroniser(tmp_path, fake_disk):
+    """Фабрика синхронизаторов локальной директории tmp_path/local с папкой REMOTE_FOLDER локальной замены API."""
+    created = []
+
+    def make(sync_mode: str = "upload", webdav_operations: str = "", **kwargs) -> Synchroniser:
+        root = tmp_path / "local"
+        root.mkdir(exist_ok=True)
+        connect = YandexDisk(token="test", path_to_the_folder=REMOTE_FOLDER, url=fake_disk.url,
+                             client=HttpClient(backoff=0.01, metrics=Metrics()), webdav_url=fake_disk.webdav_url,
+                             webdav_operations=webdav_operations)
+        index = FileIndex(str(tmp_path / "index.sqlite3"))
+        executor = TransferExecutor(4, metrics=Metrics())
+        synchroniser = Synchroniser(connect, str(root), index, executor, metrics=Metrics(), sync_mode=sync_mode,
+                                    journal=OperationJournal(journal_file_for(index.index_file), Metrics()),
+                                    **kwargs)
+        created.append(synchroniser)
+        return synchroniser
+
+    yield make
+    for synchroniser in created:
+        synchroniser.executor.shutdown()
+        synchroniser.journal.close()
+        synchroniser.index.close()
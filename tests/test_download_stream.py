@@ -0,0 +1,110 @@
+import hashlib
+
+import pytest
+
+from api_clients import download_stream
+from api_clients.download_stream import PART_SUFFIX, DownloadStream
+
+DATA = bytes(range(256)) * 64
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, body: bytes) -> None:
+        self.status_code = status_code
+        self.reason = "OK"
+        self.body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), 1000):
+            yield self.body[start:start + 1000]
+
+
+class FakeClient:
+    """HTTP клиент, отдающий DATA с поддержкой Range и обрывающий заданное число ответов.
+
+    Args:
+        ranges (bool): Поддерживает ли сервер заголовок Range.
+        broken (int): Число первых ответов, обрывающихся после половины тела.
+    """
+
+    def __init__(self, ranges: bool = True, broken: int = 0) -> None:
+        self.ranges = ranges
+        self.broken = broken
+        self.requests = []
+
+    def get(self, href, headers=None, **kwargs):
+        range_header = (headers or {}).get("Range")
+        self.requests.append(range_header)
+        if range_header and self.ranges:
+            start, end = map(int, range_header[len("bytes="):].split("-"))
+            response = FakeResponse(206, DATA[start:end + 1])
+        else:
+            response = FakeResponse(200, DATA)
+        if self.broken:
+            self.broken -= 1
+            response.body = response.body[:len(response.body) // 2]
+        return response
+
+
+def download(tmp_path, client: FakeClient, attempts: int = 3) -> bytes:
+    path = str(tmp_path / "file.bin")
+    stream = DownloadStream(client, path, len(DATA))
+    for _ in range(attempts):
+        try:
+            stream.fetch("href")
+            break
+        except ConnectionError:
+            pass
+    assert stream.done
+    stream.commit(hashlib.md5(DATA).hexdigest())
+    assert not (tmp_path / ("file.bin" + PART_SUFFIX)).exists()
+    return (tmp_path / "file.bin").read_bytes()
+
+
+def test_single_segment_resumes_from_written_position(tmp_path):
+    client = FakeClient(broken=1)
+    assert download(tmp_path, client) == DATA
+    assert client.requests == [None, f"bytes={len(DATA) // 2}-{len(DATA) - 1}"]
+
+
+def test_single_segment_refetches_when_range_is_ignored(tmp_path):
+    """Сервер без поддержки Range отдаёт файл целиком, и он скачивается заново с нулевого байта."""
+    client = FakeClient(ranges=False, broken=1)
+    assert download(tmp_path, client) == DATA
+    assert client.requests == [None, f"bytes={len(DATA) // 2}-{len(DATA) - 1}", None]
+
+
+@pytest.fixture
+def ranged(monkeypatch):
+    monkeypatch.setattr(download_stream, "RANGE_DOWNLOAD_THRESHOLD", 1024)
+
+
+def test_large_file_is_downloaded_in_parallel_ranges(tmp_path, ranged):
+    client = FakeClient()
+    assert download(tmp_path, client) == DATA
+    step = len(DATA) // download_stream.RANGE_PARTS
+    assert sorted(client.requests) == sorted(f"bytes={start}-{start + step - 1}"
+                                             for start in range(0, len(DATA), step))
+
+
+def test_ranges_fall_back_to_whole_file(tmp_path, ranged):
+    client = FakeClient(ranges=False)
+    assert download(tmp_path, client) == DATA
+    assert client.requests[-1] is None
+
+
+def test_hash_mismatch_keeps_target_untouched(tmp_path):
+    (tmp_path / "file.bin").write_bytes(b"old")
+    stream = DownloadStream(FakeClient(), str(tmp_path / "file.bin"), len(DATA))
+    stream.fetch("href")
+    with pytest.raises(ValueError):
+        stream.commit("0" * 32)
+    stream.discard()
+    assert (tmp_path / "file.bin").read_bytes() == b"old"
+    assert not (tmp_path / ("file.bin" + PART_SUFFIX)).exists()
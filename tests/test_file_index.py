@@ -0,0 +1,43 @@
+import hashlib
+
+from modules.file_index import FileIndex
+from modules.file_table import IndexTable
+
+MD5 = hashlib.md5(b"data").hexdigest()
+SHA256 = hashlib.sha256(b"data").hexdigest()
+
+
+def test_index_survives_restart(tmp_path):
+    index_file = str(tmp_path / "index.sqlite3")
+    index = FileIndex(index_file)
+    index.store_hashes("a.txt", (4, 1, 1), MD5, SHA256)
+    index.mark_synced("a.txt", (4, 1, 1), 1_000)
+    index.mark_synced("b.txt", (5, 2, 2 ** 62))
+    index.close()
+
+    index = FileIndex(index_file)
+    assert len(index) == 2
+    assert index.get_synced_stat("a.txt") == (4, 1, 1)
+    assert index.get_synced_md5("a.txt") == MD5
+    assert index.get_remote_modified("a.txt") == 1_000
+    assert index.get_cached_hashes("a.txt", (4, 1, 1)) == (MD5, SHA256)
+    assert index.get_cached_hashes("a.txt", (4, 2, 1)) is None
+    assert index.get_synced_stat("b.txt") == (5, 2, 2 ** 62)
+    assert index.get_synced_md5("b.txt") is None
+    assert index.get_remote_modified("b.txt") is None
+    assert index.detect_changes({"a.txt": (4, 1, 1), "c.txt": (1, 1, 3)}) == (["c.txt"], ["b.txt"])
+    index.close()
+
+
+def test_forgotten_rows_are_reused():
+    table = IndexTable("qqQq", (16,))
+    table.put("a.txt", (1, 1, 1, None, MD5))
+    table.put("b.txt", (2, 2, 2, 7, None))
+    assert table.pop("a.txt")
+    assert not table.pop("a.txt")
+    table.put("c.txt", (3, 3, 3, None, None))
+    assert len(table.columns[0]) == 2
+    assert table.get("c.txt") == (3, 3, 3, None, None)
+    assert table.get("b.txt") == (2, 2, 2, 7, None)
+    assert table.get("a.txt") is None
+    assert sorted(table) == ["b.txt", "c.txt"]
@@ -0,0 +1,26 @@
+import os
+
+from modules.file_table import FileTable
+from modules.files_in_the_checked_directory import FileInTheCheckedDirectory
+from utils import generating_a_dict_of_files
+
+
+def test_file_is_a_view_over_table_row(tmp_path):
+    table = FileTable()
+    table.append("a.txt", 3, 1_500_000_000 * 10 ** 9, 7)
+    file = FileInTheCheckedDirectory(table, 0, str(tmp_path))
+    assert not hasattr(file, "__dict__")
+    assert file.get_file_name() == "a.txt"
+    assert file.stat == (3, 1_500_000_000 * 10 ** 9, 7)
+    assert file.get_modification_date().timestamp() == 1_500_000_000
+    assert file.get_file_path() == os.path.join(str(tmp_path), "a.txt")
+
+
+def test_dict_of_files_is_built_from_scan(tmp_path):
+    (tmp_path / "b.txt").write_text("data")
+    (tmp_path / "sub").mkdir()
+    os.utime(tmp_path / "b.txt", ns=(0, 2_000_000_000 * 10 ** 9))
+    files = generating_a_dict_of_files(str(tmp_path))
+    assert list(files) == ["b.txt"]
+    assert files["b.txt"].size == 4
+    assert files["b.txt"].get_modification_date() == files["b.txt"].set_the_last_modification_date_of_a_file()
@@ -0,0 +1,57 @@
+import hashlib
+import os
+
+import pytest
+
+from modules.file_index import FileIndex
+from modules.hashing import FileHasher, compute_file_hashes
+from modules.metrics import Metrics
+
+
+def stat_of(path) -> tuple:
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+@pytest.fixture
+def index():
+    file_index = FileIndex(":memory:")
+    yield file_index
+    file_index.close()
+
+
+def test_compute_file_hashes(tmp_path):
+    data = os.urandom(3 * 1024 * 1024 + 17)
+    (tmp_path / "a.bin").write_bytes(data)
+    assert compute_file_hashes(str(tmp_path / "a.bin")) == (hashlib.md5(data).hexdigest(),
+                                                            hashlib.sha256(data).hexdigest())
+
+
+def test_hashes_are_cached_by_stat_and_reported_per_cycle(tmp_path, index):
+    """Неизменённый файл не читается повторно, а статистика накапливается до конца цикла."""
+    (tmp_path / "a.txt").write_text("first")
+    (tmp_path / "b.txt").write_text("second")
+    metrics = Metrics()
+    hasher = FileHasher(index, metrics=metrics)
+    stats = {name: stat_of(tmp_path / name) for name in ("a.txt", "b.txt")}
+    first = hasher.hash_files(str(tmp_path), stats)
+    assert first["a.txt"][0] == hashlib.md5(b"first").hexdigest()
+    assert hasher.hash_files(str(tmp_path), stats) == first
+
+    cycle = hasher.take_cycle_stats()
+    assert (cycle["files"], cycle["bytes"], cycle["cache_hits"]) == (2, 11, 2)
+    assert cycle["cache_hit_rate"] == 0.5
+    assert "synchroniser_hashed_bytes_total 11" in metrics.render()
+    assert "synchroniser_hash_cache_hits_total 2" in metrics.render()
+
+    (tmp_path / "a.txt").write_text("changed!")
+    stats["a.txt"] = stat_of(tmp_path / "a.txt")
+    assert hasher.hash_files(str(tmp_path), stats)["a.txt"][0] == hashlib.md5(b"changed!").hexdigest()
+    cycle = hasher.take_cycle_stats()
+    assert (cycle["files"], cycle["bytes"], cycle["cache_hits"]) == (1, 8, 1)
+
+
+def test_unreadable_file_is_skipped(tmp_path, index):
+    hasher = FileHasher(index, metrics=Metrics())
+    assert hasher.hash_files(str(tmp_path), {"missing.txt": (1, 1, 1)}) == {}
+    assert hasher.take_cycle_stats()["files"] == 1
@@ -0,0 +1,30 @@
+import requests
+
+from api_clients.http_client import HttpClient
+from modules.metrics import Metrics
+
+
+def response_with(retry_after: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 429
+    response.headers["Retry-After"] = retry_after
+    return response
+
+
+def test_retry_after_is_honoured_below_cap():
+    client = HttpClient(backoff=0.5, max_delay=30, metrics=Metrics())
+    assert client._retry_delay(0, response_with("12")) == 12
+
+
+def test_large_retry_after_falls_back_to_backoff():
+    """Задержка из Retry-After больше max_delay заменяется экспоненциальной."""
+    client = HttpClient(backoff=0.5, max_delay=30, metrics=Metrics())
+    delay = client._retry_delay(1, response_with("3600"))
+    assert 1 <= delay <= 1.5
+    assert 1 <= client._retry_delay(1, response_with("Wed, 21 Oct 2099 07:28:00 GMT")) <= 1.5
+
+
+def test_backoff_is_capped():
+    client = HttpClient(backoff=0.5, max_delay=30, metrics=Metrics())
+    assert client._retry_delay(20, None) == 30
+    assert 0.5 <= client._retry_delay(0, response_with("invalid")) <= 0.75
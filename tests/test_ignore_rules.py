@@ -0,0 +1,92 @@
+import pytest
+
+from modules.ignore_rules import IGNORE_FILE_NAME, IgnoreRules, compile_pattern
+
+
+def write_rules(directory, *patterns: str) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / IGNORE_FILE_NAME).write_text("\n".join(patterns) + "\n", encoding="utf-8")
+
+
+def matches(pattern: str, path: str) -> bool:
+    rule, _, _ = compile_pattern(pattern)
+    return bool(rule.fullmatch(path))
+
+
+@pytest.mark.parametrize("pattern, path, expected", [
+    ("*.log", "a.log", True),
+    ("*.log", "dir/sub/a.log", True),
+    ("*.log", "a.log.txt", False),
+    ("/build", "build", True),
+    ("/build", "src/build", False),
+    ("docs/*.md", "docs/a.md", True),
+    ("docs/*.md", "docs/sub/a.md", False),
+    ("docs/*.md", "src/docs/a.md", False),
+    ("**/cache", "a/b/cache", True),
+    ("logs/**", "logs/a/b.txt", True),
+    ("a/**/b", "a/b", True),
+    ("a/**/b", "a/x/y/b", True),
+    ("file?.txt", "file1.txt", True),
+    ("file?.txt", "file/.txt", False),
+    ("[!a]*.txt", "b.txt", True),
+    ("[!a]*.txt", "a.txt", False),
+    ("\\#name", "#name", True),
+])
+def test_compile_pattern(pattern, path, expected):
+    assert matches(pattern, path) is expected
+
+
+def test_comments_and_empty_lines_are_skipped():
+    assert compile_pattern("# comment") is None
+    assert compile_pattern("   ") is None
+    assert compile_pattern("!important")[1:] == (True, False)
+    assert compile_pattern("tmp/")[1:] == (False, True)
+
+
+def test_negation_keeps_file(tmp_path):
+    """Как и в git, побеждает последнее подходящее правило."""
+    rules = IgnoreRules(str(tmp_path), ["*.log", "!keep.log"])
+    assert rules.is_ignored("debug.log")
+    assert not rules.is_ignored("keep.log")
+    assert not rules.is_ignored("dir/keep.log")
+
+
+def test_negation_cannot_return_file_from_ignored_directory(tmp_path):
+    rules = IgnoreRules(str(tmp_path), ["build/", "!build/keep.txt"])
+    assert rules.is_ignored("build/keep.txt")
+    assert rules.is_ignored("build", is_dir=True)
+
+
+def test_directory_only_pattern_does_not_match_file(tmp_path):
+    rules = IgnoreRules(str(tmp_path), ["cache/"])
+    assert not rules.is_ignored("cache")
+    assert rules.is_ignored("cache", is_dir=True)
+    assert rules.is_ignored("a/cache/file.bin")
+
+
+def test_directory_rules_are_anchored_to_their_directory(tmp_path):
+    write_rules(tmp_path / "project", "/out", "*.o", "!main.o")
+    rules = IgnoreRules(str(tmp_path), [])
+    assert rules.is_ignored("project/out", is_dir=True)
+    assert not rules.is_ignored("project/src/out", is_dir=True)
+    assert not rules.is_ignored("out", is_dir=True)
+    assert rules.is_ignored("project/src/a.o")
+    assert not rules.is_ignored("project/src/main.o")
+    assert not rules.is_ignored("a.o")
+
+
+def test_nested_rules_override_parent_rules(tmp_path):
+    write_rules(tmp_path, "*.csv")
+    write_rules(tmp_path / "data", "!*.csv")
+    rules = IgnoreRules(str(tmp_path), [])
+    assert rules.is_ignored("report.csv")
+    assert not rules.is_ignored("data/report.csv")
+
+
+def test_rules_file_is_reloaded_when_changed(tmp_path):
+    write_rules(tmp_path, "*.csv")
+    rules = IgnoreRules(str(tmp_path), [])
+    assert rules.is_ignored("report.csv")
+    (tmp_path / IGNORE_FILE_NAME).unlink()
+    rules.load_directory("")
+    assert not rules.is_ignored("report.csv")
@@ -0,0 +1,93 @@
+from modules.metrics import Metrics
+from modules.operation_journal import OperationJournal, journal_file_for
+from modules.transfer_executor import LOAD, RELOAD, DELETE, MOVE
+
+
+def create_journal(journal_file: str = ":memory:") -> OperationJournal:
+    return OperationJournal(journal_file, Metrics())
+
+
+def pending(journal: OperationJournal) -> dict:
+    return {entry.name: entry.operation for entry in journal.pending()}
+
+
+def test_repeated_changes_are_coalesced_into_one_entry():
+    """Многократные изменения файла приводят к одной загрузке."""
+    journal = create_journal()
+    journal.record([(LOAD, "a.txt", None), (RELOAD, "a.txt", None), (RELOAD, "a.txt", None)])
+    entries = journal.pending()
+    assert [(entry.operation, entry.name, entry.operations) for entry in entries] == [(LOAD, "a.txt", 3)]
+
+
+def test_deleting_file_before_upload_cancels_upload():
+    """Создание и удаление файла до выполнения взаимно уничтожаются."""
+    journal = create_journal()
+    journal.record([(LOAD, "a.txt", None)])
+    assert journal.record([(DELETE, "a.txt", None)]) == []
+    assert len(journal) == 0
+
+
+def test_delete_and_create_become_overwrite():
+    journal = create_journal()
+    journal.record([(DELETE, "a.txt", None), (LOAD, "a.txt", None)])
+    assert pending(journal) == {"a.txt": RELOAD}
+
+
+def test_started_upload_is_coalesced_as_overwrite():
+    """Результат начатой загрузки неизвестен, поэтому новое изменение перезаписывает файл."""
+    journal = create_journal()
+    entry, = journal.record([(LOAD, "a.txt", None)])
+    journal.start(entry)
+    journal.record([(RELOAD, "a.txt", None)])
+    assert pending(journal) == {"a.txt": RELOAD}
+
+
+def test_change_of_pending_move_splits_it_into_delete_and_upload():
+    journal = create_journal()
+    journal.record([(MOVE, "new.txt", "old.txt")])
+    journal.record([(RELOAD, "new.txt", None)])
+    assert pending(journal) == {"old.txt": DELETE, "new.txt": LOAD}
+
+
+def test_superseded_entries_are_replaced():
+    journal = create_journal()
+    journal.record([(LOAD, "a.txt", None), (LOAD, "b.txt", None)])
+    journal.record([(DELETE, "c.txt", None)], superseded=["a.txt"])
+    assert pending(journal) == {"b.txt": LOAD, "c.txt": DELETE}
+
+
+def test_complete_keeps_entry_merged_after_submission():
+    """Запись, объединённая с новой операцией после постановки в очередь, не удаляется."""
+    journal = create_journal()
+    entry, = journal.record([(LOAD, "a.txt", None)])
+    journal.start(entry)
+    journal.record([(RELOAD, "a.txt", None)])
+    journal.complete(entry)
+    assert pending(journal) == {"a.txt": RELOAD}
+    current, = journal.pending()
+    journal.complete(current)
+    assert len(journal) == 0
+
+
+def test_pending_operations_survive_crash(tmp_path):
+    """После аварийного завершения в журнале остаются только невыполненные операции."""
+    journal_file = journal_file_for(str(tmp_path / "index.sqlite3"))
+    journal = create_journal(journal_file)
+    entries = journal.record([(LOAD, "a.txt", None), (DELETE, "b.txt", None), (MOVE, "d.txt", "c.txt")])
+    started = {entry.name: entry for entry in entries}
+    journal.start(started["a.txt"])
+    journal.start(started["b.txt"])
+    journal.complete(started["b.txt"])
+    # Процесс завершается без закрытия журнала.
+
+    replayed = create_journal(journal_file)
+    entries = {entry.name: entry for entry in replayed.pending()}
+    assert set(entries) == {"a.txt", "d.txt"}
+    assert entries["a.txt"].operation == LOAD and entries["a.txt"].started
+    assert (entries["d.txt"].operation, entries["d.txt"].source, entries["d.txt"].started) == (MOVE, "c.txt", False)
+
+    replayed.record([(RELOAD, "a.txt", None)])
+    assert pending(replayed) == {"a.txt": RELOAD, "d.txt": MOVE}
+    assert replayed.pending()[0].sequence > max(entry.sequence for entry in started.values())
+    replayed.close()
+    journal.close()
@@ -0,0 +1,157 @@
+import hashlib
+
+import pytest
+
+from modules.file_index import FileIndex
+from modules.file_table import RemoteFile
+from modules.sync_plan import create_sync_plan, create_two_way_plan, detect_moves
+
+
+def md5(label: str) -> str:
+    return hashlib.md5(label.encode()).hexdigest()
+
+
+HASHES = {
+    "same.txt": (md5("same"), "sha-same"),
+    "edited.txt": (md5("edited"), "sha-edited"),
+    "renamed.txt": (md5("moved"), "sha-moved"),
+    "copy.txt": (md5("other"), "sha-other"),
+}
+
+
+class HashFiles:
+    """Замена вычисления хешей, запоминающая запрошенные файлы."""
+
+    def __init__(self, hashes: dict = HASHES) -> None:
+        self.hashes = hashes
+        self.requested = set()
+
+    def __call__(self, stats: dict) -> dict:
+        self.requested.update(stats)
+        return {path: self.hashes[path] for path in stats if path in self.hashes}
+
+
+def remote(path: str, size: int, md5: str, modified: int = 1_000) -> RemoteFile:
+    return RemoteFile(path, size, md5, None, modified)
+
+
+def test_one_way_changed_file_with_older_mtime_is_overwritten():
+    """Время модификации не учитывается: восстановленный более старый файл загружается."""
+    local_files = {"edited.txt": (10, 1, 1), "same.txt": (10, 1, 2)}
+    remote_files = {"edited.txt": remote("edited.txt", 10, md5("old"), modified=2_000_000_000),
+                    "same.txt": remote("same.txt", 10, md5("same"), modified=2_000_000_000)}
+    plan = create_sync_plan(local_files, ["edited.txt", "same.txt"], remote_files, HashFiles())
+    assert plan.overwrite == ["edited.txt"]
+    assert plan.unchanged == ["same.txt"]
+
+
+def test_one_way_touched_file_with_same_content_is_not_uploaded():
+    plan = create_sync_plan({"same.txt": (10, 3_000_000_000 * 10 ** 9, 1)}, ["same.txt"],
+                            {"same.txt": remote("same.txt", 10, md5("same"))}, HashFiles())
+    assert plan.unchanged == ["same.txt"]
+    assert not plan
+
+
+def test_one_way_size_difference_does_not_need_hashes():
+    hash_files = HashFiles()
+    plan = create_sync_plan({"edited.txt": (40, 1, 1)}, ["edited.txt"],
+                            {"edited.txt": remote("edited.txt", 18, md5("edited"))}, hash_files)
+    assert plan.overwrite == ["edited.txt"]
+    assert "edited.txt" not in hash_files.requested
+
+
+def test_one_way_unchanged_files_are_not_compared():
+    hash_files = HashFiles()
+    plan = create_sync_plan({"same.txt": (10, 1, 1)}, [], {"same.txt": remote("same.txt", 99, md5("x"))}, hash_files)
+    assert not plan
+    assert not hash_files.requested
+
+
+def test_one_way_rename_becomes_move():
+    local_files = {"renamed.txt": (7, 1, 1), "copy.txt": (7, 1, 2), "new.txt": (3, 1, 3)}
+    remote_files = {"original.txt": remote("original.txt", 7, md5("moved")), "gone.txt": remote("gone.txt", 5, "x")}
+    plan = create_sync_plan(local_files, list(local_files), remote_files, HashFiles())
+    assert plan.move == [("original.txt", "renamed.txt")]
+    assert plan.upload == ["copy.txt", "new.txt"]
+    assert plan.delete == ["gone.txt"]
+
+
+def test_detect_moves_pairs_each_source_once():
+    moves = detect_moves({"a.txt": (7, md5("moved")), "b.txt": (7, None)},
+                         {"renamed.txt": (7, 1, 1), "copy.txt": (7, 1, 2)}, HashFiles())
+    assert moves == [("a.txt", "renamed.txt")]
+
+
+def test_detect_moves_matches_duplicates_to_distinct_sources():
+    hashes = {"x.txt": (md5("moved"), ""), "y.txt": (md5("moved"), "")}
+    moves = detect_moves({"a.txt": (7, md5("moved")), "b.txt": (7, md5("moved"))},
+                         {"x.txt": (7, 1, 1), "y.txt": (7, 1, 2)}, HashFiles(hashes))
+    assert sorted(moves) == [("a.txt", "x.txt"), ("b.txt", "y.txt")]
+
+
+def test_detect_moves_skips_hashing_without_size_match():
+    hash_files = HashFiles()
+    assert detect_moves({"a.txt": (7, md5("moved"))}, {"renamed.txt": (8, 1, 1)}, hash_files) == []
+    assert not hash_files.requested
+
+
+@pytest.fixture
+def index():
+    file_index = FileIndex(":memory:")
+    yield file_index
+    file_index.close()
+
+
+def test_two_way_file_deleted_after_upload_is_deleted_in_cloud(index):
+    """Файл, загруженный программой и затем удалённый локально, не скачивается обратно."""
+    index.mark_synced("same.txt", (10, 1, 1), None, md5("same"))
+    plan = create_two_way_plan({}, [], {"same.txt": remote("same.txt", 10, md5("same"))}, index, HashFiles())
+    assert plan.delete == ["same.txt"]
+    assert not plan.download
+
+
+def test_two_way_deleted_file_without_remote_state_is_deleted_in_cloud(index):
+    index.mark_synced("same.txt", (10, 1, 1))
+    plan = create_two_way_plan({}, [], {"same.txt": remote("same.txt", 10, md5("same"))}, index, HashFiles())
+    assert plan.delete == ["same.txt"]
+    assert not plan.download
+
+
+def test_two_way_file_changed_in_cloud_wins_over_local_delete(index):
+    index.mark_synced("same.txt", (10, 1, 1), None, md5("same"))
+    plan = create_two_way_plan({}, [], {"same.txt": remote("same.txt", 12, md5("new"))}, index, HashFiles())
+    assert plan.download == ["same.txt"]
+    assert not plan.delete
+
+
+def test_two_way_local_edit_with_older_mtime_is_uploaded(index):
+    index.mark_synced("edited.txt", (10, 5 * 10 ** 18, 1), 1_000, md5("old"))
+    local_files = {"edited.txt": (10, 1, 1)}
+    plan = create_two_way_plan(local_files, ["edited.txt"], {"edited.txt": remote("edited.txt", 10, md5("old"))},
+                               index, HashFiles())
+    assert plan.overwrite == ["edited.txt"]
+
+
+def test_two_way_remote_edit_is_downloaded_and_local_delete_in_cloud_removes_file(index):
+    index.mark_synced("same.txt", (10, 1, 1), 1_000, md5("same"))
+    index.mark_synced("local.txt", (3, 1, 2), 1_000, md5("local"))
+    local_files = {"same.txt": (10, 1, 1), "local.txt": (3, 1, 2)}
+    plan = create_two_way_plan(local_files, [], {"same.txt": remote("same.txt", 11, md5("new"), 2_000)},
+                               index, HashFiles())
+    assert plan.download == ["same.txt"]
+    assert plan.delete_local == ["local.txt"]
+
+
+@pytest.mark.parametrize("policy, local_mtime, expected", [
+    ("newer", 3_000 * 10 ** 9, "overwrite"),
+    ("newer", 500 * 10 ** 9, "download"),
+    ("local", 500 * 10 ** 9, "overwrite"),
+    ("remote", 3_000 * 10 ** 9, "download"),
+    ("keep_both", 3_000 * 10 ** 9, "conflicts"),
+])
+def test_two_way_conflict_policies(index, policy, local_mtime, expected):
+    index.mark_synced("edited.txt", (10, 1, 1), 1_000, md5("old"))
+    plan = create_two_way_plan({"edited.txt": (12, local_mtime, 1)}, ["edited.txt"],
+                               {"edited.txt": remote("edited.txt", 11, md5("remote"), 2_000)},
+                               index, HashFiles(), policy)
+    assert getattr(plan, expected) == ["edited.txt"]
@@ -0,0 +1,89 @@
+import threading
+
+from conftest import REMOTE_FOLDER
+from modules.watcher import DELETED, MODIFIED
+
+
+def test_large_upload_runs_past_the_end_of_the_cycle(tmp_path, fake_disk, make_synchroniser, monkeypatch):
+    """Цикл не ждёт загрузки большого файла, а её результат попадает в индекс после завершения."""
+    monkeypatch.setattr("modules.transfer_scheduler.LARGE_FILE_SIZE", 1024)
+    synchroniser = make_synchroniser()
+    root = tmp_path / "local"
+    (root / "big.bin").write_bytes(b"x" * 4096)
+    (root / "a.txt").write_text("a")
+    release = threading.Event()
+    load = synchroniser.connect.load
+
+    def slow_load(path, file_name=None, hashes=None):
+        if file_name == "big.bin":
+            release.wait(5)
+        return load(path, file_name, hashes)
+
+    synchroniser.connect.load = slow_load
+    try:
+        assert synchroniser.full_synchronization()
+        assert f"{REMOTE_FOLDER}/a.txt" in fake_disk.resources
+        assert f"{REMOTE_FOLDER}/big.bin" not in fake_disk.resources
+        assert "big.bin" not in synchroniser.index
+
+        (root / "b.txt").write_text("b")
+        assert synchroniser.full_synchronization()
+        assert f"{REMOTE_FOLDER}/b.txt" in fake_disk.resources
+        assert synchroniser.collect_background_uploads() == ["big.bin"]
+    finally:
+        release.set()
+    future, _ = synchroniser._background["big.bin"]
+    assert future.result(5).success
+    assert synchroniser.collect_background_uploads() == []
+    assert "big.bin" in synchroniser.index
+    assert len(synchroniser.journal) == 0
+    assert fake_disk.resources[f"{REMOTE_FOLDER}/big.bin"]["size"] == 4096
+
+
+def synced_two_way(tmp_path, make_synchroniser, **kwargs):
+    synchroniser = make_synchroniser(sync_mode="two_way", **kwargs)
+    (tmp_path / "local" / "a.txt").write_text("original")
+    assert synchroniser.full_synchronization()
+    assert "a.txt" in synchroniser.index
+    return synchroniser
+
+
+def test_two_way_event_keeps_both_versions_of_conflicting_edit(tmp_path, fake_disk, make_synchroniser):
+    """Локальная правка файла, изменённого в облаке, не перезаписывает версию из облака."""
+    synchroniser = synced_two_way(tmp_path, make_synchroniser, conflict_policy="keep_both")
+    fake_disk.put_file(f"{REMOTE_FOLDER}/a.txt", b"cloud edit")
+    (tmp_path / "local" / "a.txt").write_text("local edit")
+    assert synchroniser.process_events({"a.txt": MODIFIED}) == []
+    assert fake_disk.contents[f"{REMOTE_FOLDER}/a.txt"] == b"cloud edit"
+    assert (tmp_path / "local" / "a.txt").read_text() == "cloud edit"
+    copies = [path.read_text() for path in (tmp_path / "local").glob("a.conflict-*.txt")]
+    assert copies == ["local edit"]
+
+
+def test_two_way_event_does_not_delete_file_changed_in_cloud(tmp_path, fake_disk, make_synchroniser):
+    synchroniser = synced_two_way(tmp_path, make_synchroniser)
+    fake_disk.put_file(f"{REMOTE_FOLDER}/a.txt", b"cloud edit")
+    (tmp_path / "local" / "a.txt").unlink()
+    synchroniser.process_events({"a.txt": DELETED})
+    assert fake_disk.contents[f"{REMOTE_FOLDER}/a.txt"] == b"cloud edit"
+    assert (tmp_path / "local" / "a.txt").read_text() == "cloud edit"
+
+
+def test_two_way_event_deletes_unchanged_file_in_cloud(tmp_path, fake_disk, make_synchroniser):
+    synchroniser = synced_two_way(tmp_path, make_synchroniser)
+    (tmp_path / "local" / "a.txt").unlink()
+    synchroniser.process_events({"a.txt": DELETED})
+    assert f"{REMOTE_FOLDER}/a.txt" not in fake_disk.resources
+    assert "a.txt" not in synchroniser.index
+
+
+def test_two_way_replay_does_not_delete_file_changed_in_cloud(tmp_path, fake_disk, make_synchroniser):
+    """Удаление из журнала не выполняется, если файл после этого изменён в облаке."""
+    synchroniser = synced_two_way(tmp_path, make_synchroniser)
+    (tmp_path / "local" / "a.txt").unlink()
+    synchroniser.record_events([("a.txt", DELETED)])
+    fake_disk.put_file(f"{REMOTE_FOLDER}/a.txt", b"cloud edit")
+    assert synchroniser.replay_journal() == 1
+    assert len(synchroniser.journal) == 0
+    assert fake_disk.contents[f"{REMOTE_FOLDER}/a.txt"] == b"cloud edit"
+    assert (tmp_path / "local" / "a.txt").read_text() == "cloud edit"
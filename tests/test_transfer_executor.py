@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+
+from modules.metrics import Metrics
+from modules.transfer_executor import DELETE, LOAD, MAX_TRANSFER_WORKERS, TransferExecutor
+from modules.transfer_scheduler import LARGE_FILE_SIZE, AimdLimiter
+
+
+@pytest.fixture
+def executor():
+    executor = TransferExecutor(max_workers=4, max_delete_workers=2, metrics=Metrics())
+    yield executor
+    executor.shutdown()
+
+
+def test_uploads_run_concurrently(executor):
+    start = time.perf_counter()
+    for number in range(4):
+        executor.submit(LOAD, f"{number}.txt", lambda: time.sleep(0.2) or True, stat=(1, 0, number))
+    results = executor.wait()
+    assert time.perf_counter() - start < 0.6
+    assert [result.name for result in results] == ["0.txt", "1.txt", "2.txt", "3.txt"]
+    assert all(result.success for result in results)
+
+
+def test_failures_are_collected_in_results(executor):
+    def broken():
+        raise ConnectionError("нет соединения")
+
+    executor.submit(LOAD, "ok.txt", lambda: True, stat=(1, 0, 1))
+    executor.submit(LOAD, "false.txt", lambda: False, stat=(1, 0, 2))
+    executor.submit(DELETE, "broken.txt", broken)
+    results = {result.name: result for result in executor.wait()}
+    assert results["ok.txt"].success
+    assert not results["false.txt"].success and results["false.txt"].error is None
+    assert not results["broken.txt"].success and results["broken.txt"].error == "нет соединения"
+    assert executor.wait() == []
+
+
+def test_deletes_do_not_wait_for_uploads(executor):
+    """Удаления выполняются в своём пуле, пока все потоки загрузки заняты."""
+    release = threading.Event()
+    deleted = threading.Event()
+    for number in range(4):
+        executor.submit(LOAD, f"{number}.txt", release.wait, 5, stat=(1, 0, number))
+    executor.submit(DELETE, "old.txt", lambda: deleted.set() or True)
+    assert deleted.wait(2)
+    release.set()
+    assert all(result.success for result in executor.wait())
+
+
+def test_total_workers_are_capped():
+    executor = TransferExecutor(max_workers=40, max_delete_workers=10, metrics=Metrics())
+    try:
+        assert executor.max_workers + executor.max_delete_workers <= MAX_TRANSFER_WORKERS
+        assert executor.max_delete_workers >= 1
+    finally:
+        executor.shutdown()
+
+
+def test_small_upload_finishes_during_large_background_upload():
+    """Большой файл загружается в фоне, а wait дожидается только малых файлов, поставленных после него."""
+    executor = TransferExecutor(max_workers=2, metrics=Metrics(), limiter=AimdLimiter(2))
+    release = threading.Event()
+    try:
+        large = executor.submit(LOAD, "large.bin", release.wait, 5, stat=(LARGE_FILE_SIZE, 0, 1), background=True)
+        time.sleep(0.05)
+        executor.submit(LOAD, "small.txt", lambda: True, stat=(1, 0, 2))
+        start = time.perf_counter()
+        results = executor.wait()
+        assert time.perf_counter() - start < 1
+        assert [result.name for result in results] == ["small.txt"]
+        assert large.running()
+        release.set()
+        assert large.result(2).success
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_aimd_limiter_increases_additively():
+    limiter = AimdLimiter(4, initial=2)
+    for _ in range(2):
+        limiter.record("upload", 0.1, 200)
+    assert limiter.limit == 3
+    limiter.record("upload", 5.0, 200)
+    limiter.record("upload", 5.0, 200)
+    limiter.record("upload", 5.0, 200)
+    assert limiter.limit == 3
+    for _ in range(20):
+        limiter.record("upload", 0.1, 200)
+    assert limiter.limit == 4
+
+
+def test_aimd_limiter_decreases_once_per_cooldown():
+    """Волна ошибок уменьшает предел один раз, следующая ошибка после паузы уменьшает его снова."""
+    limiter = AimdLimiter(8, initial=8, cooldown=0.05)
+    for status_code in (429, 503, None):
+        limiter.record("upload", 0.1, status_code)
+    assert limiter.limit == 4
+    time.sleep(0.06)
+    limiter.record("upload", 0.1, 500)
+    assert limiter.limit == 2
+    time.sleep(0.06)
+    limiter.record("upload", 0.1, 429)
+    limiter.record("upload", 0.1, 429)
+    assert limiter.limit == 1
@@ -0,0 +1,73 @@
+import hashlib
+
+import pytest
+
+from api_clients.http_client import HttpClient
+from api_clients.transports import TRANSPORT_OPERATIONS, Transport, WebDavTransport
+from api_clients.yandex_req import YandexDisk
+from conftest import REMOTE_FOLDER
+from modules.metrics import Metrics
+
+
+@pytest.fixture
+def connect(fake_disk):
+    return YandexDisk(token="test", path_to_the_folder=REMOTE_FOLDER, url=fake_disk.url,
+                      client=HttpClient(backoff=0.01, metrics=Metrics()), webdav_url=fake_disk.webdav_url,
+                      webdav_operations=TRANSPORT_OPERATIONS)
+
+
+def test_transport_without_all_operations_cannot_be_created(connect):
+    class UploadOnly(Transport):
+        def upload(self, path, file_name, overwrite, hashes=None):
+            pass
+
+    with pytest.raises(TypeError):
+        UploadOnly(connect)
+
+
+def test_all_operations_use_webdav(connect):
+    assert all(isinstance(transport, WebDavTransport) for transport in connect.transports.values())
+
+
+def test_webdav_upload_and_listing(tmp_path, fake_disk, connect):
+    """Файлы с пробелами и кириллицей в именах загружаются и читаются обратно через PROPFIND."""
+    (tmp_path / "файл #1.txt").write_bytes(b"data")
+    assert connect.create_folders(["папка", "папка/вложенная"]) == []
+    assert connect.load(str(tmp_path / "файл #1.txt"), "папка/вложенная/файл #1.txt")
+    assert fake_disk.contents[f"{REMOTE_FOLDER}/папка/вложенная/файл #1.txt"] == b"data"
+
+    files = connect.get_info(recursive=True)
+    remote_file = files["папка/вложенная/файл #1.txt"]
+    assert (remote_file.size, remote_file.md5) == (4, hashlib.md5(b"data").hexdigest())
+    assert connect.folders == {"папка", "папка/вложенная"}
+
+
+def test_webdav_upload_does_not_overwrite_without_reload(tmp_path, fake_disk, connect):
+    (tmp_path / "a.txt").write_bytes(b"first")
+    assert connect.load(str(tmp_path / "a.txt"), "a.txt")
+    (tmp_path / "a.txt").write_bytes(b"second")
+    assert not connect.load(str(tmp_path / "a.txt"), "a.txt")
+    assert fake_disk.contents[f"{REMOTE_FOLDER}/a.txt"] == b"first"
+    assert connect.reload(str(tmp_path / "a.txt"), "a.txt")
+    assert fake_disk.contents[f"{REMOTE_FOLDER}/a.txt"] == b"second"
+
+
+def test_webdav_upload_of_known_content_is_deduplicated(tmp_path, fake_disk, connect):
+    (tmp_path / "a.txt").write_bytes(b"same content")
+    assert connect.load(str(tmp_path / "a.txt"), "a.txt")
+    assert connect.load(str(tmp_path / "a.txt"), "copy.txt")
+    assert fake_disk.deduplicated == 1
+    assert fake_disk.contents[f"{REMOTE_FOLDER}/copy.txt"] == b"same content"
+
+
+def test_webdav_move_and_delete(tmp_path, fake_disk, connect):
+    (tmp_path / "a.txt").write_bytes(b"data")
+    (tmp_path / "b.txt").write_bytes(b"other")
+    assert connect.load(str(tmp_path / "a.txt"), "a.txt")
+    assert connect.load(str(tmp_path / "b.txt"), "b.txt")
+    assert not connect.move("a.txt", "b.txt")
+    assert connect.move("a.txt", "renamed.txt")
+    assert connect.delete("b.txt")
+    assert not connect.delete("missing.txt")
+    assert sorted(connect.get_info(recursive=True)) == ["renamed.txt"]
+    assert fake_disk.contents[f"{REMOTE_FOLDER}/renamed.txt"] == b"data"
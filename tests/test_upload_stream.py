@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+from api_clients.upload_stream import UPLOAD_CHUNK_SIZE, UploadStream
+
+
+def read_all(stream: UploadStream) -> bytes:
+    chunks = []
+    while True:
+        chunk = stream.read(-1)
+        if not chunk:
+            return b"".join(chunks)
+        assert len(chunk) <= UPLOAD_CHUNK_SIZE
+        chunks.append(chunk)
+
+
+def test_stream_sends_exactly_declared_size(tmp_path):
+    path = tmp_path / "a.bin"
+    path.write_bytes(b"x" * (UPLOAD_CHUNK_SIZE + 10))
+    with UploadStream(str(path)) as stream:
+        assert len(stream) == UPLOAD_CHUNK_SIZE + 10
+        assert read_all(stream) == b"x" * (UPLOAD_CHUNK_SIZE + 10)
+        assert stream.sent == len(stream)
+
+
+def test_data_appended_during_upload_is_not_sent(tmp_path):
+    """Дописанные во время загрузки данные не выходят за объявленный Content-Length."""
+    path = tmp_path / "growing.log"
+    path.write_bytes(b"a" * 1000)
+    with UploadStream(str(path)) as stream:
+        first = stream.read(600)
+        with open(path, "ab") as file:
+            file.write(b"b" * 5000)
+        rest = read_all(stream)
+    assert first + rest == b"a" * 1000
+
+
+def test_truncated_file_raises_connection_error(tmp_path):
+    path = tmp_path / "shrinking.log"
+    path.write_bytes(b"a" * 3 * UPLOAD_CHUNK_SIZE)
+    with UploadStream(str(path)) as stream:
+        stream.read(UPLOAD_CHUNK_SIZE)
+        path.write_bytes(b"a" * (UPLOAD_CHUNK_SIZE * 3 // 2))
+        with pytest.raises(ConnectionError):
+            read_all(stream)
+
+
+def test_speed_limit(tmp_path):
+    path = tmp_path / "a.bin"
+    path.write_bytes(b"x" * 4000)
+    start = time.monotonic()
+    with UploadStream(str(path), speed_limit=20000) as stream:
+        read_all(stream)
+    assert time.monotonic() - start >= 0.18
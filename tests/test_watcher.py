@@ -0,0 +1,167 @@
+import ctypes
+import errno
+import time
+
+import pytest
+
+from modules.poll_interval import PollInterval
+from modules.sync_daemon import WatchDaemon
+from modules.watcher import DELETED, MODIFIED, EventQueue, create_watcher
+
+
+def test_event_queue_coalesces_write_burst():
+    """Серия событий по одному файлу превращается в одно событие после задержки."""
+    queue = EventQueue(0.05)
+    for _ in range(10):
+        queue.push("a.txt", MODIFIED)
+    queue.push("b.txt", MODIFIED)
+    queue.push("b.txt", DELETED)
+    assert len(queue) == 2
+    assert queue.pop_ready() == {}
+    time.sleep(0.06)
+    assert queue.pop_ready() == {"a.txt": MODIFIED, "b.txt": DELETED}
+    assert len(queue) == 0
+    assert queue.next_deadline() is None
+
+
+def test_event_queue_restarts_delay_on_new_event():
+    queue = EventQueue(0.05)
+    queue.push("a.txt", MODIFIED)
+    time.sleep(0.04)
+    queue.push("a.txt", MODIFIED)
+    time.sleep(0.02)
+    assert queue.pop_ready() == {}
+    assert queue.next_deadline() > time.monotonic()
+
+
+@pytest.fixture
+def watcher(tmp_path):
+    watcher = create_watcher(str(tmp_path))
+    if watcher is None:
+        pytest.skip("inotify недоступен")
+    yield watcher
+    watcher.close()
+
+
+def read_all(watcher, timeout: float = 0.5) -> dict:
+    events = {}
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        events.update(watcher.read_events(0.05))
+    return events
+
+
+def test_watcher_reports_file_events_in_subdirectories(tmp_path, watcher):
+    (tmp_path / "sub").mkdir()
+    watcher.read_events(0.1)
+    assert watcher.resync_required
+    watcher.resync_required = False
+    (tmp_path / "sub" / "a.txt").write_text("data")
+    (tmp_path / "b.txt").write_text("data")
+    (tmp_path / "b.txt").unlink()
+    events = read_all(watcher)
+    assert events == {"sub/a.txt": MODIFIED, "b.txt": DELETED}
+    assert not watcher.resync_required
+
+
+class BlockingLibc:
+    """Обёртка libc, отказывающая в наблюдении за директориями с именем blocked."""
+
+    def __init__(self, libc) -> None:
+        self.libc = libc
+
+    def inotify_add_watch(self, fd, path, mask):
+        if path.endswith(b"blocked"):
+            ctypes.set_errno(errno.EACCES)
+            return -1
+        return self.libc.inotify_add_watch(fd, path, mask)
+
+
+def test_unwatchable_directory_requires_polling(tmp_path, watcher):
+    watcher._libc = BlockingLibc(watcher._libc)
+    (tmp_path / "blocked").mkdir()
+    read_all(watcher, 0.2)
+    assert watcher.resync_required
+    assert watcher.polling_required
+
+
+class FakeWatcher:
+    """Наблюдатель, отдающий заранее заданные события."""
+
+    def __init__(self, *batches) -> None:
+        self.batches = list(batches)
+        self.resync_required = False
+        self.polling_required = False
+
+    def read_events(self, timeout):
+        return self.batches.pop(0) if self.batches else []
+
+
+class FakeSynchroniser:
+    """Синхронизатор, запоминающий вызовы и выбрасывающий заданную ошибку при обработке событий."""
+
+    local_path = "/tmp/sync"
+    last_cycle_idle = True
+
+    def __init__(self, error: Exception = None) -> None:
+        self.error = error
+        self.full_scans = []
+        self.processed = []
+
+    def record_events(self, events):
+        pass
+
+    def collect_background_uploads(self):
+        return []
+
+    def full_synchronization(self, full_scan=True):
+        self.full_scans.append(full_scan)
+        return True
+
+    def process_events(self, events):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        self.processed.append(events)
+        return []
+
+
+def test_watch_daemon_survives_errors_and_resyncs():
+    """Ошибка обработки событий не останавливает цикл, а следующая сверка обходит дерево полностью."""
+    synchroniser = FakeSynchroniser(FileNotFoundError("a.txt"))
+    poll_interval = PollInterval(60, 60, failure_backoff=0.01)
+    daemon = WatchDaemon(synchroniser, poll_interval, FakeWatcher([], [("a.txt", MODIFIED)]), 0)
+    daemon.run_next()
+    assert synchroniser.full_scans == [True]
+    daemon.run_next()
+    assert poll_interval.failures == 1
+    daemon.run_next()
+    assert synchroniser.full_scans == [True, True]
+
+    daemon.watcher.batches.append([("b.txt", MODIFIED)])
+    daemon.run_next()
+    assert synchroniser.processed == [{"b.txt": MODIFIED}]
+    assert synchroniser.full_scans == [True, True]
+
+
+def test_periodic_pass_keeps_pending_events():
+    """Сверка без полного обхода не видит правок внутри файлов, поэтому события из очереди не теряются."""
+    synchroniser = FakeSynchroniser()
+    watcher = FakeWatcher([], [("a.txt", MODIFIED)])
+    daemon = WatchDaemon(synchroniser, PollInterval(60, 60), watcher, 0)
+    daemon.run_next()
+    daemon.next_full_synchronization = 0
+    daemon.run_next()
+    assert synchroniser.full_scans == [True, False]
+    assert synchroniser.processed == [{"a.txt": MODIFIED}]
+
+
+def test_unwatched_subtree_forces_full_scans():
+    synchroniser = FakeSynchroniser()
+    watcher = FakeWatcher()
+    watcher.polling_required = True
+    daemon = WatchDaemon(synchroniser, PollInterval(60, 60), watcher, 0)
+    daemon.run_next()
+    daemon.next_full_synchronization = 0
+    daemon.run_next()
+    assert synchroniser.full_scans == [True, True]